@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Memoized analysis of the assembly graph, in which products are linked to
+their components by Acus:  for each product, the cycles in its assembly, its
+depth (number of assembly levels, counting the product itself), and its "BOM"
+(the oids of all the products used in its assembly, at any level).
+
+The results for a product are computed once, in a single traversal that also
+computes them for all the products in its assembly, and are kept until the
+Acus of the product or of any product in its assembly are added, modified or
+deleted (see update_acu(), remove_acu(), and remove_product()), which drops
+the results of only the affected assemblies.
+
+Usage:
+
+    from pangalactic.node.assemblygraph import assembly_graph
+
+    cycles = assembly_graph.cycles(system.oid)
+    level_count = assembly_graph.depth(system.oid)
+    if assembly.oid in assembly_graph.bom_oids(dropped_item.oid):
+        # dropping the item into the assembly would create a cycle
+"""
+from pangalactic.core import orb
+
+
+def get_acu_links(oid):
+    """
+    Return the (Acu oid, component oid) pairs of the Acus of a product in
+    the local db (Acus with no component are ignored).
+
+    Args:
+        oid (str):  oid of the product
+    """
+    product = orb.get(oid)
+    return [(acu.oid, acu.component.oid)
+            for acu in (getattr(product, 'components', None) or [])
+            if acu.component]
+
+
+class AssemblyGraph(object):
+    """
+    Memoized cycle, depth, and BOM analysis of product assemblies.
+
+    Attributes:
+        get_links (function):  function that returns the (Acu oid, component
+            oid) pairs of a product, given its oid (default: get_acu_links)
+        links (dict):  maps the oids of the products whose Acus have been
+            loaded to dicts that map their Acu oids to component oids
+        acus (dict):  maps the oids of loaded Acus to (assembly oid,
+            component oid)
+        used_in (dict):  maps component oids to the oids of the loaded Acus
+            that use them
+        results (dict):  maps product oids to (depth, BOM oids, cycles)
+        n_analyzed (int):  number of product analyses done (for stats)
+    """
+    def __init__(self, get_links=None):
+        self.get_links = get_links or get_acu_links
+        self.clear()
+
+    def clear(self):
+        """
+        Forget everything (e.g. after a sync, which may have changed any
+        assembly).
+        """
+        self.links = {}
+        self.acus = {}
+        self.used_in = {}
+        self.results = {}
+        self.n_analyzed = 0
+
+    def _component_oids(self, oid):
+        # load the Acus of a product the first time they are needed
+        if oid not in self.links:
+            self.links[oid] = {}
+            for acu_oid, comp_oid in self.get_links(oid):
+                self._add(acu_oid, oid, comp_oid)
+        return set(self.links[oid].values())
+
+    def _add(self, acu_oid, assembly_oid, comp_oid):
+        self.links[assembly_oid][acu_oid] = comp_oid
+        self.acus[acu_oid] = (assembly_oid, comp_oid)
+        self.used_in.setdefault(comp_oid, set()).add(acu_oid)
+
+    def _discard(self, acu_oid):
+        # forget a loaded Acu and return the oid of its assembly
+        assembly_oid, comp_oid = self.acus.pop(acu_oid)
+        self.links.get(assembly_oid, {}).pop(acu_oid, None)
+        acu_oids = self.used_in.get(comp_oid)
+        if acu_oids is not None:
+            acu_oids.discard(acu_oid)
+            if not acu_oids:
+                del self.used_in[comp_oid]
+        return assembly_oid
+
+    def invalidate(self, oid):
+        """
+        Drop the results of a product and of all the products that use it in
+        their assemblies, at any level.  (The results of a product are only
+        computed along with those of all the products in its assembly, so if
+        a product has none, neither do the products that use it.)
+
+        Args:
+            oid (str):  oid of the product
+        """
+        oids = [oid]
+        while oids:
+            oid = oids.pop()
+            if self.results.pop(oid, None) is None:
+                continue
+            for acu_oid in self.used_in.get(oid, ()):
+                oids.append(self.acus[acu_oid][0])
+
+    def update_acu(self, acu_oid, assembly_oid, comp_oid):
+        """
+        Update the graph for a new or modified Acu.
+
+        Args:
+            acu_oid (str):  oid of the Acu
+            assembly_oid (str):  oid of its assembly
+            comp_oid (str):  oid of its component (None if it has none)
+        """
+        old = self.acus.get(acu_oid)
+        if old == (assembly_oid, comp_oid):
+            return
+        if old:
+            self.invalidate(self._discard(acu_oid))
+        # if the assembly's Acus have not been loaded, this one will be
+        # loaded along with them
+        if assembly_oid in self.links and comp_oid:
+            self._add(acu_oid, assembly_oid, comp_oid)
+        if assembly_oid:
+            self.invalidate(assembly_oid)
+
+    def remove_acu(self, acu_oid):
+        """
+        Update the graph for a deleted Acu.
+
+        Args:
+            acu_oid (str):  oid of the Acu
+        """
+        if acu_oid in self.acus:
+            self.invalidate(self._discard(acu_oid))
+
+    def remove_product(self, oid):
+        """
+        Update the graph for a deleted product (and its Acus).
+
+        Args:
+            oid (str):  oid of the product
+        """
+        self.invalidate(oid)
+        acu_oids = (list(self.links.get(oid, {}))
+                    + list(self.used_in.get(oid, ())))
+        for acu_oid in acu_oids:
+            if acu_oid in self.acus:
+                self._discard(acu_oid)
+        self.links.pop(oid, None)
+
+    def _analyze(self, oid):
+        """
+        Compute the results of a product and of all the products in its
+        assembly that have none.  Tarjan's algorithm is used:  it finds the
+        strongly connected components of the graph (the sets of products
+        that are in a cycle together, or single products) in reverse
+        topological order, so the results of the components of an assembly
+        are known when its own results are computed.
+        """
+        if oid in self.results:
+            return
+        index = {oid: 0}
+        lowlink = {oid: 0}
+        stack = [oid]
+        on_stack = {oid}
+        work = [(oid, iter(self._component_oids(oid)))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child in self.results:
+                    continue
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(self._component_oids(child))))
+                    break
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        members.append(member)
+                        if member == node:
+                            break
+                    self._set_results(members)
+
+    def _set_results(self, members):
+        # set the results of a strongly connected component, whose
+        # components outside of it already have results
+        member_set = set(members)
+        bom = set()
+        cycles = set()
+        depth = 0
+        if (len(members) > 1
+            or members[0] in self._component_oids(members[0])):
+            # the members are in a cycle (all of them are in each one's BOM)
+            bom |= member_set
+            cycles.add(tuple(sorted(member_set)))
+        for member in members:
+            for comp_oid in self._component_oids(member) - member_set:
+                comp_depth, comp_bom, comp_cycles = self.results[comp_oid]
+                bom.add(comp_oid)
+                bom |= comp_bom
+                cycles |= comp_cycles
+                depth = max(depth, comp_depth)
+        result = (depth + 1, frozenset(bom), frozenset(cycles))
+        for member in members:
+            self.results[member] = result
+        self.n_analyzed += len(members)
+
+    def cycles(self, oid):
+        """
+        Return the cycles in the assembly of a product, each as a sorted
+        tuple of the oids of the products in the cycle (an empty list if
+        there are none).
+
+        Args:
+            oid (str):  oid of the product
+        """
+        self._analyze(oid)
+        return sorted(self.results[oid][2])
+
+    def depth(self, oid):
+        """
+        Return the number of levels in the assembly of a product (1 for a
+        product with no components).
+
+        Args:
+            oid (str):  oid of the product
+        """
+        self._analyze(oid)
+        return self.results[oid][0]
+
+    def bom_oids(self, oid):
+        """
+        Return the oids of all the products in the assembly of a product, at
+        any level (the product itself is included only if it is in a cycle).
+
+        Args:
+            oid (str):  oid of the product
+        """
+        self._analyze(oid)
+        return self.results[oid][1]
+
+
+assembly_graph = AssemblyGraph()
@@ -22,12 +22,12 @@ from pangalactic.core.access      import get_perms
 # from pangalactic.core.names       import (get_block_model_id,
                                           # get_block_model_name,
                                           # get_block_model_file_name)
-from pangalactic.node.cad.viewer  import Model3DViewer
 from pangalactic.node.diagrams    import DiagramView, DocForm
 from pangalactic.node.dialogs     import (DocImportDialog,
                                           MiniMelDialog,
                                           ModelImportDialog,
                                           ModelsAndDocsInfoDialog)
+from pangalactic.node.importtimes import lazy_import
 from pangalactic.node.utils       import (extract_mime_data,
                                           create_product_from_template)
 from pangalactic.node.widgets     import NameLabel, PlaceHolder, ValueLabel
@@ -498,9 +498,14 @@ class ModelWindow(QMainWindow):
                 if some_fpath:
                     non_null_fpath = some_fpath
                     orb.log.debug(f'  step file: "{non_null_fpath}"')
+        if non_null_fpath:
+            # for the vault cache statistics
+            dispatcher.send('vault file accessed', fpath=non_null_fpath)
         try:
             if non_null_fpath:
-                self.cad_viewer = Model3DViewer(fpath=non_null_fpath)
+                # the CAD viewer (pythonocc) is loaded on first use
+                viewer = lazy_import('pangalactic.node.cad.viewer')
+                self.cad_viewer = viewer.Model3DViewer(fpath=non_null_fpath)
                 self.cad_viewer.show()
         except:
             orb.log.debug('  CAD model not found or not in STEP format.')
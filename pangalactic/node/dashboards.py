@@ -24,7 +24,6 @@ except:
 from pangalactic.core.parametrics     import mode_defz, parm_defz
 from pangalactic.core.utils.datetimes import dtstamp, date2str
 from pangalactic.core.utils.reports   import write_mel_to_tsv
-from pangalactic.core.validation      import get_assembly, get_bom_oids
 from pangalactic.node.utils           import extract_mime_data
 from pangalactic.node.dialogs         import (CustomizeColsDialog,
                                               DeleteColsDialog,
@@ -669,197 +668,32 @@ class SystemDashboard(QTreeView):
 
     def object_indexes_in_tree(self, obj):
         """
-        Find the source model indexes of all nodes in the system tree that
+        Find the source model indexes of all nodes in the dashboard tree that
         reference the specified object (this is needed for updating the tree
-        in-place when an object is modified).
+        in-place when an object is modified).  The nodes are found in the
+        model's node index.
 
         Args:
             obj (Product):  specified object
         """
         # orb.log.debug(f'* object_indexes_in_tree({obj.id})')
-        # try:
-            # model = self.proxy_model.sourceModel()
-        # except:
-            # # oops -- C++ object probably got deleted
-            # return []
-        model = self.model().sourceModel()
-        # orb.log.debug(f'  model is a {type(model)}')
-        project_index = model.index(0, 0, QModelIndex())
-        # project_node = model.get_node(project_index)
-        # orb.log.debug(f'  for project {project_node.obj.id}')
-        # orb.log.debug(f'  (node cname: {project_node.cname})')
-        # NOTE: systems could be created with a list comp except the sanity
-        # check "if psu.system" is needed in case a psu got corrupted
-        systems = []
-        for psu in model.project.systems:
-            if psu.system:
-                systems.append(psu.system)
-        # first check whether obj *is* one of the systems:
-        is_a_system = [sys for sys in systems if sys.oid == obj.oid]
-        # then check whether obj occurs in any system boms:
-        in_system = [sys for sys in systems if obj.oid in get_bom_oids(sys)]
-        if is_a_system or in_system:
-            # systems exist -> project_index has children, so ...
-            sys_idxs = [model.index(row, 0, project_index)
-                        for row in range(model.rowCount(project_index))]
-            system_idxs = []
-            obj_idxs = []
-            if is_a_system:
-                # orb.log.debug('  - object is a system.')
-                # orb.log.debug('    project has {} system(s).'.format(
-                                                            # len(systems)))
-                # orb.log.debug('    tree has {} system(s).'.format(
-                                                            # len(sys_idxs)))
-                for idx in sys_idxs:
-                    system_node = model.get_node(idx)
-                    # orb.log.debug('    + {}'.format(system_node.obj.id))
-                    if system_node.obj.oid == obj.oid:
-                        system_idxs.append(idx)
-                # orb.log.debug('    {} system occurrences found.'.format(
-                              # len(system_idxs)))
-            if in_system:
-                # orb.log.debug('  - object is a component.')
-                for sys_idx in sys_idxs:
-                    obj_idxs += self.object_indexes_in_assembly(obj, sys_idx)
-                # orb.log.debug('    {} component occurrences found.'.format(
-                              # len(obj_idxs)))
-            return list(set(system_idxs + obj_idxs))
-        else:
-            # orb.log.info('  - object not found in tree.')
-            return []
-        return []
-
-    def object_indexes_in_assembly(self, obj, idx):
-        """
-        Find the source model indexes of all nodes in an assembly that reference
-        the specified object and source model index.
-
-        Args:
-            obj (Product):  specified object
-            idx (QModelIndex):  source model index of the assembly or project
-                node
-        """
-        # orb.log.debug(f'* object_indexes_in_assembly({obj.id})')
-        # NOTE: ignore "TBD" objects
-        if getattr(obj, 'oid', '') == 'pgefobjects:TBD':
-            return []
-        model = self.model().sourceModel()
-        assembly_node = model.get_node(idx)
-        assembly = assembly_node.obj
-        # orb.log.debug('* object_indexes_in_assembly({})'.format(assembly.id))
-        if obj.oid == assembly.oid:
-            # orb.log.debug('  assembly *is* the object')
-            return [idx]
-        elif model.hasChildren(idx) and obj.oid in get_bom_oids(assembly):
-            # orb.log.debug('  obj in assembly bom -- look for children ...')
-            obj_idxs = []
-            comp_idxs = [model.index(row, 0, idx)
-                         for row in range(model.rowCount(idx))]
-            for comp_idx in comp_idxs:
-                obj_idxs += self.object_indexes_in_assembly(obj, comp_idx)
-            return obj_idxs
-        else:
-            return []
+        return self.model().sourceModel().object_indexes(obj)
 
     def link_indexes_in_tree(self, link):
         """
-        Find the source model indexes of all nodes in the system tree that
+        Find the source model indexes of all nodes in the dashboard tree that
         reference the specified link (Acu or ProjectSystemUsage) -- this is
         needed for updating the tree in-place when a link object is modified.
+        The nodes are found in the model's node index (the nodes on the path
+        to the link are loaded if necessary).
 
         Args:
             link (Acu or ProjectSystemUsage):  specified link object
         """
-        orb.log.debug('* link_indexes_in_tree({})'.format(link.id))
         if not link:
             return []
-        model = self.model().sourceModel()
-        project_index = model.index(0, 0, QModelIndex())
-        # project_node = model.get_node(project_index)
-        # orb.log.debug('  for project {}'.format(project_node.obj.oid))
-        # orb.log.debug('  (node cname: {})'.format(project_node.cname))
-        # ----------------------------------------------------
-        # IMPORTANT: fully populate model with child nodes ...
-        # ----------------------------------------------------
-        model.populate()
-        # first check whether link is a PSU:
-        is_a_psu = [psu for psu in model.project.systems
-                    if psu.oid == link.oid]
-        # then check whether link occurs in any system boms:
-        systems = [psu.system for psu in model.project.systems]
-        in_system = [sys for sys in systems if link in get_assembly(sys)]
-        if is_a_psu or in_system:
-            # systems exist -> project_index has children, so ...
-            child_count = model.rowCount(project_index)
-            if child_count == 0:
-                # orb.log.debug('  - no child nodes found.')
-                return []
-            sys_idxs = [model.index(row, 0, project_index)
-                        for row in range(child_count)]
-            if not sys_idxs:
-                # orb.log.debug('  - no child indexes found.')
-                return []
-            link_idxs = []
-            if is_a_psu:
-                # orb.log.debug('  - link is a ProjectSystemUsage ...')
-                # orb.log.debug('    project has {} system(s).'.format(
-                                                            # len(systems)))
-                # orb.log.debug('    tree has {} system(s).'.format(
-                                                            # len(sys_idxs)))
-                for idx in sys_idxs:
-                    system_node = model.get_node(idx)
-                    if system_node.link.oid == link.oid:
-                        # orb.log.debug('    + {}'.format(system_node.link.id))
-                        # orb.log.debug('      system: {}'.format(
-                                                        # system_node.obj.id))
-                        link_idxs.append(idx)
-                # orb.log.debug('    {} system occurrences found.'.format(
-                              # len(link_idxs)))
-            if in_system:
-                # orb.log.debug('  - link is an Acu ...')
-                for sys_idx in sys_idxs:
-                    link_idxs += self.link_indexes_in_assembly(link, sys_idx)
-                # orb.log.debug('    {} link occurrences found.'.format(
-                              # len(link_idxs)))
-            return link_idxs
-        else:
-            # orb.log.debug('  - link not found in tree.')
-            return []
-        return []
-
-    def link_indexes_in_assembly(self, link, idx):
-        """
-        Find the source model indexes of all nodes in an assembly that have the
-        specified link as their `link` attribute and the specified source model
-        index.
-
-        Args:
-            link (Acu):  specified link
-            idx (QModelIndex):  index of the assembly or project node
-        """
-        if link:
-            model = self.model().sourceModel()
-            assembly_node = model.get_node(idx)
-            if assembly_node.link is None:
-                return []
-            if hasattr(assembly_node.link, 'component'):
-                assembly = assembly_node.link.component
-            else:
-                assembly = assembly_node.link.system
-            # orb.log.debug('* link_indexes_in_assembly({})'.format(link.id))
-            if link.oid == assembly_node.link.oid:
-                # orb.log.debug('  assembly node *is* the link node')
-                return [idx]
-            elif model.hasChildren(idx) and link in get_assembly(assembly):
-                # orb.log.debug('  link in assembly -- looking for acus ...')
-                link_idxs = []
-                comp_idxs = [model.index(row, 0, idx)
-                             for row in range(model.rowCount(idx))]
-                for comp_idx in comp_idxs:
-                    link_idxs += self.link_indexes_in_assembly(link, comp_idx)
-                return link_idxs
-            return []
-        return []
+        orb.log.debug('* link_indexes_in_tree({})'.format(link.id))
+        return self.model().sourceModel().link_indexes(link)
 
 
 class MultiDashboard(QWidget):
@@ -931,6 +765,14 @@ class MultiDashboard(QWidget):
         self.dashboards.addWidget(dash)
         self.dash_select.addItem(dashboard_name, QVariant)
 
+    def sync_nodes(self):
+        """
+        Update the trees of all the dashboards in place (see
+        SystemTreeModel.sync_nodes()).
+        """
+        for i in range(self.dashboards.count()):
+            self.dashboards.widget(i).model().sourceModel().sync_nodes()
+
     def set_dashboard(self, dash_name):
         orb.log.debug(f'* set_dashboard({dash_name})')
         state['dashboard_name'] = dash_name
@@ -28,7 +28,7 @@ from pangalactic.core.parametrics import (data_elementz, get_dval,
                                           get_pval, parameterz, parm_defz)
 from pangalactic.core.units       import in_si
 from pangalactic.core.utils.datetimes import dtstamp
-from pangalactic.core.validation  import get_bom_oids
+from pangalactic.node.assemblygraph import assembly_graph
 from pangalactic.node.dialogs     import (AssemblyNodeDialog,
                                           ConnectionsDialog,
                                           DirectionalityDialog,
@@ -742,7 +742,7 @@ class ObjectBlock(Block):
                     popup.show()
                     event.ignore()
                     return
-                bom_oids = get_bom_oids(dropped_item)
+                bom_oids = assembly_graph.bom_oids(dropped_item.oid)
                 if self.usage.assembly.oid in bom_oids:
                     # --------------------------------------------------------
                     # 0: dropped item would cause a cycle -> abort
@@ -1051,7 +1051,7 @@ class SubjectBlock(Block):
                 event.ignore()
             if isinstance(drop_target, orb.classes['Product']):
                 orb.log.debug('    + target is a Product ...')
-                bom_oids = get_bom_oids(dropped_item)
+                bom_oids = assembly_graph.bom_oids(dropped_item.oid)
                 if drop_target.oid in bom_oids:
                     # ---------------------------------------------------------
                     # 0: target is a component of dropped item (cycle) -> abort
@@ -62,6 +62,7 @@ from pangalactic.node.widgets     import (get_widget, ColorLabel,
                                           UnitsWidget)
 
 COLORS = {True: 'green', False: 'red'}
+VAULT_QUOTAS = ('unlimited', '500', '1000', '2000', '5000', '10000')
 
 
 class ParmDefsDialog(QDialog):
@@ -1050,6 +1051,13 @@ class FileInfoDialog(QDialog):
             save_local_button = SizedButton("Save Local Copy")
             save_local_button.clicked.connect(self.on_save_local)
             self.vbox.addWidget(save_local_button)
+            # a pinned file is never evicted from the local vault
+            self.pin_checkbox = QCheckBox('Keep in local vault', self)
+            vault_fname = os.path.basename(vault_file_path)
+            self.pin_checkbox.setChecked(
+                            vault_fname in (prefs.get('vault_pinned') or []))
+            self.pin_checkbox.stateChanged.connect(self.on_pin_changed)
+            self.vbox.addWidget(self.pin_checkbox)
         else:
             orb.log.debug('  file not found in local vault')
             download_button = SizedButton("Download File")
@@ -1075,6 +1083,19 @@ class FileInfoDialog(QDialog):
     def on_download_file(self, evt):
         dispatcher.send(signal='download file', digital_file=self.dfile)
 
+    def on_pin_changed(self, evt):
+        """
+        Pin (or unpin) the file in the local vault.
+        """
+        vault_fname = os.path.basename(orb.get_vault_fpath(self.dfile))
+        pinned = set(prefs.get('vault_pinned') or [])
+        if self.pin_checkbox.isChecked():
+            pinned.add(vault_fname)
+        else:
+            pinned.discard(vault_fname)
+        prefs['vault_pinned'] = sorted(pinned)
+        orb.log.debug(f'  - vault pinned files: {prefs["vault_pinned"]}')
+
     def on_save_local(self, evt):
         suggested_path = os.path.join(state.get('last_path', ''),
                                       (self.dfile.user_file_name or ''))
@@ -1083,9 +1104,10 @@ class FileInfoDialog(QDialog):
                                     suggested_path)
         if fpath:
             orb.log.debug(f'  - path selected: "{fpath}"')
-            # copy vault file to fpath ...
+            # copy vault file to fpath (contents only -- vault files are
+            # read-only, and the user's copy should not be)
             vault_fpath = orb.get_vault_fpath(self.dfile)
-            shutil.copy(vault_fpath, fpath)
+            shutil.copyfile(vault_fpath, fpath)
             self.accept()
         else:
             self.reject()
@@ -1904,6 +1926,39 @@ class PrefsDialog(QDialog):
         else:
             self.dri_select.setCurrentIndex(deltas.index('60'))
         form.addRow(dri_label, self.dri_select)
+        srif_label = QLabel('Sync Requests in Flight', self)
+        self.srif_select = QComboBox()
+        self.srif_select.activated.connect(self.set_sync_requests_in_flight)
+        windows = ('1', '2', '3', '4', '6', '8')
+        for window in windows:
+            self.srif_select.addItem(window, QVariant())
+        srif_pref = prefs.get('sync_requests_in_flight')
+        if str(srif_pref) in windows:
+            self.srif_select.setCurrentIndex(windows.index(str(srif_pref)))
+        else:
+            self.srif_select.setCurrentIndex(windows.index('3'))
+        form.addRow(srif_label, self.srif_select)
+        vq_label = QLabel('Local Vault Cache Quota [MB]', self)
+        self.vq_select = QComboBox()
+        self.vq_select.activated.connect(self.set_vault_quota)
+        for quota in VAULT_QUOTAS:
+            self.vq_select.addItem(quota, QVariant())
+        vq_pref = prefs.get('vault_quota_mb')
+        if str(vq_pref) in VAULT_QUOTAS:
+            self.vq_select.setCurrentIndex(VAULT_QUOTAS.index(str(vq_pref)))
+        else:
+            self.vq_select.setCurrentIndex(VAULT_QUOTAS.index('unlimited'))
+        form.addRow(vq_label, self.vq_select)
+        smd_label = QLabel('Compare Manifest Digests on Full Sync', self)
+        self.smd_checkbox = QCheckBox(self)
+        self.smd_checkbox.setChecked(bool(prefs.get('sync_manifest_digests')))
+        self.smd_checkbox.stateChanged.connect(self.set_sync_manifest_digests)
+        form.addRow(smd_label, self.smd_checkbox)
+        pf_label = QLabel('Prefetch Project Model and Document Files', self)
+        self.pf_checkbox = QCheckBox(self)
+        self.pf_checkbox.setChecked(bool(prefs.get('prefetch_files')))
+        self.pf_checkbox.stateChanged.connect(self.set_prefetch_files)
+        form.addRow(pf_label, self.pf_checkbox)
         unit_prefs_button = SizedButton("Set Preferred Units")
         unit_prefs_button.clicked.connect(self.set_preferred_units)
         form.addRow(unit_prefs_button)
@@ -1962,6 +2017,51 @@ class PrefsDialog(QDialog):
         except:
             orb.log.debug(f'        invalid index ({index})')
 
+    def set_vault_quota(self, index):
+        """
+        Set the maximum size of the downloaded files kept in the local vault
+        (the least recently used are evicted beyond it).
+        """
+        orb.log.info('* [orb] setting vault quota preference ...')
+        try:
+            quota = VAULT_QUOTAS[index]
+            prefs['vault_quota_mb'] = 0 if quota == 'unlimited' else int(quota)
+            orb.log.info(f'        set to "{quota}"')
+        except:
+            orb.log.debug(f'        invalid index ({index})')
+
+    def set_sync_requests_in_flight(self, index):
+        """
+        Set the preferred number of "vger.get_objects" requests to be kept in
+        flight while syncing.
+        """
+        orb.log.info('* [orb] setting sync requests in flight preference ...')
+        try:
+            srif = int(('1', '2', '3', '4', '6', '8')[index])
+            prefs['sync_requests_in_flight'] = srif
+            orb.log.info(f'        set to "{srif}"')
+        except:
+            orb.log.debug(f'        invalid index ({index})')
+
+
+    def set_sync_manifest_digests(self, check_state):
+        """
+        Set whether full library syncs compare bucketed manifest digests with
+        the repository before sending the manifest.
+        """
+        orb.log.info('* [orb] setting sync manifest digests preference ...')
+        prefs['sync_manifest_digests'] = self.smd_checkbox.isChecked()
+        orb.log.info(f'        set to "{self.smd_checkbox.isChecked()}"')
+
+    def set_prefetch_files(self, check_state):
+        """
+        Set whether the model and document files of the current project are
+        downloaded in the background after the project is synced.
+        """
+        orb.log.info('* [orb] setting prefetch files preference ...')
+        prefs['prefetch_files'] = self.pf_checkbox.isChecked()
+        orb.log.info(f'        set to "{self.pf_checkbox.isChecked()}"')
+
 
 class SelectColsDialog(QDialog):
     """
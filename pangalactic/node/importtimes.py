@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Startup timing for pangalaxian (import times, named startup phases, and the
+time to a usable main window), and lazy loading of the heavy subsystems (CAD
+viewer, 42 modeler, ConOps modeler, etc.).
+
+Only the standard library is imported here, so this module can be imported
+first thing in pangalaxian, before the time being measured is spent.
+
+Usage:
+
+    * mark(label) records the elapsed time since the process started at a
+      point in startup ("imports done", "first window", ...)
+    * "with phase(name):" records the start and duration of a named phase of
+      startup (phases may be nested), and the first_call(name) decorator
+      times only the first call of a function as a phase
+    * lazy_import(modname) imports a subsystem module on first use and records
+      how long it took
+    * if the environment variable PGXN_IMPORT_TIMES is set, install() adds an
+      import hook that records the (inclusive) import time of every module
+    * start_profile() profiles startup with cProfile until finish() is called
+      (see write_profile())
+    * write_report(path, version) appends the report to a JSON history file
+      so that regressions in time-to-first-window can be tracked
+
+All times are measured with time.perf_counter() (a monotonic clock) relative
+to T0, i.e. the import of this module.
+"""
+import cProfile, importlib, json, os, pstats, sys, time
+from contextlib import contextmanager
+from functools import wraps
+from importlib.abc import MetaPathFinder
+
+# process start time (approximately -- the interpreter start is not visible)
+T0 = time.perf_counter()
+
+# [(label, seconds since T0)]
+marks = []
+# [[name, start (seconds since T0), duration, nesting depth]] of the completed
+# startup phases
+phases = []
+_phase_depth = 0
+# profiler of startup, if start_profile() was called
+profiler = None
+# set by finish() -- later phases are not recorded
+finished = False
+# {module name: seconds to import (first use)}
+lazy_imports = {}
+# {module name: inclusive seconds to import} (only if install() was called)
+module_times = {}
+
+HISTORY_LENGTH = 20
+
+
+def mark(label):
+    """
+    Record the elapsed time since startup at a named point.
+    """
+    marks.append((label, time.perf_counter() - T0))
+
+
+@contextmanager
+def phase(name):
+    """
+    Context manager that records the start and duration of a named phase of
+    startup (phases may be nested; the nesting depth is recorded).
+    """
+    global _phase_depth
+    if finished:
+        yield
+        return
+    t0 = time.perf_counter() - T0
+    depth = _phase_depth
+    _phase_depth += 1
+    try:
+        yield
+    finally:
+        _phase_depth -= 1
+        phases.append([name, round(t0, 4),
+                       round(time.perf_counter() - T0 - t0, 4), depth])
+
+
+def first_call(name):
+    """
+    Decorator that times only the first call of a function or method as a
+    phase of startup (e.g. the first refresh_tree_views()).
+    """
+    def decorator(func):
+        called = []
+        @wraps(func)
+        def wrapper(*args, **kw):
+            if called or finished:
+                return func(*args, **kw)
+            called.append(True)
+            with phase(name):
+                return func(*args, **kw)
+        return wrapper
+    return decorator
+
+
+def start_profile():
+    """
+    Start profiling startup with cProfile.
+    """
+    global profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+
+def finish():
+    """
+    Stop timing startup phases (and profiling, if started).
+    """
+    global finished
+    if profiler:
+        profiler.disable()
+    # order phases by start time (nested phases complete first)
+    phases.sort(key=lambda p: (p[1], p[3]))
+    finished = True
+
+
+def write_profile(path, n=50):
+    """
+    Dump the startup profile (if any) to `path` (pstats format) and a summary
+    of the `n` most expensive functions (by cumulative time) to `path` +
+    ".txt".
+    """
+    if not profiler:
+        return
+    profiler.dump_stats(path)
+    with open(path + '.txt', 'w') as f:
+        stats = pstats.Stats(profiler, stream=f)
+        stats.sort_stats('cumulative').print_stats(n)
+
+
+def lazy_import(modname):
+    """
+    Import a module on first use, recording how long the import took.
+
+    Args:
+        modname (str):  the full name of the module
+
+    Returns:
+        module:  the imported module
+    """
+    mod = sys.modules.get(modname)
+    if mod is not None:
+        return mod
+    t0 = time.perf_counter()
+    mod = importlib.import_module(modname)
+    lazy_imports[modname] = time.perf_counter() - t0
+    return mod
+
+
+class _TimedLoader(object):
+    """
+    Loader wrapper that times exec_module() of the wrapped loader.
+    """
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        t0 = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            module_times[module.__name__] = time.perf_counter() - t0
+
+
+class ImportTimer(MetaPathFinder):
+    """
+    Meta path finder that wraps the loaders found by the other finders so
+    that the (inclusive) import time of each module is recorded.
+    """
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if (spec.loader is not None
+                    and hasattr(spec.loader, 'exec_module')):
+                    spec.loader = _TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def install():
+    """
+    Install the ImportTimer if the environment variable PGXN_IMPORT_TIMES is
+    set (it adds some overhead to every import, so it is opt-in).
+    """
+    if os.environ.get('PGXN_IMPORT_TIMES'):
+        if not any(isinstance(f, ImportTimer) for f in sys.meta_path):
+            sys.meta_path.insert(0, ImportTimer())
+
+
+def report(n_modules=30):
+    """
+    Return the startup report (marks, phases, and import times) as a dict.
+
+    Keyword Args:
+        n_modules (int):  number of slowest modules to include (if module
+            times were recorded)
+    """
+    slowest = sorted(module_times.items(), key=lambda x: -x[1])[:n_modules]
+    return dict(marks=[[label, round(t, 4)] for label, t in marks],
+                phases=phases,
+                lazy_imports={m: round(t, 4) for m, t in
+                              lazy_imports.items()},
+                slowest_modules=[[m, round(t, 4)] for m, t in slowest])
+
+
+def write_report(path, version=''):
+    """
+    Append the startup report to a JSON history file (keeping the last
+    HISTORY_LENGTH reports).
+
+    Args:
+        path (str):  path of the history file
+
+    Keyword Args:
+        version (str):  the app version
+    """
+    history = []
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = []
+    entry = report()
+    entry['version'] = version
+    entry['date'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    history = (history + [entry])[-HISTORY_LENGTH:]
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=1)
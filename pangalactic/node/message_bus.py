@@ -1,11 +1,91 @@
 # -*- coding: utf-8 -*-
-import txaio, websocket
+import json, random, sys, time, txaio, websocket
+from collections import deque
 txaio.use_twisted()
 
-from twisted.internet.defer import inlineCallbacks
+from twisted.internet.defer import (CancelledError, Deferred,
+                                    TimeoutError, inlineCallbacks)
+from twisted.python.failure import Failure
 from autobahn.twisted.wamp import (Application, ApplicationRunner,
                                    _ApplicationSession)
 from autobahn.wamp import cryptosign
+from autobahn.wamp.exception import ApplicationError, TransportLost
+from autobahn.wamp.serializer import JsonSerializer
+from autobahn.websocket.compress import (PerMessageDeflateOffer,
+                                         PerMessageDeflateResponse,
+                                         PerMessageDeflateResponseAccept)
+# the binary serializers are only available if their codecs (msgpack, cbor2)
+# are installed
+try:
+    from autobahn.wamp.serializer import MsgPackSerializer
+except ImportError:
+    MsgPackSerializer = None
+try:
+    from autobahn.wamp.serializer import CBORSerializer
+except ImportError:
+    CBORSerializer = None
+
+# pangalactic
+from pangalactic.node.sync import payload_size
+
+
+# WAMP serializers by name (as used in config['bus_serializers'])
+SERIALIZERS = {'msgpack': MsgPackSerializer,
+               'cbor': CBORSerializer,
+               'json': JsonSerializer}
+# the serializers autobahn offers by default, in its order of preference
+# (used when payload stats are recorded but no serializers are configured)
+DEFAULT_SERIALIZERS = ['cbor', 'msgpack', 'json']
+
+# rpcs that can safely be re-issued if the transport is lost before their
+# results are received (reads, and writes that set absolute values) -- see
+# PgxnAuthSession.call()
+IDEMPOTENT_RPCS = {'vger.get_user_roles', 'vger.get_parmz',
+                   'vger.get_objects', 'vger.get_object', 'vger.get_people',
+                   'vger.get_manifest_digests', 'vger.sync_objects',
+                   'vger.sync_library_objects', 'vger.sync_project',
+                   'vger.get_lom_surface_names',
+                   'vger.get_lom_structure', 'vger.get_lom_parms',
+                   'vger.download_chunk', 'vger.link_vault_file',
+                   'vger.save',
+                   'vger.set_parameters', 'vger.set_data_elements',
+                   'vger.set_properties'}
+
+# number of times an rpc of an optional repository feature (e.g. parameter
+# deltas) is retried after a timeout or a transport error, before falling back
+# to the plain rpc for that call -- if the repository rejects the call (see
+# rejected() and no_such_procedure()), the feature is turned off instead
+FEATURE_RPC_RETRIES = 2
+
+# idempotent rpcs that are links in the sync chain -- when they are parked,
+# they are not re-issued when the next session joins, but are held until the
+# app either restarts the sync (which supersedes them -- see
+# PgxnMessageBus.discard_parked()) or resumes them
+SYNC_CHAIN_RPCS = {'vger.get_user_roles', 'vger.sync_objects',
+                   'vger.sync_library_objects', 'vger.sync_project',
+                   'vger.get_objects', 'vger.get_parmz',
+                   'vger.get_manifest_digests'}
+
+# functions that only forward rpcs for their callers -- the call site
+# recorded in the rpc stats is the first caller that is not one of them (see
+# rpc_call_site())
+RPC_WRAPPERS = {'send_rpc', 'call_sync_rpc', 'call_cursor_sync',
+                'call_digest_sync'}
+
+
+def rpc_call_site(depth=1):
+    """
+    Return the name of the function that is the call site of an rpc:  the
+    caller `depth` frames up from the caller of this function, or the first
+    caller beyond it that is not an rpc wrapper (see RPC_WRAPPERS).
+
+    Keyword Args:
+        depth (int):  number of frames up from the caller of this function
+    """
+    frame = sys._getframe(depth + 1)
+    while frame.f_code.co_name in RPC_WRAPPERS and frame.f_back:
+        frame = frame.f_back
+    return frame.f_code.co_name
 
 
 def reachable(url):
@@ -89,6 +169,10 @@ class PgxnAuthSession(_ApplicationSession):
             yield self.subscribe(handler, uri)
 
         self.details = details
+        # re-issue any idempotent calls that were in flight when the previous
+        # session's transport was lost (except sync chain calls, which the
+        # "onjoined" handler either discards or resumes)
+        self.app.resume_calls(self, exclude=self.app.sync_chain_rpcs)
         yield self.app._fire_signal('onjoined')
         self.log.info("  onJoin: session joined: {}".format(details))
 
@@ -109,6 +193,93 @@ class PgxnAuthSession(_ApplicationSession):
         yield self.app._fire_signal('ondisconnect')
         self.log.info("  + session disconnected")
 
+    def call(self, procedure, *args, call_site=None, **kw):
+        """
+        Call a remote procedure, applying the configured timeout for the uri
+        (if any) and recording the latency, payload sizes, and outcome of the
+        call in the app's RpcStats (see PgxnMessageBus).  Calls of idempotent
+        rpcs (see PgxnMessageBus.idempotent_rpcs) survive the loss of the
+        transport:  they are parked and re-issued when the next session joins.
+
+        Keyword Args:
+            call_site (str):  call site to be recorded in the stats (not sent
+                to the procedure) -- needed for calls made by schedulers or
+                callback chains; default: the calling function (see
+                rpc_call_site())
+        """
+        site = call_site or rpc_call_site()
+        if procedure not in self.app.idempotent_rpcs:
+            return self._call(site, procedure, *args, **kw)
+        outer = Deferred()
+        self._call_resumable(outer, site, procedure, args, kw)
+        return outer
+
+    def _call_resumable(self, outer, site, procedure, args, kw):
+        """
+        Call an idempotent rpc, passing its result or failure to the `outer`
+        Deferred -- unless the transport is lost first, in which case the
+        call is parked in the app (see PgxnMessageBus.resume_calls()).
+        """
+        if outer.called:
+            # cancelled (e.g. timed out) while parked
+            return
+        def park():
+            self.log.info(f'  + transport lost: "{procedure}" parked')
+            self.app.parked.append((outer, site, procedure, args, kw))
+        def on_failure(f):
+            if transport_lost(f):
+                park()
+            elif not outer.called:
+                outer.errback(f)
+        try:
+            d = self._call(site, procedure, *args, **kw)
+        except TransportLost:
+            park()
+            return
+        d.addCallbacks(lambda res: outer.called or outer.callback(res),
+                       on_failure)
+
+    def _call(self, site, procedure, *args, **kw):
+        t0 = time.perf_counter()
+        d = _ApplicationSession.call(self, procedure, *args, **kw)
+        # count the calls in flight (background transfers pause while there
+        # are any) -- this is added first, so the count is down before the
+        # caller's callbacks run
+        self.app.in_flight += 1
+        def done(res):
+            self.app.in_flight -= 1
+            return res
+        d.addBoth(done)
+        timeouts = self.app.rpc_timeouts or {}
+        timeout = timeouts.get(procedure, timeouts.get('default'))
+        if timeout:
+            # NOTE: the reactor must not be imported at module level, since
+            # pangalaxian installs the qt5reactor after importing this module
+            from twisted.internet import reactor
+            d.addTimeout(timeout, reactor)
+        stats = self.app.rpc_stats
+        if stats is None:
+            return d
+        req_bytes = None
+        if stats.sizes:
+            req_bytes = payload_size([args, kw])
+        def record(res):
+            if not isinstance(res, Failure):
+                outcome = 'ok'
+            elif res.check(CancelledError, TimeoutError):
+                outcome = 'timeout'
+            else:
+                outcome = 'failed'
+            resp_bytes = None
+            if stats.sizes and outcome == 'ok':
+                resp_bytes = payload_size(res)
+            stats.record(procedure, site, time.perf_counter() - t0,
+                         outcome=outcome, timeout=timeout,
+                         req_bytes=req_bytes, resp_bytes=resp_bytes)
+            return res
+        d.addBoth(record)
+        return d
+
     def send_rpc(self, rpc, *args, **kw):
         """
         Send a remote procedure call.  (This method is implemented solely for
@@ -118,6 +289,294 @@ class PgxnAuthSession(_ApplicationSession):
         return self.call(rpc, *args, **kw)
 
 
+def transport_lost(f):
+    """
+    Return True if the Failure `f` of an rpc is due to the loss of the
+    transport (rather than an error or a timeout).
+    """
+    if f.check(TransportLost):
+        return True
+    return bool(f.check(ApplicationError) and
+                getattr(f.value, 'error', '') == 'wamp.close.transport_lost')
+
+
+def no_such_procedure(f):
+    """
+    Return True if the Failure `f` of an rpc is due to the repository not
+    having the procedure (e.g. an older repository), in which case the
+    feature that uses it can be turned off -- after any other failure the
+    call may be retried.
+    """
+    return bool(f.check(ApplicationError) and
+                getattr(f.value, 'error', '') ==
+                ApplicationError.NO_SUCH_PROCEDURE)
+
+
+def rejected(f):
+    """
+    Return True if the Failure `f` of an rpc is an application-level
+    rejection by the repository (an ApplicationError other than the loss of
+    the transport), as opposed to a timeout, a cancellation, or a local or
+    transport error, after which the call may be retried.
+    """
+    return bool(f.check(ApplicationError)) and not transport_lost(f)
+
+
+class Backoff(object):
+    """
+    Exponential backoff with jitter for reconnect attempts:  the n-th delay
+    is initial * factor**n, capped at `maximum`, and reduced by a random
+    fraction (up to `jitter`) so that many clients cut off by the same
+    outage do not all reconnect at once.
+
+    Attributes:
+        attempts (int):  number of delays returned since the last reset()
+    """
+    def __init__(self, initial=1.0, maximum=60.0, factor=2.0, jitter=0.5,
+                 rand=random.random):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.rand = rand
+        self.attempts = 0
+
+    def next_delay(self):
+        """
+        Return the next delay [seconds].
+        """
+        delay = min(self.maximum, self.initial * self.factor ** self.attempts)
+        self.attempts += 1
+        return delay * (1.0 - self.jitter * self.rand())
+
+    def reset(self):
+        self.attempts = 0
+
+
+def get_serializers(names, stats=None):
+    """
+    Return WAMP serializer instances in order of preference for the specified
+    serializer names, skipping any whose codec is not installed.  JSON is
+    always appended as the last resort, since every router supports it.
+
+    Args:
+        names (list of str):  serializer names ("msgpack", "cbor", "json")
+
+    Keyword Args:
+        stats (PayloadStats):  if specified, wrap the serializers so that
+            their payload sizes and encode/decode times are recorded
+
+    Returns:
+        list:  serializer instances
+    """
+    serializers = []
+    for name in list(names or []) + ['json']:
+        cls = SERIALIZERS.get(name)
+        if cls is None or any(isinstance(s, cls) or
+                              isinstance(getattr(s, 'serializer', None), cls)
+                              for s in serializers):
+            continue
+        serializer = cls()
+        if stats is not None:
+            serializer = MeasuredSerializer(serializer, stats)
+        serializers.append(serializer)
+    return serializers
+
+
+def accept_deflate(response):
+    """
+    Accept a permessage-deflate response from the router (the server may
+    decline, in which case messages are sent uncompressed).
+    """
+    if isinstance(response, PerMessageDeflateResponse):
+        return PerMessageDeflateResponseAccept(response)
+
+
+class PayloadStats(object):
+    """
+    Payload sizes and encode/decode times of WAMP messages, by serializer and
+    direction ("out" or "in").  Sizes are those of the serialized payloads
+    (before any permessage-deflate compression, whose effect is reported by
+    the websocket traffic stats -- see PgxnMessageBus.traffic_stats()).
+
+    Attributes:
+        stats (dict):  maps (serializer id, direction) to a dict with the keys
+            "messages", "bytes", "max" (largest payload [bytes]), "time"
+            (total encode or decode time [seconds]), and "sizes" (the most
+            recent payload sizes)
+    """
+    def __init__(self, keep=1000):
+        self.keep = keep
+        self.stats = {}
+
+    def record(self, serializer_id, direction, n_bytes, elapsed):
+        key = (serializer_id, direction)
+        if key not in self.stats:
+            self.stats[key] = dict(messages=0, bytes=0, max=0, time=0.0,
+                                   sizes=deque(maxlen=self.keep))
+        s = self.stats[key]
+        s['messages'] += 1
+        s['bytes'] += n_bytes
+        s['max'] = max(s['max'], n_bytes)
+        s['time'] += elapsed
+        s['sizes'].append(n_bytes)
+
+    def report(self):
+        """
+        Return a list of (serializer id, direction, summary dict) sorted by
+        serializer and direction, where the summary dict has the keys
+        "messages", "bytes", "mean" and "p95" (payload sizes [bytes] of the
+        recent messages), "max" [bytes], and "time" [seconds].
+        """
+        rows = []
+        for (ser_id, direction), s in sorted(self.stats.items()):
+            rows.append((ser_id, direction,
+                         dict(messages=s['messages'], bytes=s['bytes'],
+                              mean=s['bytes'] / s['messages'],
+                              p95=percentile(s['sizes'], 95),
+                              max=s['max'], time=s['time'])))
+        return rows
+
+
+def percentile(values, q):
+    """
+    Return the q-th percentile (0 <= q <= 100) of a list of numbers (the
+    nearest-rank value), or 0 if the list is empty.
+    """
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+class RpcStats(object):
+    """
+    Latency, payload sizes, and outcomes of rpcs, by uri and by call site
+    (the name of the function that called session.call()).  Latencies are
+    kept for the most recent `keep` calls of each uri, so the percentiles are
+    rolling.
+
+    Attributes:
+        sizes (bool):  whether request and response payload sizes are
+            measured (this requires JSON-encoding the arguments and results,
+            which is not free for large payloads)
+        stats (dict):  maps uri to a dict with the keys "calls", "failed",
+            "timeouts", "timeout" (the last timeout applied [seconds]),
+            "time" (total latency [seconds]), "max" [seconds], "req_bytes",
+            "resp_bytes", "latencies" (the most recent latencies), and
+            "sites" (maps call site to [calls, total latency])
+    """
+    def __init__(self, keep=500, sizes=False):
+        self.keep = keep
+        self.sizes = sizes
+        self.stats = {}
+
+    def record(self, uri, site, latency, outcome='ok', timeout=None,
+               req_bytes=None, resp_bytes=None):
+        """
+        Record an rpc.
+
+        Args:
+            uri (str):  the rpc uri
+            site (str):  the call site
+            latency (float):  seconds from the call to its result or failure
+
+        Keyword Args:
+            outcome (str):  "ok", "failed", or "timeout"
+            timeout (float):  the timeout applied to the call, if any
+            req_bytes (int):  request payload size, if measured
+            resp_bytes (int):  response payload size, if measured
+        """
+        if uri not in self.stats:
+            self.stats[uri] = dict(calls=0, failed=0, timeouts=0,
+                                   timeout=None, time=0.0, max=0.0,
+                                   req_bytes=0, resp_bytes=0,
+                                   latencies=deque(maxlen=self.keep),
+                                   sites={})
+        s = self.stats[uri]
+        s['calls'] += 1
+        if outcome == 'failed':
+            s['failed'] += 1
+        elif outcome == 'timeout':
+            s['timeouts'] += 1
+        if timeout:
+            s['timeout'] = timeout
+        s['time'] += latency
+        s['max'] = max(s['max'], latency)
+        s['req_bytes'] += req_bytes or 0
+        s['resp_bytes'] += resp_bytes or 0
+        s['latencies'].append(latency)
+        site_stats = s['sites'].setdefault(site, [0, 0.0])
+        site_stats[0] += 1
+        site_stats[1] += latency
+
+    def report(self):
+        """
+        Return a list of (uri, summary dict) sorted by total latency (largest
+        first), where the summary dict has the keys "calls", "failed",
+        "timeouts", "timeout", "time", "p50", "p95", "p99", "max" [seconds],
+        "req_bytes", "resp_bytes", and "sites" (list of [site, calls, total
+        latency], largest total first).
+        """
+        rows = []
+        for uri, s in self.stats.items():
+            lats = list(s['latencies'])
+            summary = {k: s[k] for k in ['calls', 'failed', 'timeouts',
+                                         'timeout', 'time', 'max',
+                                         'req_bytes', 'resp_bytes']}
+            for q in [50, 95, 99]:
+                summary[f'p{q}'] = percentile(lats, q)
+            summary['sites'] = sorted(([site, n, t] for site, (n, t) in
+                                       s['sites'].items()),
+                                      key=lambda x: -x[2])
+            rows.append((uri, summary))
+        return sorted(rows, key=lambda x: -x[1]['time'])
+
+    def write(self, path):
+        """
+        Write the report to a JSON file.
+        """
+        rpt = dict(date=time.strftime('%Y-%m-%d %H:%M:%S'),
+                   rpcs=[dict(uri=uri, **summary)
+                         for uri, summary in self.report()])
+        with open(path, 'w') as f:
+            json.dump(rpt, f, indent=1)
+
+
+class MeasuredSerializer(object):
+    """
+    Wrapper for a WAMP serializer that records the payload size and the
+    encode/decode time of each message in a PayloadStats instance.
+    """
+    def __init__(self, serializer, stats):
+        self.serializer = serializer
+        self.payload_stats = stats
+
+    def __getattr__(self, name):
+        # delegate everything else (SERIALIZER_ID, MIME_TYPE, etc.) -- but not
+        # dunder names or 'serializer' itself, which are looked up here when
+        # the instance is not (yet) initialized, e.g. by copy.copy(), and
+        # would otherwise recurse forever
+        if name == 'serializer' or (name.startswith('__')
+                                    and name.endswith('__')):
+            raise AttributeError(name)
+        return getattr(self.serializer, name)
+
+    def serialize(self, obj):
+        t0 = time.perf_counter()
+        payload, is_binary = self.serializer.serialize(obj)
+        self.payload_stats.record(self.serializer.SERIALIZER_ID, 'out',
+                                  len(payload), time.perf_counter() - t0)
+        return payload, is_binary
+
+    def unserialize(self, payload, isBinary=None):
+        t0 = time.perf_counter()
+        msgs = self.serializer.unserialize(payload, isBinary=isBinary)
+        self.payload_stats.record(self.serializer.SERIALIZER_ID, 'in',
+                                  len(payload), time.perf_counter() - t0)
+        return msgs
+
+
 class NullLogger(object):
     info = debug = lambda x: None
 
@@ -132,6 +591,19 @@ class PgxnMessageBus(Application):
         Application.__init__(self, prefix=prefix)
         self.extra = {}
         self.log = NullLogger()
+        self.payload_stats = None
+        # rpc instrumentation (see PgxnAuthSession.call()) -- rpc_stats is an
+        # RpcStats instance and rpc_timeouts maps rpc uris (or "default") to
+        # timeouts [seconds]
+        self.rpc_stats = None
+        self.rpc_timeouts = {}
+        # calls of idempotent rpcs that were in flight when the transport was
+        # lost, as (deferred, site, uri, args, kw) -- see resume_calls()
+        self.idempotent_rpcs = IDEMPOTENT_RPCS
+        self.sync_chain_rpcs = SYNC_CHAIN_RPCS
+        self.parked = []
+        # number of rpcs in flight (see PgxnAuthSession._call())
+        self.in_flight = 0
 
     def set_authid(self, authid):
         self.extra['authid'] = authid
@@ -158,8 +630,61 @@ class PgxnMessageBus(Application):
         self.session = PgxnAuthSession(config, self, self.auth_method)
         return self.session
 
+    def resume_calls(self, session, exclude=()):
+        """
+        Re-issue the parked idempotent calls on a new session (called when the
+        session joins).
+
+        Args:
+            session (PgxnAuthSession):  the new session
+
+        Keyword Args:
+            exclude (set of str):  uris of calls to leave parked
+        """
+        parked = [p for p in self.parked if p[2] not in exclude]
+        self.parked = [p for p in self.parked if p[2] in exclude]
+        if parked:
+            self.log.info(f'  + re-issuing {len(parked)} parked call(s)')
+        for outer, site, procedure, args, kw in parked:
+            session._call_resumable(outer, site, procedure, args, kw)
+
+    def discard_parked(self, uris):
+        """
+        Discard the parked calls of the specified rpcs without firing their
+        Deferreds (e.g. the calls of an interrupted sync chain, when the sync
+        is restarted), so that none of their callbacks run.
+
+        Args:
+            uris (set of str):  uris of the calls to discard
+        """
+        discarded = [p for p in self.parked if p[2] in uris]
+        self.parked = [p for p in self.parked if p[2] not in uris]
+        if discarded:
+            self.log.info(f'  + discarded {len(discarded)} parked call(s)')
+
+    def drop_parked(self):
+        """
+        Fail the parked calls (e.g. when the user disconnects), so that their
+        errbacks run.
+        """
+        parked, self.parked = self.parked, []
+        for outer, site, procedure, args, kw in parked:
+            if not outer.called:
+                outer.errback(TransportLost())
+
+    def traffic_stats(self):
+        """
+        Return the websocket traffic stats of the current connection (wire
+        level vs. websocket level octets, i.e. the effect of compression), or
+        None if not connected.
+        """
+        transport = getattr(self.session, '_transport', None)
+        return getattr(transport, 'trafficStats', None)
+
     def run(self, url="ws://localhost:8080/ws", realm="realm1",
-            auth_method='cryptosign', start_reactor=True, ssl=None):
+            auth_method='cryptosign', start_reactor=True, ssl=None,
+            serializers=None, compression=False, payload_stats=False,
+            auto_reconnect=True):
         """
         Run the message bus with specified arguments.
 
@@ -169,10 +694,38 @@ class PgxnMessageBus(Application):
             auth_method (str): WAMP auth method ("cryptosign" or "ticket")
             start_reactor (bool): start the twisted reactor
             ssl (dict): server cert info for TLS connection
+            serializers (list of str): preferred serializers, in order
+                ("msgpack", "cbor", "json") -- if not specified, autobahn's
+                defaults are used
+            compression (bool): offer permessage-deflate compression
+            payload_stats (bool): record payload sizes and encode/decode
+                times of all messages (in self.payload_stats)
+            auto_reconnect (bool): let the runner reconnect when the
+                transport is lost (pangalaxian turns this off and schedules
+                reconnects itself)
+
+        Returns:
+            Deferred:  if start_reactor is False, fires when connected (or
+                fails if the connection cannot be made)
         """
         self.auth_method = auth_method
+        websocket_options = {'maxMessagePayloadSize': 0}
+        if compression:
+            websocket_options['perMessageCompressionOffers'] = [
+                PerMessageDeflateOffer(accept_max_window_bits=True,
+                                       accept_no_context_takeover=True)]
+            websocket_options['perMessageCompressionAccept'] = accept_deflate
+        if payload_stats:
+            self.payload_stats = self.payload_stats or PayloadStats()
+            # measure the configured serializers, or autobahn's defaults
+            serializers = serializers or DEFAULT_SERIALIZERS
+        wamp_serializers = None
+        if serializers:
+            wamp_serializers = get_serializers(serializers,
+                                               stats=self.payload_stats)
         self.runner = ApplicationRunner(url, realm, ssl=ssl,
-                                websocket_options={'maxMessagePayloadSize': 0})
+                                        serializers=wamp_serializers,
+                                        websocket_options=websocket_options)
         return self.runner.run(self.__call__, start_reactor,
-                               auto_reconnect=True)
+                               auto_reconnect=auto_reconnect)
 
@@ -33,9 +33,14 @@ Pangalaxian (the PanGalactic GUI client) main window
 # ANY SUCH MATTER SHALL BE THE IMMEDIATE, UNILATERAL TERMINATION OF THIS
 # AGREEMENT.
 
-import argparse, atexit, json, math, os, shutil
-import sys, time, webbrowser
-# import traceback
+# import-time tracking -- import this before anything else so the time spent
+# importing everything else is measured
+from pangalactic.node import importtimes
+importtimes.install()
+
+import argparse, atexit, json, os, shutil
+import sys, time, traceback, webbrowser
+from collections import deque
 import urllib.parse, urllib.request, urllib.error
 from datetime import timedelta
 from functools import partial
@@ -95,7 +100,6 @@ from pangalactic.core                  import state, write_state
 from pangalactic.core                  import trash, write_trash
 from pangalactic.core.access           import get_perms, is_global_admin
 from pangalactic.core.clone            import clone
-from pangalactic.core.datastructures   import chunkify
 from pangalactic.core.meta             import asciify
 from pangalactic.core.names            import get_external_name_plural
 from pangalactic.core.parametrics      import (data_elementz,
@@ -109,18 +113,17 @@ from pangalactic.core.parametrics      import (data_elementz,
                                                save_data_elementz, save_parmz,
                                                set_dval)
 from pangalactic.core.refdata          import ref_oids, ref_pd_oids
-from pangalactic.core.serializers      import (DESERIALIZATION_ORDER,
-                                               deserialize, serialize,
+from pangalactic.core.serializers      import (deserialize, serialize,
                                                uncook_datetime)
 from pangalactic.core.test.utils       import (create_test_project,
                                                create_test_users)
 from pangalactic.core.utils.datetimes  import dtstamp, date2str
 from pangalactic.core.utils.reports    import write_mel_xlsx_from_model
-from pangalactic.core.validation       import check_for_cycles, get_level_count
-from pangalactic.node.admin            import AdminDialog, PersonSearchDialog
+from pangalactic.node.assemblygraph    import assembly_graph
 from pangalactic.node.buttons          import ButtonLabel, MenuButton
-from pangalactic.node.cad.viewer       import Model3dDialog, Model3DViewer
-from pangalactic.node.conops           import ConOpsModeler
+# NOTE:  the heavy subsystems -- admin, cad.viewer (pythonocc), conops (and
+# powermodeler, which pulls in qwt and numpy), interface42, rqtmanager and
+# rqtwizard -- are imported on first use (see importtimes.lazy_import)
 # from pangalactic.node.dashboards       import SystemDashboard
 from pangalactic.node.dashboards       import MultiDashboard
 from pangalactic.node.dialogs          import (FullSyncDialog,
@@ -130,28 +133,54 @@ from pangalactic.node.dialogs          import (FullSyncDialog,
                                                ParmDefsDialog, PrefsDialog,
                                                ProgressDialog, VersionDialog)
 from pangalactic.node.filters          import FilterPanel, ProductFilterDialog
-from pangalactic.node.interface42      import SC42Window
+from pangalactic.node.importtimes      import lazy_import
 from pangalactic.node.libraries        import (LibraryDialog,
                                                CompoundLibraryWidget,
                                                select_product_types)
-from pangalactic.node.message_bus      import PgxnMessageBus
+from pangalactic.node.message_bus      import (Backoff,
+                                               FEATURE_RPC_RETRIES,
+                                               no_such_procedure,
+                                               PgxnMessageBus,
+                                               rejected, rpc_call_site,
+                                               RpcStats, transport_lost)
 from pangalactic.node.blockmodeler     import ModelWindow, ProductInfoPanel
 from pangalactic.node.pgxnobject       import PgxnObject
-from pangalactic.node.rqtmanager       import RequirementManager
-from pangalactic.node.rqtwizard        import RqtWizard, rqt_wizard_state
 from pangalactic.node.splash           import SplashScreen
 from pangalactic.node.startup          import setup_dirs_and_state
+from pangalactic.node.sync             import (ChunkScheduler, ChunkSizer,
+                                               apply_parmz_delta,
+                                               clear_sync_cursors,
+                                               deserialize_in_batches,
+                                               coalesce_pubsub_msgs,
+                                               dirty_since,
+                                               get_sync_cursor,
+                                               group_by_class,
+                                               is_versioned_parmz,
+                                               LIBRARY_SYNC_CNAMES,
+                                               ManifestDigests,
+                                               JOURNAL_OPS,
+                                               OpJournal,
+                                               RpcBatcher,
+                                               savepoint,
+                                               set_sync_cursor,
+                                               HandlerStats,
+                                               RECEIVED_OBJECTS)
 from pangalactic.node.systemtree       import SystemTreeView
 # CompareWidget is only used in compare_items(), which is temporarily removed
 # from pangalactic.node.tableviews       import CompareWidget
 # from pangalactic.node.tableviews       import ObjectTableView
-from pangalactic.node.threads          import threadpool, Worker
+from pangalactic.node.transfer         import (ChunkDownloader,
+                                               ChunkUploader, Prefetcher)
+from pangalactic.node.utils            import Coalescer
+from pangalactic.node.vault            import ContentVault
 from pangalactic.node.widgets          import (AutosizingListWidget, Gripper,
                                                ModeLabel, PlaceHolder)
 from pangalactic.node.wizards          import (NewProductWizard,
                                                DataImportWizard,
                                                wizard_state)
 
+importtimes.mark('imports done')
+
 
 class Main(QMainWindow):
     """
@@ -269,6 +298,58 @@ class Main(QMainWindow):
         self.sys_tree_rebuilt = False
         self.dashboard_rebuilt = False
         self.project_oids = []
+        # bursts of remote changes ("new", "modified", "decloaked", and
+        # "parameters set" messages) are coalesced into at most one
+        # vger.get_parmz() call -- and therefore one combined view update --
+        # per window of prefs['refresh_window'] milliseconds
+        self.parmz_refresh = Coalescer(self.on_parmz_refresh_due,
+                                       interval=prefs.get('refresh_window')
+                                       or 250)
+        # inbound pubsub messages are queued and processed in batches (see
+        # on_pubsub_msg() and process_pubsub_queue())
+        self.pubsub_queue = deque()
+        self.processing_pubsub = False
+        self.pubsub_stats = HandlerStats()
+        self.pubsub_batcher = Coalescer(self.process_pubsub_queue,
+                                        interval=prefs.get(
+                                        'pubsub_batch_window') or 50)
+        self.pubsub_handlers = {
+            RECEIVED_OBJECTS: self.on_received_objects,
+            'new mode defs': self.on_remote_mode_defs,
+            'comp mode datum updated': self.on_remote_comp_mode_datum,
+            'deleted': self.on_remote_deleted,
+            'frozen': self.on_remote_frozen,
+            'thawed': self.on_remote_thawed,
+            'properties set': self.on_remote_properties_set,
+            'parameters set': self.on_remote_parameters_set,
+            'data elements set': self.on_remote_data_elements_set,
+            'de added': self.on_remote_de_added,
+            'de del': self.on_remote_de_del,
+            'parm added': self.on_remote_parm_added,
+            'parm del': self.on_remote_parm_del,
+            'lom parms': self.on_remote_lom_parms,
+            'organization': self.on_remote_organization,
+            'person added': self.on_remote_person_added}
+        # updates to be sent to the repository are batched for a short window
+        # (see flush_rpc_batch())
+        self.rpc_batch = RpcBatcher()
+        self.rpc_flusher = Coalescer(self.flush_rpc_batch,
+                                     interval=prefs.get('rpc_batch_window')
+                                              or 100)
+        # sync cursors (see call_sync_rpc()) -- "sync_started" maps each sync
+        # scope to the local datetime string when its current sync started
+        self.sync_cursors_supported = True
+        self.sync_started = {}
+        # bucketed digests of the local library manifest, compared with the
+        # repository's when a full manifest sync would otherwise be needed
+        # (see call_digest_sync()) -- built on first use and then maintained
+        # as library objects are saved and deleted
+        n_buckets = config.get('sync_digest_buckets') or 256
+        self.manifest_digests = ManifestDigests(n_buckets=n_buckets)
+        self.manifest_digests_supported = True
+        # use the delta protocol for vger.get_parmz() unless the repository
+        # turns out not to support it (see get_parmz())
+        self.parmz_deltas = True
         # the "client" state is needed to enable the 'access' module to
         # differentiate permissions between client and server
         state['client'] = True
@@ -319,7 +400,8 @@ class Main(QMainWindow):
         # =====================================================================
         # start up the orb and do some orb stuff, including setting the home
         # directory and related directories (added to state)
-        orb.start(home=home, console=console, debug=debug)
+        with importtimes.phase('orb.start (local db and caches)'):
+            orb.start(home=home, console=console, debug=debug)
         self.add_splash_msg('... database initialized ...')
         # orb.start() calls load_reference_data(), which includes parameter
         # definitions ... load_reference_data() also loads the data from
@@ -328,8 +410,41 @@ class Main(QMainWindow):
         # missing or unreadable, the user will be informed at startup that
         # parameters and/or data_elements will be unavailable until the next
         # repository sync.
-        setup_dirs_and_state()
-        self.get_or_create_local_user()
+        with importtimes.phase('setup_dirs_and_state'):
+            setup_dirs_and_state()
+        with importtimes.phase('get_or_create_local_user'):
+            self.get_or_create_local_user()
+        # updates made while not connected are recorded in a journal and
+        # replayed when the next login succeeds (see replay_op_journal())
+        self.op_journal = OpJournal(os.path.join(orb.home, 'journal.jsonl'))
+        # files in the local vault are stored once per distinct content (see
+        # pangalactic.node.vault) -- the repository is asked whether it has a
+        # file's content before the file is uploaded
+        self.vault = ContentVault(orb.vault)
+        self.vault_dedup_supported = True
+        # downloaded files are a size-bounded cache (prefs['vault_quota_mb'])
+        self.enforce_vault_quota()
+        self.uploader = None
+        # model and document files of the current project are optionally
+        # prefetched in the background after the project is synced (see
+        # start_prefetch())
+        self.prefetcher = None
+        self.replaying_journal = False
+        # sequence number of the last journal entry being replayed -- entries
+        # journaled during the replay are kept (see on_op_journal_replayed())
+        self.replayed_seq = 0
+        # latency, payload sizes, and outcomes of all rpcs (see
+        # show_rpc_stats()) -- kept across reconnects
+        self.rpc_stats = RpcStats()
+        # when the transport is lost, reconnect attempts are scheduled on the
+        # reactor with exponential backoff (see on_transport_lost()) -- and
+        # only the channel subscriptions that were lost are renewed
+        self.reconnect_backoff = Backoff(
+                            initial=prefs.get('reconnect_initial_delay') or 1,
+                            maximum=prefs.get('reconnect_max_delay') or 60)
+        self.reconnect_call = None
+        self.connect_timeout = None
+        self.subscriptions = {}
         self.add_splash_msg('... logging started ...')
         # NOTES ON `config` and `state`:
         # * config vars can be modified by the user locally (in the home dir),
@@ -389,7 +504,8 @@ class Main(QMainWindow):
         self.mode_widget_actions = dict((mode, set()) for mode in self.modes)
         self.mode_widget_actions['all'] = set()  # for actions visible in all modes
         # NOTE: the following function calls are *very* order-dependent!
-        self._create_actions()
+        with importtimes.phase('_create_actions'):
+            self._create_actions()
         orb.log.debug('*** projects:  %s' % str([p.id for p in self.projects]))
         self.add_splash_msg('... projects identified ...')
         screen_resolution = QApplication.desktop().screenGeometry()
@@ -397,7 +513,8 @@ class Main(QMainWindow):
         default_height = min(screen_resolution.height(), 800)
         width = state.get('width') or default_width
         height = state.get('height') or default_height
-        self._init_ui(width, height)
+        with importtimes.phase('_init_ui'):
+            self._init_ui(width, height)
         state['width'] = width
         state['height'] = height
         # set state vars related to sync processes ...
@@ -432,6 +549,13 @@ class Main(QMainWindow):
         dispatcher.connect(self.on_des_set, 'des set')
         dispatcher.connect(self.on_de_del, 'de del')
         dispatcher.connect(self.on_deleted_object_signal, 'deleted object')
+        # keep the library manifest digests current
+        dispatcher.connect(self.update_manifest_digests, 'new object')
+        dispatcher.connect(self.update_manifest_digests, 'modified object')
+        dispatcher.connect(self.update_manifest_digests, 'new objects')
+        dispatcher.connect(self.update_manifest_digests, 'modified objects')
+        dispatcher.connect(self.discard_from_manifest_digests,
+                           'deleted object')
         dispatcher.connect(self.on_parms_set, 'parms set')
         dispatcher.connect(self.on_parm_del, 'parm del')
         dispatcher.connect(self.on_parm_added, 'parm added')
@@ -459,6 +583,7 @@ class Main(QMainWindow):
         dispatcher.connect(self.on_add_update_model, 'add update model')
         dispatcher.connect(self.on_add_update_doc, 'add update doc')
         dispatcher.connect(self.download_file, 'download file')
+        dispatcher.connect(self.on_vault_file_accessed, 'vault file accessed')
         dispatcher.connect(self.open_doc_file, 'open doc file')
         dispatcher.connect(self.get_lom_surf_names, 'get lom surface names')
         dispatcher.connect(self.get_lom_structure, 'get lom structure')
@@ -477,15 +602,19 @@ class Main(QMainWindow):
         # NOTE:  to set mode, use self.[mode]_action.trigger() --
         # the left dock widgets are created by these actions
         self.add_splash_msg('... configuring interface ...')
-        if mode == 'component':
-            self.component_mode_action.trigger()
-        elif mode == 'system':
-            self.system_mode_action.trigger()
-        elif mode == 'db':
-            self.db_mode_action.trigger()
+        with importtimes.phase(f'initial mode ({mode})'):
+            if mode == 'component':
+                self.component_mode_action.trigger()
+            elif mode == 'system':
+                self.system_mode_action.trigger()
+            elif mode == 'db':
+                self.db_mode_action.trigger()
         state['done_with_progress'] = False
         parm_des_unavail = ''
         parms_unavail = orb.parmz_status in ['fail', 'not found']
+        if parms_unavail:
+            # the local parameter cache does not match its version token
+            state['parmz_version'] = None
         des_unavail = orb.data_elementz_status in ['fail', 'not found']
         if parms_unavail and des_unavail:
             parm_des_unavail = 'Parameters and Data Elements are unavailable'
@@ -546,6 +675,7 @@ class Main(QMainWindow):
         orb.log.debug(msg)
 
     def add_splash_msg(self, msg):
+        importtimes.mark('splash: ' + msg.strip(' .'))
         self.splash_msg += msg + '\n'
         dispatcher.send('splash message', message=self.splash_msg)
 
@@ -591,12 +721,20 @@ class Main(QMainWindow):
             ###########################################################
             self.attempting_to_connect = True
             self.mbus = PgxnMessageBus()
+            # rpc instrumentation and timeouts (see get_rpc_options())
+            self.mbus.rpc_stats = self.rpc_stats
+            self.mbus.rpc_timeouts = self.get_rpc_options()
 
             @self.mbus.signal('onjoined')
             def onjoined():
                 orb.log.info('* mbus "onjoined" event received ...')
                 dispatcher.send(signal='onjoined')
 
+            @self.mbus.signal('ondisconnect')
+            def ondisconnect():
+                orb.log.info('* mbus "ondisconnect" event received ...')
+                dispatcher.send(signal='ondisconnect')
+
             if self.auth_method == 'cryptosign':
                 orb.log.info('* using "cryptosign" (public key) auth ...')
                 if not os.path.exists(self.key_path):
@@ -633,9 +771,8 @@ class Main(QMainWindow):
                         orb.log.debug('  - not using tls ...')
                         url = 'ws://{}:{}/ws'.format(host, port)
                     orb.log.debug('  - setting up connection ...')
-                    self.mbus.run(url, auth_method='cryptosign',
-                                  realm='pangalactic-services',
-                                  start_reactor=False, ssl=tls_options)
+                    self.run_mbus(url, auth_method='cryptosign',
+                                  ssl=tls_options)
             else:  # password ("ticket") auth
                 orb.log.info('* using "ticket" (userid/password) auth ...')
                 login_dlg = LoginDialog(userid=state.get('userid', ''),
@@ -665,9 +802,7 @@ class Main(QMainWindow):
                     orb.log.info('  logging in with userid "{}"'.format(
                                                                 login_dlg.userid))
                     orb.log.info('  to url "{}"'.format(url))
-                    self.mbus.run(url, auth_method='ticket',
-                                  realm='pangalactic-services',
-                                  start_reactor=False, ssl=tls_options)
+                    self.run_mbus(url, auth_method='ticket', ssl=tls_options)
                 else:
                     # uncheck button if login dialog is cancelled
                     self.connect_to_bus_action.setChecked(False)
@@ -676,10 +811,25 @@ class Main(QMainWindow):
             self.check_for_connection()
             self.login_label.setText('Logout: ')
         else:
+            # stop any scheduled reconnect and prefetch, and fail any parked
+            # calls
+            self.cancel_reconnect()
+            self.stop_prefetch()
+            if getattr(self, 'mbus', None) is not None:
+                self.mbus.drop_parked()
             if state['connected']:
                 orb.log.info('* disconnecting from message bus ...')
                 self.statusbar.showMessage(
                                         'disconnecting from message bus ...')
+                if getattr(self, 'sync_scheduler', None):
+                    self.sync_scheduler.stop()
+                self.parmz_refresh.cancel()
+                # the session is left right away, so batched updates sent now
+                # could be lost in flight -- journal them instead, to be sent
+                # at the next login (see replay_op_journal())
+                self.rpc_flusher.cancel()
+                if len(self.rpc_batch):
+                    self.journal_batch(self.rpc_batch.take(), force=True)
                 if getattr(self.mbus, 'session', None) is not None:
                     self.mbus.session.leave()
                 if getattr(self.mbus, 'runner', None) is not None:
@@ -697,34 +847,149 @@ class Main(QMainWindow):
                 state['synced_projects'] = []
             else:
                 orb.log.info('* already disconnected from message bus.')
+                # stop reconnecting, if the transport had been lost
+                if getattr(self.mbus, 'runner', None) is not None:
+                    try:
+                        self.mbus.runner.stop()
+                    except Exception:
+                        pass
+                self.mbus = None
             self.login_label.setText('Login: ')
             self.connect_to_bus_action.setToolTip('Connect to the message bus')
         self.update_project_role_labels()
 
+    def run_mbus(self, url, auth_method='cryptosign', ssl=None):
+        """
+        Start connecting the message bus (without blocking:  the connection is
+        made by the reactor).  The arguments are kept so that reconnect
+        attempts can reuse them (see attempt_reconnect()).
+
+        Args:
+            url (str):  url of the crossbar host
+
+        Keyword Args:
+            auth_method (str):  "cryptosign" or "ticket"
+            ssl (CertificateOptions):  tls options, if using tls
+        """
+        self.mbus_run_args = (url, dict(auth_method=auth_method, ssl=ssl))
+        d = self.mbus.run(url, auth_method=auth_method,
+                          realm='pangalactic-services', start_reactor=False,
+                          ssl=ssl, auto_reconnect=False,
+                          **self.get_bus_options())
+        if d is not None:
+            d.addErrback(self.on_mbus_connect_failure)
+
+    def on_mbus_connect_failure(self, f):
+        orb.log.info('* could not connect to message bus: {}'.format(
+                                                        f.getErrorMessage()))
+        self.on_transport_lost()
+
     def check_for_connection(self):
+        """
+        Start a timer (on the reactor, so the gui is not blocked) to check that
+        the connection attempt started by set_bus_state() has succeeded.
+        """
+        if self.connect_timeout is not None and self.connect_timeout.active():
+            self.connect_timeout.cancel()
         if self.attempting_to_connect:
             orb.log.info('* checking for connection ...')
-            n = 0
-            while 1:
-                if state.get('connected'):
-                    orb.log.info('  connected.')
-                    self.attempting_to_connect = False
-                    return
-                elif n < 20000000:
-                    n += 1
-                    QApplication.processEvents()
-                    continue
-                else:
-                    orb.log.info('  connection failed.')
-                    self.connect_to_bus_action.setChecked(False)
-                    html = '<h3>Cannot connect to the Repository Service</h3>'
-                    html += '<p><b><font color="red">Contact the Administrator '
-                    html += 'for status.</font></b></p>'
-                    dlg = NotificationDialog(html, news=False, parent=self)
-                    dlg.show()
-                    return
-        else:
+            self.connect_timeout = self.reactor.callLater(
+                                            config.get('connect_timeout') or 20,
+                                            self.on_connect_timeout)
+
+    def on_connect_timeout(self):
+        self.connect_timeout = None
+        if state.get('connected') or not self.attempting_to_connect:
+            return
+        orb.log.info('  connection failed.')
+        self.attempting_to_connect = False
+        self.cancel_reconnect()
+        self.connect_to_bus_action.setChecked(False)
+        html = '<h3>Cannot connect to the Repository Service</h3>'
+        html += '<p><b><font color="red">Contact the Administrator '
+        html += 'for status.</font></b></p>'
+        dlg = NotificationDialog(html, news=False, parent=self)
+        dlg.show()
+
+    def on_transport_lost(self):
+        """
+        Handle the loss (or suspected loss) of the transport, e.g. an rpc that
+        could not be sent.  If the session is in fact still attached, only the
+        channel subscriptions that were lost are renewed; otherwise a
+        reconnect attempt is scheduled (see schedule_reconnect()).  Calls of
+        idempotent rpcs that were in flight are re-issued when the new session
+        joins (see PgxnMessageBus.resume_calls()).
+        """
+        if (getattr(self, 'mbus', None) is None
+            or not self.connect_to_bus_action.isChecked()):
+            # not connecting or connected (e.g. the user disconnected)
+            return
+        session = getattr(self.mbus, 'session', None)
+        if session is not None and session.is_attached():
+            orb.log.debug('  transport is up; checking subscriptions ...')
+            self.resubscribe_lost_channels()
+            return
+        if state.get('connected'):
+            orb.log.info('* transport lost -- will reconnect ...')
+            state['connected'] = False
+            self.net_status.setPixmap(self.spotty_nw_icon)
+            self.net_status.setToolTip('connection lost; reconnecting ...')
+        # the prefetch is restarted after the next sync
+        self.stop_prefetch()
+        self.schedule_reconnect()
+
+    def schedule_reconnect(self):
+        """
+        Schedule the next reconnect attempt (unless one is already scheduled)
+        after a backoff delay.
+        """
+        if self.reconnect_call is not None and self.reconnect_call.active():
             return
+        delay = self.reconnect_backoff.next_delay()
+        msg = f'connection lost -- reconnecting in {delay:.0f} seconds ...'
+        orb.log.info(f'  {msg}')
+        self.statusbar.showMessage(msg)
+        self.reconnect_call = self.reactor.callLater(delay,
+                                                     self.attempt_reconnect)
+
+    def attempt_reconnect(self):
+        """
+        Start a new connection of the message bus, reusing its credentials
+        and connection arguments.  If it fails, on_mbus_connect_failure() or
+        the "ondisconnect" signal schedules the next attempt.
+        """
+        self.reconnect_call = None
+        if (state.get('connected') or getattr(self, 'mbus', None) is None
+            or not self.connect_to_bus_action.isChecked()):
+            return
+        n = self.reconnect_backoff.attempts
+        orb.log.info(f'* reconnect attempt {n} ...')
+        if getattr(self.mbus, 'runner', None) is not None:
+            try:
+                self.mbus.runner.stop()
+            except Exception:
+                pass
+        url, kw = self.mbus_run_args
+        self.run_mbus(url, **kw)
+
+    def cancel_reconnect(self):
+        if self.reconnect_call is not None and self.reconnect_call.active():
+            self.reconnect_call.cancel()
+        self.reconnect_call = None
+        self.reconnect_backoff.reset()
+
+    def resubscribe_lost_channels(self):
+        """
+        Subscribe to the channels in self.channels whose subscriptions are not
+        active in the current session.
+        """
+        session = self.mbus.session
+        lost = [channel for channel in self.channels
+                if not getattr(self.subscriptions.get(channel), 'active', False)
+                or self.subscriptions[channel].session is not session]
+        if lost:
+            orb.log.debug(f'* resubscribing to lost channels: {lost}')
+            self.subscribe_to_mbus_channels(None, channels=lost)
 
     def on_mbus_joined(self):
         orb.log.info('* on_mbus_joined:  message bus session joined.')
@@ -732,6 +997,16 @@ class Main(QMainWindow):
         state['done_with_progress'] = False
         state['synced_projects'] = []
         state['connected'] = True
+        self.attempting_to_connect = False
+        if self.connect_timeout is not None and self.connect_timeout.active():
+            self.connect_timeout.cancel()
+        self.cancel_reconnect()
+        # the repository may have been upgraded to support parmz deltas and
+        # sync cursors
+        self.parmz_deltas = True
+        self.sync_cursors_supported = True
+        self.manifest_digests_supported = True
+        self.vault_dedup_supported = True
         # set userid from the returned session details ...
         state['userid'] = self.mbus.session.details.authid
         orb.log.info('  userid from session: "{}"'.format(state['userid']))
@@ -745,12 +1020,20 @@ class Main(QMainWindow):
         # delta is interval allowed for a disconnect before a project resync is
         # done -- default is 60 seconds; can be overridden by a user preference
         delta = prefs.get('disconnect_resync_interval') or 60
+        # the sync is (re)started in every case below, so discard the parked
+        # calls of any interrupted sync chain -- re-issuing them would run a
+        # second sync chain concurrently
+        self.mbus.discard_parked(self.mbus.sync_chain_rpcs)
         if not getattr(self, 'synced', None):
             # if we haven't been synced in this session
             self.statusbar.showMessage('connected to message bus, syncing ...')
             orb.log.info('  connected to message bus, not synced, syncing ...')
             self.sync_with_services()
         else:
+            # reconnected:  subscriptions do not survive a new session, and
+            # updates may have been journaled while the transport was down
+            self.resubscribe_lost_channels()
+            self.replay_op_journal(None)
             now = dtstamp()
             # if (now - self.synced >= timedelta(seconds=10)
                 # and not state.get('network_warning_displayed')):
@@ -799,7 +1082,7 @@ class Main(QMainWindow):
 
     def on_mbus_disconnect(self):
         orb.log.info('* on_mbus_disconnect:  message bus session disconnected.')
-        self.reactor.stop()
+        self.on_transport_lost()
 
     def sync_with_services(self, force=False):
         self.force = force
@@ -814,23 +1097,14 @@ class Main(QMainWindow):
         this_version = self.app_version or __version__
         if state.get('connected'):
             try:
+                # NOTE: vger.get_user_roles is idempotent, so if the transport
+                # is lost the call is re-issued when the session rejoins
                 rpc = self.mbus.session.call('vger.get_user_roles', userid,
                                              data=data, version=this_version)
             except:
                 orb.log.debug('  rpc "vger.get_user_roles" failed.')
-                orb.log.debug('  trying again ...')
-                time.sleep(1)
-                try:
-                    rpc = self.mbus.session.call('vger.get_user_roles', userid,
-                                                 data=data,
-                                                 version=this_version)
-                except:
-                    orb.log.debug('  rpc "vger.get_user_roles" failed again.')
-                    message = "Could not reconnect -- log out & log in again."
-                    popup = QMessageBox(QMessageBox.Warning,
-                                        "Connection Lost", message,
-                                        QMessageBox.Ok, self)
-                    popup.show()
+                self.on_transport_lost()
+                return
             rpc.addTimeout(10, self.reactor,
                            onTimeoutCancel=self.on_rpc_timeout)
             rpc.addCallback(self.on_rpc_get_user_roles_result)
@@ -1008,6 +1282,8 @@ class Main(QMainWindow):
         self.channels.append('vger.channel.public')
         rpc = self.subscribe_to_mbus_channels(self.channels)
         rpc.addErrback(self.on_failure)
+        rpc.addCallback(self.replay_op_journal)
+        rpc.addErrback(self.on_failure)
         rpc.addCallback(self.sync_user_created_objs_to_repo)
         rpc.addErrback(self.on_failure)
         rpc.addCallback(self.on_user_objs_sync_result)
@@ -1061,16 +1337,23 @@ class Main(QMainWindow):
         dlg.show()
         return
 
-    def subscribe_to_mbus_channels(self, data):
+    def subscribe_to_mbus_channels(self, data, channels=None):
         # NOTE: "data" is now ignored -- previously, it was "channels" and was
         # passed in from on_rpc_get_user_roles_result(), but now channels are
         # set as self.channels (mainly for use in re-subscribing when/if
         # connection is lost ...)
         self.channels = self.channels or ['vger.channel.public']
+        session = self.mbus.session
+        # channels already subscribed in this session are skipped (a second
+        # subscription would deliver every message twice)
+        channels = [channel for channel in (channels or self.channels)
+                    if not (getattr(self.subscriptions.get(channel), 'active',
+                                    False)
+                            and self.subscriptions[channel].session is session)]
         orb.log.debug('* attempting to subscribe to channels:  %s' % str(
-                                                                self.channels))
+                                                                channels))
         subs = []
-        for channel in self.channels:
+        for channel in channels:
             sub = self.mbus.session.subscribe(self.on_pubsub_msg, channel)
             sub.addCallback(self.on_pubsub_success)
             sub.addErrback(self.on_pubsub_failure)
@@ -1079,6 +1362,7 @@ class Main(QMainWindow):
 
     def on_pubsub_success(self, sub):
         orb.log.info("  - subscribed to: {}".format(str(sub.topic)))
+        self.subscriptions[sub.topic] = sub
 
     def on_pubsub_failure(self, f):
         orb.log.info("  - subscription failure: {}".format(f.getTraceback()))
@@ -1114,7 +1398,7 @@ class Main(QMainWindow):
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def sync_user_created_objs_to_repo(self, data):
         """
@@ -1142,11 +1426,11 @@ class Main(QMainWindow):
         data = orb.get_mod_dts(oids=oids)
         orb.log.debug('       -> rpc: vger.sync_objects()')
         try:
-            return self.mbus.session.call('vger.sync_objects', data)
+            return self.call_sync_rpc('user', 'vger.sync_objects', data)
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def sync_library_objs(self, data):
         """
@@ -1163,18 +1447,14 @@ class Main(QMainWindow):
         # come back in the set of oids to be ignored.
         # Here we just include the most important subtypes of ManagedObject ...
         # we will get back ALL subtypes anyway.
-        data = orb.get_mod_dts(cnames=['HardwareProduct', 'Template',
-                                       'DataElementDefinition', 'Model',
-                                       'Document', 'RepresentationFile'])
-        # exclude reference data (ref_oids)
-        non_ref_data = {oid: data[oid] for oid in (data.keys() - ref_oids)}
+        non_ref_data = self.get_library_mod_dts()
         try:
-            return self.mbus.session.call('vger.sync_library_objects',
-                                          non_ref_data)
+            return self.call_sync_rpc('library', 'vger.sync_library_objects',
+                                      non_ref_data)
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def force_sync_managed_objs(self, data):
         """
@@ -1183,20 +1463,26 @@ class Main(QMainWindow):
         Args:
             data:  parameter required for callback (ignored)
         """
-        # TODO:  Include all library classes (not just HardwareProduct)
         orb.log.debug('* force_sync_managed_objs()')
         self.statusbar.showMessage('forcing sync of ALL library objects ...')
-        data = orb.get_mod_dts(cnames=['HardwareProduct', 'Template',
-                                       'DataElementDefinition', 'Model'])
-        # exclude reference data (ref_oids)
-        non_ref_data = {oid: data[oid] for oid in (data.keys() - ref_oids)}
+        # a forced sync is the recovery path:  the next library sync will send
+        # the full manifest (see call_sync_rpc())
+        clear_sync_cursors('library')
+        # the manifest must cover the same classes as the manifest digests
+        # (LIBRARY_SYNC_CNAMES), or the buckets that differ would be
+        # expanded into the wrong oids (see call_digest_sync())
+        non_ref_data = self.get_library_mod_dts()
         try:
+            if self.use_manifest_digests():
+                return self.call_digest_sync(
+                                    'vger.force_sync_managed_objects',
+                                    non_ref_data)
             return self.mbus.session.call('vger.force_sync_managed_objects',
                                           non_ref_data)
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def sync_current_project(self, data, msg=''):
         """
@@ -1258,12 +1544,250 @@ class Main(QMainWindow):
         # NOTE: callback to on_project_sync_result() to handle result is added
         # by on_set_current_project()
         try:
+            if (proj_oid != 'pgefobjects:SANDBOX') and project:
+                return self.call_sync_rpc(f'project:{proj_oid}',
+                                          'vger.sync_project', oid_dts,
+                                          args=(proj_oid,))
             return self.mbus.session.call('vger.sync_project', proj_oid,
                                           oid_dts)
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
+
+    def call_sync_rpc(self, scope, uri, manifest, args=()):
+        """
+        Call a sync rpc ('vger.sync_objects', 'vger.sync_library_objects', or
+        'vger.sync_project') for a sync scope ("user", "library", or
+        "project:[project oid]").
+
+        If a sync cursor has been saved for the scope (see
+        pangalactic.node.sync.get_sync_cursor), only the locally dirty part of
+        the manifest -- objects modified since the last sync -- is sent,
+        along with the cursor as `since`; otherwise the full manifest is sent.
+        The full manifest exchange is also the recovery path if the server
+        rejects the cursor (returns a null cursor) or does not support cursors.
+
+        Args:
+            scope (str):  the sync scope
+            uri (str):  the rpc uri
+            manifest (dict):  the full {oid: mod_datetime string} manifest
+
+        Keyword Args:
+            args (tuple):  rpc args that precede the manifest
+
+        Return:
+            deferred:  result of the rpc
+        """
+        self.sync_started[scope] = str(dtstamp())
+        cursor = get_sync_cursor(scope)
+        if cursor and self.sync_cursors_supported:
+            return self.call_cursor_sync(scope, uri, manifest, args, cursor)
+        if scope == 'library' and self.use_manifest_digests():
+            return self.call_digest_sync(uri, manifest, args=args)
+        orb.log.debug(f'  full manifest sync ({scope}): {len(manifest)} oids')
+        return self.mbus.session.call(uri, *args, manifest)
+
+    def call_cursor_sync(self, scope, uri, manifest, args, cursor,
+                         attempt=0):
+        """
+        Call a sync rpc with only the part of the manifest modified since the
+        sync cursor of the scope (see call_sync_rpc()).
+
+        Args:
+            scope (str):  the sync scope
+            uri (str):  the rpc uri
+            manifest (dict):  the full {oid: mod_datetime string} manifest
+            args (tuple):  rpc args that precede the manifest
+            cursor (dict):  the sync cursor of the scope
+
+        Keyword Args:
+            attempt (int):  number of earlier failed attempts of the call
+
+        Return:
+            deferred:  result of the rpc
+        """
+        dirty = dirty_since(manifest, cursor['local_dts'])
+        n, n_all = len(dirty), len(manifest)
+        orb.log.debug(f'  cursor sync ({scope}): sending {n} of {n_all} '
+                      'local oids')
+        rpc = self.mbus.session.call(uri, *args, dirty,
+                                     since=cursor['cursor'])
+        rpc.addCallbacks(self.on_cursor_sync_result,
+                         self.on_cursor_sync_failure,
+                         callbackArgs=(scope, uri, manifest, args),
+                         errbackArgs=(scope, uri, manifest, args, cursor,
+                                      attempt))
+        return rpc
+
+    def on_cursor_sync_result(self, result, scope, uri, manifest, args):
+        """
+        Check the result of a cursor-based sync rpc:  if the server returned a
+        null cursor (it cannot compute changes since our cursor), fall back to
+        a full manifest sync.
+        """
+        if isinstance(result, (list, tuple)) and result and result[-1] is None:
+            orb.log.debug(f'  sync cursor for {scope} rejected by server --')
+            orb.log.debug('  falling back to full manifest sync ...')
+            clear_sync_cursors(scope)
+            return self.mbus.session.call(uri, *args, manifest)
+        return result
+
+    def on_cursor_sync_failure(self, f, scope, uri, manifest, args, cursor,
+                               attempt=0):
+        """
+        Handle failure of a cursor-based sync rpc:  if the server rejects the
+        call (an older server has the sync procedure but not its `since`
+        argument, so it raises an error rather than "no such procedure"),
+        stop using cursors for the rest of the session; after a timeout or a
+        transport error retry the cursor sync (up to FEATURE_RPC_RETRIES
+        times).  Either way, once it is not retried, fall back to a full
+        manifest sync.
+        """
+        orb.log.debug(f'  cursor sync for {scope} failed:')
+        orb.log.debug(f'  {f.getErrorMessage()}')
+        if rejected(f):
+            self.sync_cursors_supported = False
+        elif attempt < FEATURE_RPC_RETRIES:
+            orb.log.debug('  retrying ...')
+            return self.call_cursor_sync(scope, uri, manifest, args, cursor,
+                                         attempt=attempt + 1)
+        orb.log.debug('  falling back to full manifest sync ...')
+        clear_sync_cursors(scope)
+        return self.mbus.session.call(uri, *args, manifest)
+
+    def update_sync_cursor(self, scope, cursor):
+        """
+        Save the cursor returned by the server for a sync scope, along with
+        the local datetime when the sync was started.
+        """
+        if cursor and self.sync_started.get(scope):
+            set_sync_cursor(scope, cursor, self.sync_started[scope])
+            orb.log.debug(f'  sync cursor for {scope} set to {cursor}')
+        else:
+            clear_sync_cursors(scope)
+
+    def get_library_mod_dts(self, cnames=None):
+        """
+        Return the {oid: mod_datetime string} manifest of local library
+        objects, excluding reference data.
+
+        Keyword Args:
+            cnames (list of str):  class names to include (default:
+                LIBRARY_SYNC_CNAMES)
+        """
+        data = orb.get_mod_dts(cnames=cnames or LIBRARY_SYNC_CNAMES)
+        # exclude reference data (ref_oids)
+        return {oid: data[oid] for oid in (data.keys() - ref_oids)}
+
+    def use_manifest_digests(self):
+        """
+        Whether full library syncs should compare manifest digests first
+        (prefs['sync_manifest_digests'], set in the Preferences dialog).
+        """
+        return bool(prefs.get('sync_manifest_digests')
+                    and self.manifest_digests_supported)
+
+    def call_digest_sync(self, uri, manifest, args=(), attempt=0):
+        """
+        Do a full library sync ('vger.sync_library_objects' or
+        'vger.force_sync_managed_objects') by comparing bucketed digests of
+        the local and repository library manifests first (rpc
+        'vger.get_manifest_digests'), then calling the sync rpc with only the
+        part of the manifest in buckets that differ.
+
+        Args:
+            uri (str):  the sync rpc uri
+            manifest (dict):  the full {oid: mod_datetime string} manifest
+
+        Keyword Args:
+            args (tuple):  rpc args that precede the manifest
+            attempt (int):  number of earlier failed attempts of the
+                'vger.get_manifest_digests' rpc
+
+        Return:
+            deferred:  result of the sync rpc
+        """
+        if not self.manifest_digests.built:
+            orb.log.debug('  building library manifest digests ...')
+            self.manifest_digests.load(self.get_library_mod_dts())
+        n_buckets = self.manifest_digests.n_buckets
+        orb.log.debug(f'  -> rpc: vger.get_manifest_digests({n_buckets})')
+        rpc = self.mbus.session.call('vger.get_manifest_digests', 'library',
+                                     n_buckets,
+                                     root=self.manifest_digests.root())
+        rpc.addCallbacks(self.on_manifest_digests_result,
+                         self.on_manifest_digests_failure,
+                         callbackArgs=(uri, manifest, args),
+                         errbackArgs=(uri, manifest, args, attempt))
+        return rpc
+
+    def on_manifest_digests_result(self, remote, uri, manifest, args):
+        """
+        Compare the repository's library manifest digests with the local ones
+        and call the sync rpc with only the differing buckets of the manifest.
+        The repository returns an empty dict if its root digest matches the
+        one sent.
+
+        Args:
+            remote (dict):  the repository's {str(index): hex digest} dict
+            uri (str):  the sync rpc uri
+            manifest (dict):  the full {oid: mod_datetime string} manifest
+            args (tuple):  rpc args that precede the manifest
+        """
+        if not isinstance(remote, dict):
+            orb.log.debug('  invalid manifest digests received --')
+            orb.log.debug('  falling back to full manifest sync ...')
+            return self.mbus.session.call(uri, *args, manifest)
+        if remote:
+            buckets = self.manifest_digests.diff(remote)
+        else:
+            buckets = []
+        subset = self.manifest_digests.expand(manifest, buckets)
+        n = self.manifest_digests.n_buckets
+        orb.log.debug(f'  {len(buckets)} of {n} manifest buckets differ:')
+        orb.log.debug(f'  sending {len(subset)} of {len(manifest)} oids')
+        return self.mbus.session.call(uri, *args, subset, buckets=buckets)
+
+    def on_manifest_digests_failure(self, f, uri, manifest, args, attempt=0):
+        """
+        Handle failure of the 'vger.get_manifest_digests' rpc:  if the
+        repository does not have it, stop using manifest digests (for the rest
+        of the session); after any other failure retry it (up to
+        FEATURE_RPC_RETRIES times).  Either way, once it is not retried, fall
+        back to a full manifest sync.
+        """
+        orb.log.debug('  rpc "vger.get_manifest_digests" failed:')
+        orb.log.debug(f'  {f.getErrorMessage()}')
+        if no_such_procedure(f):
+            self.manifest_digests_supported = False
+        elif attempt < FEATURE_RPC_RETRIES:
+            orb.log.debug('  retrying ...')
+            return self.call_digest_sync(uri, manifest, args=args,
+                                         attempt=attempt + 1)
+        orb.log.debug('  falling back to full manifest sync ...')
+        return self.mbus.session.call(uri, *args, manifest)
+
+    def update_manifest_digests(self, obj=None, objs=None):
+        """
+        Update the library manifest digests for saved objects (handler for
+        "new object(s)" and "modified object(s)" signals; also called when
+        objects are received from the repository).
+        """
+        for o in (objs or ([obj] if obj else [])):
+            oid = getattr(o, 'oid', None)
+            if (o.__class__.__name__ in LIBRARY_SYNC_CNAMES
+                and oid not in ref_oids):
+                self.manifest_digests.update(oid, str(o.mod_datetime))
+
+    def discard_from_manifest_digests(self, oid='', oids=None):
+        """
+        Remove deleted objects from the library manifest digests (handler for
+        the "deleted object" signal; also called for objects deleted by a
+        sync).
+        """
+        for deleted_oid in (oids or [oid]):
+            self.manifest_digests.discard(deleted_oid)
 
     def on_user_objs_sync_result(self, data):
         self.on_sync_result(data, user_objs_sync=True)
@@ -1304,6 +1828,8 @@ class Main(QMainWindow):
         Return:
             deferred:  result of `vger.save` rpc
         """
+        # a sync may change any assembly -- start the analysis over
+        assembly_graph.clear()
         if project_sync:
             orb.log.info('* on_sync_result() for sync_current_project()')
         else:
@@ -1322,6 +1848,14 @@ class Main(QMainWindow):
         # elif user_objs_sync:
             # sync_type = 'user objs'
         # orb.log.debug('       data: {}'.format(str(data)))
+        # a server that supports sync cursors appends the cursor
+        if isinstance(data, (list, tuple)) and len(data) == 8:
+            data, cursor = data[:7], data[7]
+            if project_sync:
+                scope = 'project:' + (state.get('project') or '')
+            else:
+                scope = 'user'
+            self.update_sync_cursor(scope, cursor)
         try:
             (sobjs, same_dts, to_update, local_only, server_deleted_oids,
              parm_data, de_data) = data
@@ -1335,7 +1869,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
                 return
         # [2022-11-09] "project_oids" attr used in updating parms of proj objs
         if project_sync:
@@ -1397,6 +1931,8 @@ class Main(QMainWindow):
                     obj_id = getattr(obj, 'id', 'unknown id')
                     orb.log.debug(f'    {obj_id} ({cname})')
                 orb.log.debug('  - deleting them ...')
+                self.discard_from_manifest_digests(
+                                oids=[o.oid for o in local_objs_to_del])
                 orb.delete(local_objs_to_del)
                 if cname:
                     # if multiple deletes, they will need to be looked up from
@@ -1428,7 +1964,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
                 return
         else:
             # don't need the final "get_parmz" here because we're done
@@ -1438,7 +1974,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
                 return
         try:
             rpc.addErrback(self.on_failure)
@@ -1446,7 +1982,7 @@ class Main(QMainWindow):
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def on_sync_library_result(self, data, project_sync=False):
         """
@@ -1479,12 +2015,18 @@ class Main(QMainWindow):
         Return:
             deferred:  result of `vger.get_objects` rpc
         """
+        # a sync may change any assembly -- start the analysis over
+        assembly_graph.clear()
         orb.log.debug('* on_sync_library_result()')
         if data is None:
             orb.log.debug('  no data received.')
             return 'success'  # return value will be ignored
         msg = 'no data received.'
         # data *should* be a list of 2 lists, 2 dicts, and 2 strings ...
+        # plus a sync cursor if the server supports cursors
+        if len(data) == 7:
+            data, cursor = data[:6], data[6]
+            self.update_sync_cursor('library', cursor)
         if len(data) == 6:
             n_new = len(data[0])
             n_del = len(data[1])
@@ -1527,29 +2069,17 @@ class Main(QMainWindow):
             if objs_to_delete:
                 orb.log.debug('  to be deleted: {}'.format(
                               ', '.join([o.oid for o in objs_to_delete])))
+                self.discard_from_manifest_digests(
+                                oids=[o.oid for o in objs_to_delete])
                 orb.delete(objs_to_delete)
         if newer:
             orb.log.debug('  new objects found ...')
-            # chunks = chunkify(newer, 5)   # set chunks small for testing
-            # chunks = chunkify(newer, 100)
-            chunks = chunkify(newer, 50)   # 100 is too big sometimes
-            n_chunks = len(chunks)
-            c = 'chunks'
-            if n_chunks == 1:
-                c = 'chunk'
-            orb.log.debug(f'  will get in {n_chunks} {c} ...')
-            chunk = chunks.pop(0)
-            state['chunks_to_get'] = chunks
+            # NOTE: chunk sizes are adapted to measured payloads and round
+            # trip times (see get_objects_in_chunks())
             if state.get('connected'):
-                try:
-                    rpc = self.mbus.session.call('vger.get_objects', chunk)
-                    rpc.addCallback(self.on_get_library_objects_result)
-                    rpc.addErrback(self.on_failure)
-                except:
-                    orb.log.debug('  ** rpc failed (possible loss of transport)')
-                    orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
-                    return
+                self.get_objects_in_chunks(newer,
+                                    self.on_get_library_objects_result,
+                                    self.on_library_objects_sync_completed)
             else:
                 pass
         else:
@@ -1557,14 +2087,87 @@ class Main(QMainWindow):
             # current project ... which will also update views ...
             self.resync_current_project()
 
+    def get_objects_in_chunks(self, oids, on_chunk, on_done):
+        """
+        Get objects from the repository using the rpc 'vger.get_objects()' for
+        chunks of oids, keeping up to prefs['sync_requests_in_flight']
+        (default: 3) requests in flight.  Responses are handed to `on_chunk`
+        in order, so that deserialization of each chunk overlaps the round
+        trips for the following chunks.
+
+        The chunk size is adapted to the measured payload sizes and round trip
+        times (see pangalactic.node.sync.ChunkSizer), within the limits set by
+        config items "sync_chunk_min", "sync_chunk_max", "sync_max_payload"
+        [bytes], and "sync_target_latency" [seconds]; the last size used is
+        saved as state['sync_chunk_size'] to be the starting size for the next
+        sync.  A chunk that gets no response within config["sync_timeout"]
+        seconds (default: 30) is requested again.
+
+        Args:
+            oids (list of str):  oids of the objects to get
+            on_chunk (callable):  handler for each list of serialized objects
+            on_done (callable):  function to call when all chunks are loaded
+        """
+        window = prefs.get('sync_requests_in_flight') or 3
+        if getattr(self, 'sync_scheduler', None):
+            self.sync_scheduler.stop()
+        self.chunk_sizer = ChunkSizer(
+                    size=state.get('sync_chunk_size') or 50,
+                    minimum=config.get('sync_chunk_min') or 5,
+                    maximum=config.get('sync_chunk_max') or 500,
+                    max_payload=config.get('sync_max_payload') or 1048576,
+                    target_latency=config.get('sync_target_latency') or 2.0,
+                    log=orb.log.info)
+        n = len(oids)
+        size = self.chunk_sizer.size
+        orb.log.debug(f'  will get {n} objects, initial chunk size {size}, '
+                      f'{window} in flight ...')
+
+        def load_chunk(data):
+            # state['chunks_to_get'] is used in status messages
+            state['chunks_to_get'] = self.sync_scheduler.pending_chunks()
+            on_chunk(data)
+
+        def done():
+            state['sync_chunk_size'] = self.chunk_sizer.size
+            on_done()
+
+        # the chunks are requested by the scheduler, so the call site of the
+        # rpcs is that of this function
+        fetch = partial(self._get_objects_chunk, call_site=rpc_call_site())
+        self.sync_scheduler = ChunkScheduler(oids, fetch,
+                                             load_chunk, on_done=done,
+                                             on_failure=self.on_sync_failure,
+                                             window=window,
+                                             sizer=self.chunk_sizer)
+        self.sync_scheduler.start()
+
+    def _get_objects_chunk(self, chunk, call_site=None):
+        orb.log.debug(f'  - requesting chunk of {len(chunk)} objects ...')
+        rpc = self.mbus.session.call('vger.get_objects', chunk,
+                                     call_site=call_site)
+        rpc.addTimeout(config.get('sync_timeout') or 30, self.reactor)
+        return rpc
+
+    def on_sync_failure(self, f):
+        """
+        Handle a failure of a chunked 'vger.get_objects()' sync:  an exception
+        means the rpc could not be sent; otherwise `f` is the Failure.
+        """
+        state['chunks_to_get'] = []
+        if isinstance(f, Exception):
+            orb.log.debug('  ** rpc failed (possible loss of transport)')
+            orb.log.debug('     trying to reconnect ...')
+            self.on_transport_lost()
+        else:
+            self.on_failure(f)
+
     def on_get_library_objects_result(self, data):
         """
-        Handler for the result of the rpc 'vger.get_objects()' when called by
-        'on_sync_library_result()' (i.e., only at login).  This should only be
-        used as handler for 'on_sync_library_result()' (at login) because when
-        finished (no more chunks to get) it calls
-        'self.resync_current_project()', which calls
-        'self.on_set_current_project()'
+        Handler for the result of the rpc 'vger.get_objects()' for each chunk
+        requested by 'on_sync_library_result()' (i.e., only at login).  When
+        all chunks have been loaded, 'on_library_objects_sync_completed()' is
+        called.
 
         Args:
             data (list):  a list of serialized objects
@@ -1579,29 +2182,23 @@ class Main(QMainWindow):
                     lib_widget.refresh('HardwareProduct')
                 except:
                     pass
-        if state.get('chunks_to_get'):
-            chunk = state['chunks_to_get'].pop(0)
-            orb.log.debug('  - next chunk to get: {}'.format(str(chunk)))
+
+    def on_library_objects_sync_completed(self):
+        """
+        Called when the last chunk of library objects has been loaded -- calls
+        'self.resync_current_project()', which calls
+        'self.on_set_current_project()'.
+        """
+        orb.log.debug('  - done getting library objects ...')
+        orb.log.debug('    now resyncing current project ...')
+        state['library_sync_completed'] = True
+        lib_widget = getattr(self, 'library_widget', None)
+        if lib_widget:
             try:
-                rpc = self.mbus.session.call('vger.get_objects', chunk)
-                rpc.addCallback(self.on_get_library_objects_result)
-                rpc.addErrback(self.on_failure)
+                lib_widget.refresh('HardwareProduct')
             except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
-                return
-        else:
-            orb.log.debug('  - done getting library objects ...')
-            orb.log.debug('    now resyncing current project ...')
-            state['library_sync_completed'] = True
-            lib_widget = getattr(self, 'library_widget', None)
-            if lib_widget:
-                try:
-                    lib_widget.refresh('HardwareProduct')
-                except:
-                    pass
-            self.resync_current_project()
+                pass
+        self.resync_current_project()
 
     def on_force_sync_managed_result(self, data, project_sync=False):
         """
@@ -1626,6 +2223,8 @@ class Main(QMainWindow):
         Return:
             deferred:  result of `vger.get_objects` rpc
         """
+        # a sync may change any assembly -- start the analysis over
+        assembly_graph.clear()
         orb.log.debug('* on_force_sync_managed_result()')
         if data is None:
             orb.log.debug('  no data received.')
@@ -1651,27 +2250,15 @@ class Main(QMainWindow):
             if objs_to_delete:
                 orb.log.debug('  to be deleted: {}'.format(
                               ', '.join([o.oid for o in objs_to_delete])))
+                self.discard_from_manifest_digests(
+                                oids=[o.oid for o in objs_to_delete])
                 orb.delete(objs_to_delete)
         if newer:
             orb.log.debug('  server objects found ...')
-            # chunks = chunkify(newer, 5)   # set chunks small for testing
-            chunks = chunkify(newer, 50)
-            n_chunks = len(chunks)
-            c = 'chunks'
-            if n_chunks == 1:
-                c = 'chunk'
-            orb.log.debug(f'  will get in {n_chunks} {c} ...')
-            chunk = chunks.pop(0)
-            state['chunks_to_get'] = chunks
-            try:
-                rpc = self.mbus.session.call('vger.get_objects', chunk)
-                rpc.addCallback(self.on_force_get_managed_objects_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
-                return
+            # when the last chunk has been loaded, sync current project
+            self.get_objects_in_chunks(newer,
+                                       self.on_force_get_managed_objects_result,
+                                       self.resync_current_project)
         else:
             # if no newer objects but objects have been deleted, update views
             self._update_modal_views()
@@ -1679,8 +2266,8 @@ class Main(QMainWindow):
 
     def on_force_get_managed_objects_result(self, data):
         """
-        Handler for the result of the rpc 'vger.get_objects()' when called by
-        'on_force_sync_managed_result()' (i.e., only at login).  This should only be
+        Handler for the result of the rpc 'vger.get_objects()' for each chunk
+        requested by 'on_force_sync_managed_result()'.  This should only be
         used as handler for 'on_force_sync_managed_result()' because it will
         force the deserializer to replace any local versions of the objects.
 
@@ -1691,21 +2278,6 @@ class Main(QMainWindow):
         if data is not None:
             orb.log.debug('  - deserializing {} objects ...'.format(len(data)))
             self.force_load_serialized_objects(data)
-        if state.get('chunks_to_get'):
-            chunk = state['chunks_to_get'].pop(0)
-            orb.log.debug('  - next chunk to get: {}'.format(str(chunk)))
-            try:
-                rpc = self.mbus.session.call('vger.get_objects', chunk)
-                rpc.addCallback(self.on_force_get_managed_objects_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
-                return
-        else:
-            # if this was the last chunk, sync current project
-            self.resync_current_project()
 
     def on_remote_freeze_or_thaw(self, obj_attrs, action):
         """
@@ -1763,254 +2335,508 @@ class Main(QMainWindow):
 
     def on_pubsub_msg(self, msg):
         """
-        Handle pubsub messages.
+        Handle pubsub messages:  messages are put in the inbound queue, which
+        is processed in batches by process_pubsub_queue() -- the batch window
+        is prefs['pubsub_batch_window'] milliseconds (default: 50).
 
         Args:
-            msg (tuple): the message, a tuple of (subject, content)
+            msg (dict): the message, a dict mapping subject to content
         """
-        userid = state.get('userid', '')
-        for item in msg.items():
-            subject, content = item
-            orb.log.info("* pubsub msg received ...")
-            orb.log.info("  subject: {}".format(subject))
-            # orb.log.debug("  content: {}".format(content))
-            obj_id = '[unknown]'
-            # base msg
-            log_msg = "  "
-            if subject == 'decloaked':
-                # NOTE: content of 'decloaked' msg changed in version 4.3
-                # -- it is now a tuple: (authid, list of serialized objects)
-                n = len(content)
-                orb.log.debug(f'received {n} "decloaked" object(s)')
-                authid, sobjs = content
-                if authid == userid:
-                    # ignore -- result of my action
-                    orb.log.info('  "decloaked" ignored -- was my action.')
-                    return
-                self.on_received_objects(sobjs)
-            elif subject == 'new':
-                # NOTE: content of 'new' msg changed in version 4.3
-                # -- it is now a tuple: (authid, list of serialized objects)
-                authid, sobjs = content
-                if authid == userid:
-                    # ignore -- result of my action
-                    orb.log.info('  "new" ignored -- was my action.')
-                    return
-                n = len(sobjs)
-                orb.log.debug(f'received {n} "new" object(s)')
-                self.on_received_objects(sobjs)
-            elif subject == 'modified':
-                # NOTE: content of 'modified' msg changed in version 4.3
-                # -- it is now a tuple: (userid, list of serialized objects)
-                authid, sobjs = content
-                if authid == userid:
-                    # ignore -- result of my action
-                    orb.log.info('  "modified" ignored -- was my action.')
-                    return
-                # n = len(sobjs)
-                # orb.log.debug(f'received {n} modified object(s)')
-                self.on_received_objects(sobjs)
-            elif subject == 'new mode defs':
-                orb.log.debug('  - vger pubsub msg: "new mode defs" ...')
-                md_dts, project_oid, md_data, userid = content
-                # orb.log.debug('    content:')
-                orb.log.debug('==============================================')
-                orb.log.debug('New project mode definitions:')
-                orb.log.debug(f'- datetime stamp: {md_dts}')
-                orb.log.debug(f'- userid:         {userid}')
-                orb.log.debug('- <data>')
-                # orb.log.debug(f'  {md_data}')
-                orb.log.debug('==============================================')
-                if userid == state.get('userid'):
-                    # originated from me -- set dts to server's dts
-                    state['mode_defz_dts'] = md_dts
-                    orb.log.debug('    msg was from my action; ignoring.')
-                else:
-                    local_md_dts = state.get('mode_defz_dts')
-                    if (local_md_dts is None) or (md_dts > local_md_dts):
-                        if project_oid in mode_defz:
-                            del mode_defz[project_oid]
-                        mode_defz[project_oid] = md_data
-                        state['mode_defz_dts'] = md_dts
-                        orb.log.debug('    mode_defz updated.')
-                        orb.log.debug('    dispatching "modes published"')
-                        dispatcher.send(signal='modes published')
-                    else:
-                        orb.log.debug('    same datetime stamp; ignored.')
-            elif subject == 'comp mode datum updated':
-                orb.log.debug('  - vger msg: "comp mode datum updated" ...')
-                (project_oid, link_oid, comp_oid, mode, value, md_dts,
-                                                            userid) = content
-                project = orb.get(project_oid)
-                link = orb.get(link_oid)
-                comp = orb.get(comp_oid)
-                if project and link and comp:
-                    # orb.log.debug('    content:')
-                    orb.log.debug('=========================================')
-                    orb.log.debug('Component Mode datum updated:')
-                    orb.log.debug(f'- project:        {project.id}')
-                    orb.log.debug(f'- link:           {link.id}')
-                    orb.log.debug(f'- comp:           {comp.id}')
-                    orb.log.debug(f'- mode:           {mode}')
-                    orb.log.debug(f'- value:          {value}')
-                    orb.log.debug(f'- userid:         {userid}')
-                    orb.log.debug(f'- datetime stamp: {md_dts}')
-                    orb.log.debug('=========================================')
-                else:
-                    orb.log.debug('    unknown project or link; ignoring.')
-                    return
-                if userid == state.get('userid'):
-                    # originated from me -- set dts to server's dts
-                    state['mode_defz_dts'] = md_dts
-                    orb.log.debug('    msg was from my action; ignoring.')
-                else:
-                    set_modal_context(project_oid, link_oid, comp_oid, mode,
-                                      value)
-                    # mode_defz[project_oid]['components'][link_oid][comp_oid][
-                                                                # mode] = value
-                    state['mode_defz_dts'] = md_dts
-                    orb.log.debug('    mode_defz updated.')
-                    orb.log.debug('    sending "remote comp mode datum"')
-                    dispatcher.send(signal='remote comp mode datum',
-                                    project_oid=project_oid,
-                                    link_oid=link_oid,
-                                    comp_oid=comp_oid,
-                                    mode=mode,
-                                    value=value)
-            elif subject == 'deleted':
-                orb.log.debug('  - pubsub msg received: "deleted" ...')
-                obj_oid = content
-                obj = orb.get(obj_oid)
-                if obj:
-                    obj_id = obj.id
-                    cname = obj.__class__.__name__
-                    log_msg += obj_id
-                    # self.remote_deleted_object.emit(obj_oid, cname)
-                    # -----------------------------------------
-                    # NOTE: VERY IMPORTANT TO USE remote=True
-                    # -----------------------------------------
-                    dispatcher.send(signal="deleted object", oid=obj_oid,
-                                    cname=cname, remote=True)
-            elif subject == 'frozen':
-                # content is a list of tuples:
-                #   (obj.oid, str(obj.mod_datetime), obj.modifier.oid) 
-                frozen_attrs = content
-                if frozen_attrs:
-                    orb.log.info('* "frozen" msg received')
-                    items = []
-                    oids = []
-                    for attrs in frozen_attrs:
-                        frozen_oid, frozen_mod_dts, frozen_modifier = attrs
-                        obj = orb.get(frozen_oid)
-                        if obj:
-                            oids.append(frozen_oid)
-                            items.append(f'<b>{obj.id}</b> ({obj.name})')
-                    if oids:
-                        # phrase = "products have been"
-                        # if len(items) == 1:
-                            # phrase = "product has been"
-                        # html = f'<p>The following {phrase} <b>frozen</b><br>'
-                        # html += 'in the repository:</p><ul>'
-                        # items.sort()
-                        # for item in items:
-                            # html += f'<li>{item}</li>'
-                        # html += '</ul></p>'
-                        # dlg = FrozenDialog(html, parent=self)
-                        # dlg.show()
-                        log_msg = 'vger: object(s) have been frozen ... '
-                        log_msg += f'{len(oids)} found locally '
-                        log_msg += '-- getting frozen versions ...'
-                        self.on_remote_freeze_or_thaw(frozen_attrs, 'freeze')
-            elif subject == 'thawed':
-                # content is a list of tuples of the form:
-                #   (obj.oid, str(obj.modified_datetime), obj.modifier.oid)
-                orb.log.info('* "thawed" msg received ...')
-                thawed_attrs = content
-                if thawed_attrs:
-                    orb.log.info('  on oids:')
-                    items = []
-                    oids = []
-                    if (isinstance(thawed_attrs, list) and len(thawed_attrs) > 0):
-                        for attrs in thawed_attrs:
-                            oid, dts, modifier_oid = attrs
-                            orb.log.info(f'  {oid}')
-                            obj = orb.get(oid)
-                            if obj:
-                                oids.append(oid)
-                                items.append(f'<b>{obj.id}</b> ({obj.name})')
-                    else:
-                        orb.log.info('  but it had bad format!')
-                    if oids:
-                        # phrase = "products have been"
-                        # if len(items) == 1:
-                            # phrase = "product has been"
-                        # html = f'<p>The following {phrase} <b>thawed</b><br>'
-                        # html += 'in the repository:</p><ul>'
-                        # items.sort()
-                        # for item in items:
-                            # html += f'<li>{item}</li>'
-                        # html += '</ul></p>'
-                        # notice = QMessageBox(QMessageBox.Information, 'Thawed',
-                                     # html, QMessageBox.Ok, self)
-                        # notice.show()
-                        log_msg = 'vger: objects have been thawed ...'
-                        log_msg += f'{len(oids)} found locally '
-                        log_msg += '-- getting thawed versions ...'
-                        self.on_remote_freeze_or_thaw(thawed_attrs, 'thaw')
-                else:
-                    orb.log.info('  but it was empty!')
-            elif subject == 'properties set':
-                self.on_remote_properties_set(content)
-            elif subject == 'parameters set':
-                self.get_parmz()
-            elif subject == 'data elements set':
-                self.on_remote_data_elements_set(content)
-            elif subject == 'de added':
-                self.on_remote_de_added(content)
-            elif subject == 'de del':
-                self.on_remote_de_del(content)
-            elif subject == 'parm added':
-                self.on_remote_parm_added(content)
-            elif subject == 'parm del':
-                self.on_remote_parm_del(content)
-            elif subject == 'lom parms':
-                dispatcher.send(signal="got lom parms", content=content)
-            elif subject == 'organization':
-                obj_oid = content['oid']
-                obj_id = content['id']
-                log_msg += obj_id
-            elif subject == 'person added':
-                ser_objs = content
+        for subject, content in msg.items():
+            orb.log.info(f'* pubsub msg received: "{subject}"')
+            self.pubsub_queue.append((subject, content))
+            self.pubsub_stats.received(subject)
+        self.pubsub_batcher.request()
+
+    def process_pubsub_queue(self, oids=None, flags=None):
+        """
+        Process all messages in the pubsub inbound queue as one batch:  the
+        messages are coalesced (see pangalactic.node.sync.coalesce_pubsub_msgs)
+        and each is then passed to the handler for its subject (see
+        self.pubsub_handlers), each within its own savepoint so that a
+        failed handler's changes are rolled back without affecting the
+        others.  Counts and handling times by subject are collected in
+        self.pubsub_stats.
+
+        Keyword Args:
+            oids (set):  ignored (required by Coalescer)
+            flags (set):  ignored (required by Coalescer)
+        """
+        if not self.pubsub_queue:
+            return
+        if self.processing_pubsub:
+            # a handler is processing GUI events -- try again later
+            self.pubsub_batcher.request()
+            return
+        self.processing_pubsub = True
+        items = list(self.pubsub_queue)
+        self.pubsub_queue.clear()
+        batch, coalesced = coalesce_pubsub_msgs(items,
+                                                userid=state.get('userid', ''))
+        for subject, n in coalesced.items():
+            self.pubsub_stats.coalesced(subject, n)
+        orb.log.info(f'* processing {len(items)} pubsub msg(s) '
+                     f'as a batch of {len(batch)} ...')
+        try:
+            for subject, content in batch:
+                handler = self.pubsub_handlers.get(subject)
+                if not handler:
+                    orb.log.debug(f'  no handler for "{subject}" msg.')
+                    continue
+                t0 = time.monotonic()
+                error = False
                 try:
-                    objs = deserialize(orb, ser_objs)
-                    if objs:
-                        # NOTE: if the deserializer returned person and/or
-                        # organization objects, it means we are not the ones
-                        # who called vger.add_person(), so display a message in
-                        # the status bar and log this ...
-                        for obj in objs:
-                            if isinstance(obj, orb.classes['Person']):
-                                display_name = '{}, {} {} ({})'.format(
-                                                                obj.last_name,
-                                                                obj.first_name,
-                                                                obj.mi_or_name,
-                                                                obj.org.name)
-                                txt = f'person "{display_name}" saved.'
-                                orb.log.debug(f'  - {txt}')
-                                log_msg += ' ... ' + txt
-                                # NOTE: this dispatcher signal is only sent as
-                                # a result of the vger.add_person() rpc being
-                                # successful (see below)
-                                # dispatcher.send('person added', obj=obj,
-                                                # display_name=display_name,
-                                                # pk_added=pk_added)
-                            elif isinstance(obj, orb.classes['Organization']):
-                                orb.log.debug('  - org "{}" saved.'.format(
-                                                                    obj.name))
-                except:
-                    d = str(content)
-                    orb.log.debug(f'- could not process received data: {d}')
-            orb.log.debug(log_msg)
+                    with savepoint(orb.db):
+                        handler(content)
+                except Exception:
+                    # only this handler's changes were rolled back
+                    error = True
+                    orb.log.debug(f'  handler for "{subject}" failed:')
+                    orb.log.debug(traceback.format_exc())
+                self.pubsub_stats.handled(subject, time.monotonic() - t0,
+                                          error=error)
+            orb.db.commit()
+        except Exception:
+            orb.log.debug('  pubsub batch could not be committed:')
+            orb.log.debug(traceback.format_exc())
+            orb.db.rollback()
+        finally:
+            self.processing_pubsub = False
+
+    def get_bus_options(self):
+        """
+        Return the message bus transport options from config:
+
+            bus_serializers (list of str):  preferred WAMP serializers in
+                order, e.g. ["msgpack", "cbor"] (JSON is always the fallback)
+            bus_compression (bool):  offer permessage-deflate compression
+            bus_payload_stats (bool):  record message payload sizes and
+                encode/decode times (see show_payload_stats())
+        """
+        options = dict(serializers=config.get('bus_serializers') or None,
+                       compression=bool(config.get('bus_compression')),
+                       payload_stats=bool(config.get('bus_payload_stats')))
+        orb.log.debug(f'  - message bus options: {options}')
+        return options
+
+    def get_rpc_options(self):
+        """
+        Apply the rpc instrumentation options from config and return the rpc
+        timeouts:
+
+            bus_rpc_stats (bool):  also measure rpc request and response
+                payload sizes (latencies and failures are always recorded --
+                see show_rpc_stats())
+            rpc_timeouts (dict):  maps rpc uris (or "default") to timeouts
+                [seconds] applied to every call of the rpc
+
+        Returns:
+            dict:  the rpc timeouts
+        """
+        self.rpc_stats.sizes = bool(config.get('bus_rpc_stats'))
+        timeouts = config.get('rpc_timeouts') or {}
+        orb.log.debug(f'  - rpc timeouts: {timeouts}')
+        return timeouts
+
+    def write_rpc_stats(self):
+        """
+        Write the rpc statistics to [home]/rpc_stats.json.
+
+        Returns:
+            str:  the path of the file
+        """
+        path = os.path.join(orb.home, 'rpc_stats.json')
+        try:
+            self.rpc_stats.write(path)
+        except OSError as e:
+            orb.log.debug(f'  could not write rpc stats: {e}')
+        return path
+
+    def show_rpc_stats(self):
+        """
+        Display rpc latency percentiles, failures, timeouts, and payload sizes
+        by uri (the slowest in total first), with the call sites of each, and
+        write them to a file.
+        """
+        html = '<h3>Remote Procedure Calls</h3>'
+        html += '<table border="1" cellpadding="3">'
+        html += '<tr><th>rpc</th><th>calls</th><th>failed</th>'
+        html += '<th>timeouts</th><th>total [s]</th><th>p50 [ms]</th>'
+        html += '<th>p95 [ms]</th><th>p99 [ms]</th><th>max [ms]</th>'
+        html += '<th>sent [kB]</th><th>received [kB]</th>'
+        html += '<th>call sites [calls: s]</th></tr>'
+        for uri, st in self.rpc_stats.report():
+            html += f'<tr><td>{uri}</td><td>{st["calls"]}</td>'
+            html += f'<td>{st["failed"]}</td><td>{st["timeouts"]}</td>'
+            html += f'<td>{st["time"]:.2f}</td>'
+            for k in ['p50', 'p95', 'p99', 'max']:
+                html += f'<td>{1000 * st[k]:.0f}</td>'
+            if self.rpc_stats.sizes:
+                html += f'<td>{st["req_bytes"] / 1024:.1f}</td>'
+                html += f'<td>{st["resp_bytes"] / 1024:.1f}</td>'
+            else:
+                html += '<td>-</td><td>-</td>'
+            sites = '<br>'.join(f'{site} [{n}: {t:.2f}]'
+                                for site, n, t in st['sites'])
+            html += f'<td>{sites}</td></tr>'
+        html += '</table>'
+        if not self.rpc_stats.sizes:
+            html += '<p>Payload sizes are not being measured -- set '
+            html += '"bus_rpc_stats: true" in config and reconnect.</p>'
+        path = self.write_rpc_stats()
+        html += f'<p>Written to "{path}".</p>'
+        dlg = NotificationDialog(html, news=False, parent=self)
+        dlg.show()
+
+    def on_vault_file_accessed(self, fpath=''):
+        """
+        Handle the 'vault file accessed' signal (sent when a vault file is
+        used, e.g. a STEP model is displayed):  record the access in the
+        vault cache statistics.
+        """
+        if fpath:
+            self.vault.record_access(os.path.basename(fpath))
+
+    def enforce_vault_quota(self, keep=None):
+        """
+        If prefs['vault_quota_mb'] is set, evict the least recently used
+        downloaded files from the local vault until the stored file contents
+        fit the quota.  Files uploaded from this node, pinned files
+        (prefs['vault_pinned']), and files in `keep` are never evicted.
+
+        Keyword Args:
+            keep (set of str):  vault file names not to be evicted
+        """
+        quota_mb = prefs.get('vault_quota_mb')
+        if not quota_mb:
+            return
+        keep = set(keep or []) | set(prefs.get('vault_pinned') or [])
+        try:
+            n_files, n_bytes = self.vault.evict(int(quota_mb) * 2**20,
+                                                keep=keep)
+        except OSError as e:
+            orb.log.info(f'  vault eviction failed: {e}')
+            return
+        if n_files:
+            orb.log.info(f'* vault quota ({quota_mb} MB): {n_files} files '
+                         f'evicted, {n_bytes} bytes freed.')
+
+    def clean_up_vault(self):
+        """
+        Remove the local vault files of RepresentationFiles that no longer
+        exist and the stored file contents that are no longer referenced,
+        and display the space freed and the vault cache statistics.
+        """
+        orb.log.info('* clean_up_vault()')
+        live_fnames = set(os.path.basename(orb.get_vault_fpath(rf))
+                          for rf in orb.get_by_type('RepresentationFile'))
+        try:
+            n_blobs, n_bytes = self.vault.collect_garbage(
+                                                    live_fnames=live_fnames)
+        except OSError as e:
+            orb.log.info(f'  vault clean-up failed: {e}')
+            return
+        vault_stats = self.vault.stats()
+        orb.log.info(f'  {n_blobs} unreferenced file contents removed, '
+                     f'{n_bytes} bytes freed.')
+        html = '<h3>Local Vault</h3>'
+        html += f'<p>{n_blobs} unreferenced file contents removed '
+        html += f'({n_bytes / 2**20:.1f} MB freed).</p>'
+        html += f'<p>{vault_stats["files"]} vault files are stored as '
+        html += f'{vault_stats["blobs"]} distinct contents '
+        html += f'({vault_stats["bytes"] / 2**20:.1f} MB -- '
+        html += f'{vault_stats["saved"] / 2**20:.1f} MB saved by '
+        html += 'deduplication).</p>'
+        quota_mb = prefs.get('vault_quota_mb')
+        quota = f'{quota_mb} MB' if quota_mb else 'unlimited'
+        html += f'<p>Downloaded files cache quota: {quota} -- '
+        html += f'{vault_stats["evicted"]} files evicted so far.<br>'
+        html += f'Cache hits: {vault_stats["hits"]}, misses: '
+        html += f'{vault_stats["misses"]} (hit rate '
+        html += f'{100 * vault_stats["hit_rate"]:.0f}%).</p>'
+        dlg = NotificationDialog(html, news=False, parent=self)
+        dlg.show()
+
+    def show_payload_stats(self):
+        """
+        Display message payload sizes and encode/decode times by serializer,
+        and the websocket traffic stats (compression) of the connection.
+        """
+        mbus = getattr(self, 'mbus', None)
+        payload_stats = getattr(mbus, 'payload_stats', None)
+        html = '<h3>Message Payloads</h3>'
+        if payload_stats:
+            html += '<table border="1" cellpadding="3">'
+            html += '<tr><th>serializer</th><th>direction</th>'
+            html += '<th>messages</th><th>total [kB]</th><th>mean [B]</th>'
+            html += '<th>p95 [B]</th><th>max [B]</th>'
+            html += '<th>codec time [ms]</th></tr>'
+            for ser_id, direction, st in payload_stats.report():
+                html += f'<tr><td>{ser_id}</td><td>{direction}</td>'
+                html += f'<td>{st["messages"]}</td>'
+                html += f'<td>{st["bytes"] / 1024:.1f}</td>'
+                html += f'<td>{st["mean"]:.0f}</td><td>{st["p95"]}</td>'
+                html += f'<td>{st["max"]}</td>'
+                html += f'<td>{1000 * st["time"]:.1f}</td></tr>'
+            html += '</table>'
+        else:
+            html += '<p>Payload statistics are not being recorded -- set '
+            html += '"bus_payload_stats: true" in config and reconnect.</p>'
+        traffic = mbus.traffic_stats() if mbus else None
+        if traffic:
+            html += '<h3>Websocket Traffic</h3>'
+            html += f'<pre>{traffic}</pre>'
+        dlg = NotificationDialog(html, news=False, parent=self)
+        dlg.show()
+
+    def show_pubsub_stats(self):
+        """
+        Display counts and handling times of pubsub messages by subject.
+        """
+        html = '<h3>Pubsub Messages</h3>'
+        html += '<table border="1" cellpadding="3">'
+        html += '<tr><th>subject</th><th>received</th><th>coalesced</th>'
+        html += '<th>handled</th><th>errors</th><th>total [s]</th>'
+        html += '<th>mean [ms]</th><th>max [ms]</th></tr>'
+        for subject, st in self.pubsub_stats.report():
+            mean = 1000 * st['total'] / st['handled'] if st['handled'] else 0
+            html += f'<tr><td>{subject}</td><td>{st["received"]}</td>'
+            html += f'<td>{st["coalesced"]}</td><td>{st["handled"]}</td>'
+            html += f'<td>{st["errors"]}</td><td>{st["total"]:.3f}</td>'
+            html += f'<td>{mean:.1f}</td><td>{1000 * st["max"]:.1f}</td></tr>'
+        html += '</table>'
+        dlg = NotificationDialog(html, news=False, parent=self)
+        dlg.show()
+
+    def on_remote_mode_defs(self, content):
+        """
+        Handle vger pubsub msg "new mode defs".
+        """
+        orb.log.debug('  - vger pubsub msg: "new mode defs" ...')
+        md_dts, project_oid, md_data, userid = content
+        # orb.log.debug('    content:')
+        orb.log.debug('==============================================')
+        orb.log.debug('New project mode definitions:')
+        orb.log.debug(f'- datetime stamp: {md_dts}')
+        orb.log.debug(f'- userid:         {userid}')
+        orb.log.debug('- <data>')
+        # orb.log.debug(f'  {md_data}')
+        orb.log.debug('==============================================')
+        if userid == state.get('userid'):
+            # originated from me -- set dts to server's dts
+            state['mode_defz_dts'] = md_dts
+            orb.log.debug('    msg was from my action; ignoring.')
+        else:
+            local_md_dts = state.get('mode_defz_dts')
+            if (local_md_dts is None) or (md_dts > local_md_dts):
+                if project_oid in mode_defz:
+                    del mode_defz[project_oid]
+                mode_defz[project_oid] = md_data
+                state['mode_defz_dts'] = md_dts
+                orb.log.debug('    mode_defz updated.')
+                orb.log.debug('    dispatching "modes published"')
+                dispatcher.send(signal='modes published')
+            else:
+                orb.log.debug('    same datetime stamp; ignored.')
+
+    def on_remote_comp_mode_datum(self, content):
+        """
+        Handle vger pubsub msg "comp mode datum updated".
+        """
+        orb.log.debug('  - vger msg: "comp mode datum updated" ...')
+        (project_oid, link_oid, comp_oid, mode, value, md_dts,
+                                                    userid) = content
+        project = orb.get(project_oid)
+        link = orb.get(link_oid)
+        comp = orb.get(comp_oid)
+        if project and link and comp:
+            # orb.log.debug('    content:')
+            orb.log.debug('=========================================')
+            orb.log.debug('Component Mode datum updated:')
+            orb.log.debug(f'- project:        {project.id}')
+            orb.log.debug(f'- link:           {link.id}')
+            orb.log.debug(f'- comp:           {comp.id}')
+            orb.log.debug(f'- mode:           {mode}')
+            orb.log.debug(f'- value:          {value}')
+            orb.log.debug(f'- userid:         {userid}')
+            orb.log.debug(f'- datetime stamp: {md_dts}')
+            orb.log.debug('=========================================')
+        else:
+            orb.log.debug('    unknown project or link; ignoring.')
+            return
+        if userid == state.get('userid'):
+            # originated from me -- set dts to server's dts
+            state['mode_defz_dts'] = md_dts
+            orb.log.debug('    msg was from my action; ignoring.')
+        else:
+            set_modal_context(project_oid, link_oid, comp_oid, mode,
+                              value)
+            # mode_defz[project_oid]['components'][link_oid][comp_oid][
+                                                        # mode] = value
+            state['mode_defz_dts'] = md_dts
+            orb.log.debug('    mode_defz updated.')
+            orb.log.debug('    sending "remote comp mode datum"')
+            dispatcher.send(signal='remote comp mode datum',
+                            project_oid=project_oid,
+                            link_oid=link_oid,
+                            comp_oid=comp_oid,
+                            mode=mode,
+                            value=value)
+
+    def on_remote_deleted(self, content):
+        """
+        Handle vger pubsub msg "deleted" (content is the oid).
+        """
+        log_msg = "  "
+        orb.log.debug('  - pubsub msg received: "deleted" ...')
+        obj_oid = content
+        obj = orb.get(obj_oid)
+        if obj:
+            obj_id = obj.id
+            cname = obj.__class__.__name__
+            log_msg += obj_id
+            # self.remote_deleted_object.emit(obj_oid, cname)
+            # -----------------------------------------
+            # NOTE: VERY IMPORTANT TO USE remote=True
+            # -----------------------------------------
+            dispatcher.send(signal="deleted object", oid=obj_oid,
+                            cname=cname, remote=True)
+        orb.log.debug(log_msg)
+
+    def on_remote_frozen(self, content):
+        """
+        Handle vger pubsub msg "frozen".
+        """
+        log_msg = "  "
+        # content is a list of tuples:
+        #   (obj.oid, str(obj.mod_datetime), obj.modifier.oid) 
+        frozen_attrs = content
+        if frozen_attrs:
+            orb.log.info('* "frozen" msg received')
+            items = []
+            oids = []
+            for attrs in frozen_attrs:
+                frozen_oid, frozen_mod_dts, frozen_modifier = attrs
+                obj = orb.get(frozen_oid)
+                if obj:
+                    oids.append(frozen_oid)
+                    items.append(f'<b>{obj.id}</b> ({obj.name})')
+            if oids:
+                # phrase = "products have been"
+                # if len(items) == 1:
+                    # phrase = "product has been"
+                # html = f'<p>The following {phrase} <b>frozen</b><br>'
+                # html += 'in the repository:</p><ul>'
+                # items.sort()
+                # for item in items:
+                    # html += f'<li>{item}</li>'
+                # html += '</ul></p>'
+                # dlg = FrozenDialog(html, parent=self)
+                # dlg.show()
+                log_msg = 'vger: object(s) have been frozen ... '
+                log_msg += f'{len(oids)} found locally '
+                log_msg += '-- getting frozen versions ...'
+                self.on_remote_freeze_or_thaw(frozen_attrs, 'freeze')
+        orb.log.debug(log_msg)
+
+    def on_remote_thawed(self, content):
+        """
+        Handle vger pubsub msg "thawed".
+        """
+        log_msg = "  "
+        # content is a list of tuples of the form:
+        #   (obj.oid, str(obj.modified_datetime), obj.modifier.oid)
+        orb.log.info('* "thawed" msg received ...')
+        thawed_attrs = content
+        if thawed_attrs:
+            orb.log.info('  on oids:')
+            items = []
+            oids = []
+            if (isinstance(thawed_attrs, list) and len(thawed_attrs) > 0):
+                for attrs in thawed_attrs:
+                    oid, dts, modifier_oid = attrs
+                    orb.log.info(f'  {oid}')
+                    obj = orb.get(oid)
+                    if obj:
+                        oids.append(oid)
+                        items.append(f'<b>{obj.id}</b> ({obj.name})')
+            else:
+                orb.log.info('  but it had bad format!')
+            if oids:
+                # phrase = "products have been"
+                # if len(items) == 1:
+                    # phrase = "product has been"
+                # html = f'<p>The following {phrase} <b>thawed</b><br>'
+                # html += 'in the repository:</p><ul>'
+                # items.sort()
+                # for item in items:
+                    # html += f'<li>{item}</li>'
+                # html += '</ul></p>'
+                # notice = QMessageBox(QMessageBox.Information, 'Thawed',
+                             # html, QMessageBox.Ok, self)
+                # notice.show()
+                log_msg = 'vger: objects have been thawed ...'
+                log_msg += f'{len(oids)} found locally '
+                log_msg += '-- getting thawed versions ...'
+                self.on_remote_freeze_or_thaw(thawed_attrs, 'thaw')
+        else:
+            orb.log.info('  but it was empty!')
+        orb.log.debug(log_msg)
+
+    def on_remote_parameters_set(self, content):
+        """
+        Handle vger pubsub msg "parameters set".
+        """
+        self.parmz_refresh.request(flags=['parameters'])
+
+    def on_remote_lom_parms(self, content):
+        """
+        Handle vger pubsub msg "lom parms".
+        """
+        dispatcher.send(signal="got lom parms", content=content)
+
+    def on_remote_organization(self, content):
+        """
+        Handle vger pubsub msg "organization".
+        """
+        orb.log.debug(f'  organization: {content.get("id")}')
+
+    def on_remote_person_added(self, content):
+        """
+        Handle vger pubsub msg "person added".
+        """
+        log_msg = "  "
+        ser_objs = content
+        try:
+            objs = deserialize(orb, ser_objs)
+            if objs:
+                # NOTE: if the deserializer returned person and/or
+                # organization objects, it means we are not the ones
+                # who called vger.add_person(), so display a message in
+                # the status bar and log this ...
+                for obj in objs:
+                    if isinstance(obj, orb.classes['Person']):
+                        display_name = '{}, {} {} ({})'.format(
+                                                        obj.last_name,
+                                                        obj.first_name,
+                                                        obj.mi_or_name,
+                                                        obj.org.name)
+                        txt = f'person "{display_name}" saved.'
+                        orb.log.debug(f'  - {txt}')
+                        log_msg += ' ... ' + txt
+                        # NOTE: this dispatcher signal is only sent as
+                        # a result of the vger.add_person() rpc being
+                        # successful (see below)
+                        # dispatcher.send('person added', obj=obj,
+                                        # display_name=display_name,
+                                        # pk_added=pk_added)
+                    elif isinstance(obj, orb.classes['Organization']):
+                        orb.log.debug('  - org "{}" saved.'.format(
+                                                            obj.name))
+        except:
+            d = str(content)
+            orb.log.debug(f'- could not process received data: {d}')
+        orb.log.debug(log_msg)
 
     def on_add_person(self, data=None):
         """
@@ -2025,7 +2851,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
         else:
             orb.log.info('  not connected, cannot call "add_person()" rpc.')
 
@@ -2081,7 +2907,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
         else:
             orb.log.info("  not connected -- cannot get people from repo.")
 
@@ -2141,6 +2967,7 @@ class Main(QMainWindow):
         ser_objs = [so for so in serialized_objects if so]
         objs = deserialize(orb, ser_objs, force_no_recompute=True)
         # objs = self.load_serialized_objects(ser_objs)
+        self.update_manifest_digests(objs=objs)
         if objs:
             orb.log.debug(f'  deserialize() returned {len(objs)} object(s):')
             txt = str([o.id for o in objs if o is not None])
@@ -2170,6 +2997,7 @@ class Main(QMainWindow):
             # ================================================================
             oid = obj.oid
             cname = obj.__class__.__name__
+            self.update_assembly_graph(obj)
             # ================================================================
             if self.mode == 'db' and cname == state.get('current_cname'):
                 # object is in the current db table ...
@@ -2242,6 +3070,11 @@ class Main(QMainWindow):
             # set state for library classes whose widgets need a refresh ...
             # lmsg = f'  state["lib updates needed"] = {lib_updates_needed}'
             # orb.log.debug(lmsg)
+            # NOTE: add to any oids from earlier messages in the same refresh
+            # window (see on_parmz_refresh_due())
+            prev = state.get("lib updates needed")
+            if isinstance(prev, list):
+                lib_updates_needed = prev + lib_updates_needed
             state["lib updates needed"] = lib_updates_needed
         if state.get('new_or_modified_rqts'):
             oids = state['new_or_modified_rqts']
@@ -2250,9 +3083,25 @@ class Main(QMainWindow):
         if new_or_modified_acts:
             dispatcher.send(signal='remote new or mod acts',
                             objs=new_or_modified_acts)
-        self.get_parmz()
+        self.parmz_refresh.request(oids=[o.oid for o in objs],
+                                   flags=['objects'])
         return True
 
+    def on_parmz_refresh_due(self, oids, flags):
+        """
+        Called by the "parmz_refresh" Coalescer at the end of a refresh window
+        in which remote changes were received:  does a single get_parmz(),
+        whose result handler does all the view updates flagged in `state`.
+
+        Args:
+            oids (set of str):  oids of objects received in the window
+            flags (set of str):  kinds of changes received in the window
+        """
+        n = self.parmz_refresh.coalesced
+        orb.log.debug(f'* refresh: {n} request(s) coalesced, '
+                      f'{len(oids)} object(s), {sorted(flags)}')
+        self.get_parmz()
+
     def _create_actions(self):
         # orb.log.debug('* creating actions ...')
         self.about_action = self.create_action(
@@ -2476,6 +3325,18 @@ class Main(QMainWindow):
         self.edit_prefs_action = self.create_action(
                                     "Edit Preferences",
                                     slot=self.edit_prefs)
+        self.pubsub_stats_action = self.create_action(
+                                    "Pubsub Message Statistics",
+                                    slot=self.show_pubsub_stats)
+        self.payload_stats_action = self.create_action(
+                                    "Message Payload Statistics",
+                                    slot=self.show_payload_stats)
+        self.rpc_stats_action = self.create_action(
+                                    "RPC Statistics",
+                                    slot=self.show_rpc_stats)
+        self.clean_up_vault_action = self.create_action(
+                                    "Clean Up Local Vault",
+                                    slot=self.clean_up_vault)
         self.del_test_objs_action = self.create_action(
                                     "Delete Test Objects",
                                     slot=self.delete_test_objects)
@@ -2936,6 +3797,10 @@ class Main(QMainWindow):
                                 self.full_resync_action]
         system_tools_actions.append(self.view_3d_model_action)
         system_tools_actions.append(self.edit_prefs_action)
+        system_tools_actions.append(self.pubsub_stats_action)
+        system_tools_actions.append(self.payload_stats_action)
+        system_tools_actions.append(self.rpc_stats_action)
+        system_tools_actions.append(self.clean_up_vault_action)
         if config.get('test'):
             system_tools_actions.append(self.del_test_objs_action)
         # disable sync project action until we are online
@@ -3091,7 +3956,7 @@ class Main(QMainWindow):
                 except:
                     orb.log.debug('  ** rpc failed (possible loss of transport)')
                     orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
+                    self.on_transport_lost()
             else:
                 orb.log.debug('  not connected -- not saving to repo.')
 
@@ -3141,7 +4006,9 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
+        elif oids:
+            self.journal_op('freeze', oids=oids)
 
     def on_thaw_signal(self, oids=None):
         if state.get('connected') and oids:
@@ -3152,7 +4019,9 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
+        elif oids:
+            self.journal_op('thaw', oids=oids)
 
     # NOTE TODO: handle RoleAssignment objects separately -- need to call
     # vger.assign_role() for them ...
@@ -3199,6 +4068,7 @@ class Main(QMainWindow):
             orb.log.debug('  object oid: "{}"'.format(
                                         str(getattr(obj, 'oid', '[no oid]'))))
             orb.log.debug('  cname: "{}"'.format(str(cname)))
+            self.update_assembly_graph(obj)
             if (self.mode == 'system'
                 and isinstance(obj, (orb.classes['HardwareProduct'],
                                      orb.classes['Acu'],
@@ -3239,7 +4109,7 @@ class Main(QMainWindow):
                     except:
                         orb.log.debug('  ** rpc failed (possible loss of transport)')
                         orb.log.debug('     trying to reconnect ...')
-                        self.set_bus_state()
+                        self.on_transport_lost()
                         return
                 else:
                     orb.log.debug('  calling rpc vger.save() ...')
@@ -3253,15 +4123,17 @@ class Main(QMainWindow):
                     except:
                         orb.log.debug('  ** rpc failed (possible loss of transport)')
                         orb.log.debug('     trying to reconnect ...')
-                        self.set_bus_state()
+                        self.on_transport_lost()
                         return
                 rpc.addErrback(self.on_failure)
             else:
-                # if not connected, recompute parameters and do all gui updates
+                # if not connected, journal the save, recompute parameters and
+                # do all gui updates
+                self.journal_op('save', oids=[obj.oid], new=new)
                 # -------------------------------------------------------------
                 # BEGIN OFFLINE LOCAL UPDATES
                 # -------------------------------------------------------------
-                recompute_parmz()
+                self.recompute_local_parmz()
                 if ((self.mode == 'system') and
                     state.get('tree needs refresh')):
                     # orb.log.info('  [ovgpr] tree needs refresh ...')
@@ -3302,26 +4174,349 @@ class Main(QMainWindow):
         which includes the date-time stamp.
         """
         if prop_mods and state.get('connected'):
-            try:
-                rpc = self.mbus.session.call('vger.set_properties',
-                                             props=prop_mods)
-                rpc.addCallback(self.on_vger_set_properties_result)
+            self.rpc_batch.set_props(prop_mods)
+            self.rpc_flusher.request()
+        elif prop_mods:
+            self.journal_op('props', values=prop_mods)
+
+    def flush_rpc_batch(self, oids=None, flags=None):
+        """
+        Send the updates collected in self.rpc_batch since the last flush
+        (called by self.rpc_flusher when the batch window expires).  Objects
+        are saved first (one "vger.save" call) so that the repository has any
+        new objects before their parameters, data elements, or properties are
+        set; then one call is sent per rpc type.  The results are passed to
+        the same result handlers as the individual calls.
+
+        Keyword Args:
+            oids (set):  ignored (required by Coalescer)
+            flags (set):  ignored (required by Coalescer)
+        """
+        batch = self.rpc_batch.take()
+        n = self.rpc_flusher.coalesced
+        orb.log.debug(f'* flush_rpc_batch() [{n} update(s) batched, '
+                      f'{batch["merged"]} merged]')
+        if not state.get('connected'):
+            orb.log.debug('  not connected -- journaling batched updates.')
+            self.journal_batch(batch)
+            return
+        try:
+            if batch['objs']:
+                serialized_objs = serialize(orb, batch['objs'],
+                                            include_components=True)
+                orb.log.debug(f'  calling rpc vger.save() for '
+                              f'{len(batch["objs"])} object(s) ...')
+                rpc = self.mbus.session.call('vger.save', serialized_objs)
+                rpc.addCallback(self.on_vger_save_result)
                 rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                rpc.addBoth(lambda x: self.send_batched_updates(batch))
+            else:
+                self.send_batched_updates(batch)
+        except:
+            orb.log.debug('  ** rpc failed (possible loss of transport)')
+            orb.log.debug('     trying to reconnect ...')
+            self.on_transport_lost()
+
+    def send_batched_updates(self, batch):
+        """
+        Send the parameter adds/deletes and the parameter, data element, and
+        property updates of a batch (see flush_rpc_batch()).  The repository
+        has no batch form of "vger.del_parm" and "vger.add_parm", so those are
+        still sent per (oid, pid), but only once each.
+        """
+        calls = []
+        for oid, pid in batch['parm_del']:
+            calls.append(('vger.del_parm', dict(oid=oid, pid=pid),
+                          self.on_vger_del_parm_result))
+        for oid, pid in batch['parm_add']:
+            calls.append(('vger.add_parm', dict(oid=oid, pid=pid),
+                          self.on_vger_add_parm_result))
+        if batch['parms']:
+            calls.append(('vger.set_parameters', dict(parms=batch['parms']),
+                          self.on_vger_set_parameters_result))
+        if batch['des']:
+            calls.append(('vger.set_data_elements', dict(des=batch['des']),
+                          self.on_vger_set_des_result))
+        if batch['props']:
+            calls.append(('vger.set_properties', dict(props=batch['props']),
+                          self.on_vger_set_properties_result))
+        try:
+            for uri, kw, on_result in calls:
+                orb.log.debug(f'  calling rpc {uri}() ...')
+                rpc = self.mbus.session.call(uri, **kw)
+                rpc.addCallback(on_result)
+                rpc.addErrback(self.on_failure)
+        except:
+            orb.log.debug('  ** rpc failed (possible loss of transport)')
+            orb.log.debug('     trying to reconnect ...')
+            self.on_transport_lost()
 
     def on_vger_set_properties_result(self, msg):
         if msg:
             orb.log.info(f'* vger: {msg}.')
 
+    def journal_op(self, op, force=False, **data):
+        """
+        Record an update made while not connected in the offline journal, to
+        be replayed at the next login (see replay_op_journal()).
+
+        Args:
+            op (str):  the op ("save", "delete", "freeze", "thaw", "parms",
+                "des", "props", "parm_add", or "parm_del")
+
+        Keyword Args:
+            force (bool):  journal the op even if connected (e.g. when
+                disconnecting)
+            data:  the op data (see OpJournal)
+        """
+        if state.get('connected') and not force:
+            return
+        orb.log.debug(f'* journal_op("{op}")')
+        try:
+            self.op_journal.append(op, **data)
+        except (OSError, TypeError, ValueError) as e:
+            # TypeError/ValueError: data not JSON-serializable
+            orb.log.debug(f'  ** could not journal "{op}": {e}')
+            self.op_journal.damaged = True
+
+    def journal_batch(self, batch, force=False):
+        """
+        Record the updates of an rpc batch (see flush_rpc_batch()) in the
+        offline journal -- used when the connection was lost before the batch
+        could be sent, or when disconnecting.
+
+        Keyword Args:
+            force (bool):  journal the batch even if connected
+        """
+        if batch['objs']:
+            self.journal_op('save', force=force,
+                            oids=[o.oid for o in batch['objs']])
+        for oid, pid in batch['parm_del']:
+            self.journal_op('parm_del', force=force, oid=oid, pid=pid)
+        for oid, pid in batch['parm_add']:
+            self.journal_op('parm_add', force=force, oid=oid, pid=pid)
+        for op in ['parms', 'des', 'props']:
+            if batch[op]:
+                self.journal_op(op, force=force, values=batch[op])
+
+    def replay_op_journal(self, data):
+        """
+        Replay the updates journaled while not connected (called at login,
+        before sync_user_created_objs_to_repo()).  The journal is compacted
+        (see OpJournal.compact()) so each rpc is called at most once, in the
+        order:  saves, parameter deletes and adds, parameter, data element,
+        and property updates, freezes, thaws, and deletes.  Anything the
+        repository rejects is collected in a conflict report, shown when the
+        replay is done (see on_op_journal_replayed()); updates whose rpcs
+        failed for any other reason (e.g. a timeout) are journaled again, to
+        be retried.
+
+        Args:
+            data:  parameter required for callback (ignored)
+
+        Returns:
+            Deferred or None:  fires when the replay is done
+        """
+        if self.replaying_journal:
+            # already being replayed (e.g. after a quick reconnect)
+            return
+        entries = self.op_journal.entries()
+        if not entries:
+            return
+        self.replaying_journal = True
+        batch = self.op_journal.compact()
+        self.replayed_seq = batch['seq']
+        orb.log.debug(f'* replay_op_journal() [{batch["entries"]} entries, '
+                      f'{batch["merged"]} merged]')
+        self.statusbar.showMessage('sending offline updates ...')
+        # each call is (op, rpc uri, args, kw, journal data of the op)
+        calls = []
+        objs = orb.get(oids=batch['save'])
+        if objs:
+            calls.append(('save', 'vger.save',
+                          (serialize(orb, objs, include_components=True),),
+                          {}, dict(oids=[o.oid for o in objs])))
+        for oid, pid in batch['parm_del']:
+            calls.append(('parm_del', 'vger.del_parm', (),
+                          dict(oid=oid, pid=pid), dict(oid=oid, pid=pid)))
+        for oid, pid in batch['parm_add']:
+            calls.append(('parm_add', 'vger.add_parm', (),
+                          dict(oid=oid, pid=pid), dict(oid=oid, pid=pid)))
+        if batch['parms']:
+            calls.append(('parms', 'vger.set_parameters', (),
+                          dict(parms=batch['parms']),
+                          dict(values=batch['parms'])))
+        if batch['des']:
+            calls.append(('des', 'vger.set_data_elements', (),
+                          dict(des=batch['des']), dict(values=batch['des'])))
+        if batch['props']:
+            calls.append(('props', 'vger.set_properties', (),
+                          dict(props=batch['props']),
+                          dict(values=batch['props'])))
+        for op in ['freeze', 'thaw', 'delete']:
+            if batch[op]:
+                calls.append((op, 'vger.' + op, (batch[op],), {},
+                              dict(oids=batch[op])))
+        conflicts = []
+        retries = []
+        return self._send_journal_calls(calls, conflicts, retries)
+
+    def _send_journal_calls(self, calls, conflicts, retries):
+        """
+        Send the journal replay rpcs one at a time (each after the result of
+        the previous one), collecting conflicts and the ops to be retried.
+        """
+        if not calls:
+            self.on_op_journal_replayed(conflicts, retries)
+            return
+        (op, uri, args, kw, data), rest = calls[0], calls[1:]
+        orb.log.debug(f'  replaying "{op}": calling rpc {uri}() ...')
+        try:
+            rpc = self.mbus.session.call(uri, *args,
+                                         call_site='replay_op_journal', **kw)
+        except:
+            orb.log.debug('  ** rpc failed (possible loss of transport)')
+            orb.log.debug('     offline journal kept for the next connection.')
+            self.replaying_journal = False
+            self.on_transport_lost()
+            return
+        rpc.addCallback(self.check_journal_result, op, conflicts)
+        rpc.addErrback(self.on_journal_call_failure, op, data, conflicts,
+                       retries)
+        rpc.addCallback(lambda lost: None if lost else
+                        self._send_journal_calls(rest, conflicts, retries))
+        return rpc
+
+    def on_journal_call_failure(self, f, op, data, conflicts, retries):
+        """
+        Handle the failure of a journal replay rpc:  if the transport was lost
+        the replay stops and the journal is kept (returns True); if the
+        repository rejected the call, the failure is added to the conflicts;
+        otherwise (e.g. a timeout) the op is to be journaled again and
+        retried.
+        """
+        if transport_lost(f):
+            orb.log.debug(f'  transport lost replaying "{op}" -- offline '
+                          'journal kept for the next connection.')
+            self.replaying_journal = False
+            return True
+        if rejected(f):
+            conflicts.append((op, '', f.getErrorMessage()))
+        else:
+            orb.log.debug(f'  replaying "{op}" failed '
+                          f'({f.getErrorMessage()}) -- will be retried.')
+            retries.append((op, data))
+        return False
+
+    def retry_op_journal(self):
+        """
+        Replay the offline journal again, if still connected (used to retry
+        journal ops whose rpcs failed, e.g. timed out).
+        """
+        if state.get('connected'):
+            self.replay_op_journal(None)
+
+    def check_journal_result(self, res, op, conflicts):
+        """
+        Check the result of a journal replay rpc, adding any rejected updates
+        to the conflicts as (op, oid or id, reason) tuples.
+        """
+        if op == 'save':
+            res = res or {}
+            self.on_vger_save_result(res)
+            for obj_id in res.get('unauth') or []:
+                conflicts.append((op, obj_id, 'unauthorized'))
+            for obj_id in res.get('no_owners') or []:
+                conflicts.append((op, obj_id, 'no owner'))
+        elif op == 'freeze':
+            frozens, unauth = res
+            for oid in unauth:
+                conflicts.append((op, oid, 'unauthorized'))
+        elif op == 'delete':
+            self.on_rpc_vger_delete_result(res)
+            oids_not_found, oids_deleted = res
+            for oid in oids_not_found:
+                conflicts.append((op, oid, 'not found in repository'))
+        elif isinstance(res, str) and res.startswith('failure'):
+            conflicts.append((op, '', res))
+            return
+        if op == 'parms' and isinstance(res, str):
+            # result is the stringified datetime stamp of the parameters
+            state['parmz_dts'] = res
+
+    def on_op_journal_replayed(self, conflicts, retries=None):
+        """
+        Clear the offline journal after it has been replayed -- except for
+        the ops whose rpcs failed without being rejected, which are journaled
+        again and retried after a delay -- and report any conflicts (sorted by
+        op, in replay order, and oid, so the report is the same for the same
+        journal).
+
+        Args:
+            conflicts (list):  (op, oid or id, reason) of the rejected ops
+
+        Keyword Args:
+            retries (list):  (op, journal data) of the ops to be retried
+        """
+        self.replaying_journal = False
+        damaged = self.op_journal.damaged
+        # remove only the replayed entries -- updates journaled while the
+        # replay was in progress (e.g. offline while a replay call was parked,
+        # or at logout) have not been sent
+        n_kept = self.op_journal.clear(through=self.replayed_seq)
+        for op, data in retries or []:
+            try:
+                self.op_journal.append(op, **data)
+            except OSError as e:
+                orb.log.debug(f'  ** could not journal "{op}" again: {e}')
+                self.op_journal.damaged = True
+        orb.log.debug(f'* offline journal replayed: {len(conflicts)} '
+                      f'conflict(s), {len(retries or [])} op(s) to retry, '
+                      f'{n_kept} new entries kept.')
+        if retries or n_kept:
+            delay = prefs.get('journal_retry_interval') or 60
+            self.reactor.callLater(delay, self.retry_op_journal)
+        if damaged:
+            # the journal may have missed updates, so the (full) user objects
+            # sync that follows must catch them
+            orb.log.debug('  journal was damaged -- full sync of user objects.')
+            clear_sync_cursors('user')
+        if not conflicts:
+            self.statusbar.showMessage('offline updates sent.')
+            return
+        conflicts.sort(key=lambda c: (JOURNAL_OPS.index(c[0]), c[1], c[2]))
+        for op, oid, reason in conflicts:
+            orb.log.debug(f'  - {op} {oid}: {reason}')
+        html = '<h3>Some Offline Updates Were Not Accepted</h3>'
+        html += '<p>The repository rejected the following updates made '
+        html += 'while you were offline:</p><ul>'
+        for op, oid, reason in conflicts:
+            obj = orb.get(oid) if oid else None
+            name = getattr(obj, 'id', None) or oid
+            html += f'<li><b>{op}</b> {name}: {reason}</li>'
+        html += '</ul>'
+        dlg = NotificationDialog(html, news=False, parent=self)
+        dlg.show()
+
     def on_new_objects_signal(self, objs=None):
         """
         Handle local dispatcher signal for "new objects".
         """
         self.on_mod_objects_signal(objs=objs, new=True)
 
+    def update_assembly_graph(self, obj):
+        """
+        Update the assembly graph analysis if an object is a new or modified
+        Acu.
+
+        Args:
+            obj (Identifiable):  the new or modified object
+        """
+        if isinstance(obj, orb.classes['Acu']):
+            assembly_graph.update_acu(obj.oid,
+                                      getattr(obj.assembly, 'oid', None),
+                                      getattr(obj.component, 'oid', None))
+
     def on_mod_objects_signal(self, objs=None, new=False):
         """
         Handle local "new objects" and "modified objects" signals.
@@ -3338,6 +4533,7 @@ class Main(QMainWindow):
             orb.log.debug('  object oid: "{}"'.format(
                                         str(getattr(obj, 'oid', '[no oid]'))))
             orb.log.debug('  cname: "{}"'.format(str(cname)))
+            self.update_assembly_graph(obj)
             if (self.mode == 'system'
                 and isinstance(obj, (orb.classes['HardwareProduct'],
                                      orb.classes['Acu'],
@@ -3364,9 +4560,7 @@ class Main(QMainWindow):
                 # if object is in the current db table ...
                 state['update db table'] = True
         if state.get('connected'):
-            serialized_objs = serialize(orb, objs,
-                                        include_components=True)
-            orb.log.debug('  calling rpc vger.save() ...')
+            orb.log.debug('  batching objs for rpc vger.save() ...')
             orb.log.debug('  [called from on_mod_objects_signal()]')
             orb.log.debug('  - saved objs names:')
             for obj in objs:
@@ -3375,21 +4569,16 @@ class Main(QMainWindow):
                     orb.log.debug(f'    + "{obj.name}" (subact_seq: {n})')
                 else:
                     orb.log.debug(f'    + "{obj.name}"')
-            try:
-                rpc = self.mbus.session.call('vger.save', serialized_objs)
-                rpc.addCallback(self.on_vger_save_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
-                return
+            self.rpc_batch.save(objs)
+            self.rpc_flusher.request()
         else:
-            # if not connected, recompute parameters and do all gui updates
+            # if not connected, journal the saves, recompute parameters and do
+            # all gui updates
+            self.journal_op('save', oids=[obj.oid for obj in objs], new=new)
             # -------------------------------------------------------------
             # BEGIN OFFLINE LOCAL UPDATES
             # -------------------------------------------------------------
-            recompute_parmz()
+            self.recompute_local_parmz()
             if ((self.mode == 'system') and
                 state.get('tree needs refresh')):
                 # orb.log.info('  [ovgpr] tree needs refresh ...')
@@ -3424,15 +4613,17 @@ class Main(QMainWindow):
         """
         orb.log.debug(f'* on_parms_set({parms})')
         if parms and state.get('connected'):
-            try:
-                rpc = self.mbus.session.call('vger.set_parameters',
-                                             parms=parms)
-                rpc.addCallback(self.on_vger_set_parameters_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+            # drop the cached dashboard cells of the edited objects and of the
+            # assemblies that roll them up (the repository's recomputed
+            # values arrive with the next get_parmz result)
+            dispatcher.send('parmz changed', oids=list(parms))
+            self.rpc_batch.set_parms(parms)
+            self.rpc_flusher.request()
+        elif parms:
+            self.journal_op('parms', values=parms)
+            # recompute the rolled-up parameters locally (this drops all
+            # cached dashboard cells)
+            self.recompute_local_parmz()
 
     def on_vger_set_parameters_result(self, msg):
         if msg:
@@ -3445,16 +4636,13 @@ class Main(QMainWindow):
         """
         Handle local dispatcher signal "parm added".
         """
+        if oid and pid:
+            dispatcher.send('parmz changed', oids=[oid])
         if oid and pid and state.get('connected'):
-            try:
-                rpc = self.mbus.session.call('vger.add_parm', oid=oid,
-                                             pid=pid)
-                rpc.addCallback(self.on_vger_add_parm_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+            self.rpc_batch.add_parm(oid, pid)
+            self.rpc_flusher.request()
+        elif oid and pid:
+            self.journal_op('parm_add', oid=oid, pid=pid)
 
     def on_vger_add_parm_result(self, msg):
         if msg:
@@ -3464,16 +4652,13 @@ class Main(QMainWindow):
         """
         Handle local dispatcher signal "parm del".
         """
+        if oid and pid:
+            dispatcher.send('parmz changed', oids=[oid])
         if oid and pid and state.get('connected'):
-            try:
-                rpc = self.mbus.session.call('vger.del_parm', oid=oid,
-                                             pid=pid)
-                rpc.addCallback(self.on_vger_del_parm_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+            self.rpc_batch.del_parm(oid, pid)
+            self.rpc_flusher.request()
+        elif oid and pid:
+            self.journal_op('parm_del', oid=oid, pid=pid)
 
     def on_vger_del_parm_result(self, msg):
         if msg:
@@ -3491,6 +4676,7 @@ class Main(QMainWindow):
             add_parameter(oid, pid)
             orb.log.debug('  added.')
             self.update_pgxno(mod_oids=[oid])
+            dispatcher.send('parmz changed', oids=[oid])
 
     def on_remote_parm_del(self, content):
         """
@@ -3502,6 +4688,7 @@ class Main(QMainWindow):
             delete_parameter(oid, pid, local=False)
             orb.log.debug('  deleted.')
             self.update_pgxno(mod_oids=[oid])
+            dispatcher.send('parmz changed', oids=[oid])
         else:
             orb.log.debug('  does not exist locally; no action.')
 
@@ -3509,6 +4696,8 @@ class Main(QMainWindow):
         """
         Handle local dispatcher signal "de del".
         """
+        if oid and deid:
+            dispatcher.send('des changed', oids=[oid])
         if oid and deid and state.get('connected'):
             try:
                 rpc = self.mbus.session.call('vger.del_de', oid=oid, deid=deid)
@@ -3517,7 +4706,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
 
     def on_vger_del_de_result(self, msg):
         if msg:
@@ -3532,15 +4721,13 @@ class Main(QMainWindow):
                 {oid: {deid: value}}
         """
         orb.log.debug('* on_des_set()')
+        if des:
+            dispatcher.send('des changed', oids=list(des))
         if des and state.get('connected'):
-            try:
-                rpc = self.mbus.session.call('vger.set_data_elements', des=des)
-                rpc.addCallback(self.on_vger_set_des_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+            self.rpc_batch.set_des(des)
+            self.rpc_flusher.request()
+        elif des:
+            self.journal_op('des', values=des)
 
     def on_des_set_qtsignal(self, des):
         """
@@ -3550,15 +4737,13 @@ class Main(QMainWindow):
             des (dict): dict mapping oids to dicts of the form
                 {deid : value}
         """
+        if des:
+            dispatcher.send('des changed', oids=list(des))
         if des and state.get('connected'):
-            try:
-                rpc = self.mbus.session.call('vger.set_data_elements', des=des)
-                rpc.addCallback(self.on_vger_set_des_result)
-                rpc.addErrback(self.on_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+            self.rpc_batch.set_des(des)
+            self.rpc_flusher.request()
+        elif des:
+            self.journal_op('des', values=des)
 
     def on_vger_set_des_result(self, msg):
         if msg:
@@ -3570,22 +4755,32 @@ class Main(QMainWindow):
         attributes), with content in the format (prop_mods,
         mod_datetime_string), where prop_mods has the format {oid: {prop_id:
         value}}, where prop_id is the id of parameter, data element, or
-        attribute, and if a parameter then value must be in base (mks) units.
+        attribute, and if a parameter then value must be in base (mks) units
+        -- or, as passed by process_pubsub_queue() after coalescing, {oid:
+        ({prop_id: value}, mod_datetime_string)}.
         """
         orb.log.debug('* vger pubsub: "properties set"')
-        prop_mods, mod_dt_str = content
+        if isinstance(content, dict):
+            # coalesced content (see sync.coalesce_pubsub_msgs)
+            mods = content
+        else:
+            prop_mods, mod_dt_str = content
+            mods = {oid: (prop_dict, mod_dt_str)
+                    for oid, prop_dict in prop_mods.items()}
         success_oids = set()
-        for oid, prop_dict in prop_mods.items():
+        for oid, (prop_dict, mod_dt_str) in mods.items():
             for prop_id, val in prop_dict.items():
                 status = orb.set_prop_val(oid, prop_id, val)
                 if status == 'succeeded':
                     success_oids.add(oid)
         if success_oids:
-            mod_dt = uncook_datetime(mod_dt_str)
+            # the properties may be parameters, data elements, or attributes
+            # -- either way, the dashboard cells of these oids are stale
+            dispatcher.send('parmz changed', oids=list(success_oids))
             mod_act_oids = set()
             for oid in success_oids:
                 obj = orb.get(oid)
-                obj.mod_datetime = mod_dt
+                obj.mod_datetime = uncook_datetime(mods[oid][1])
                 orb.db.commit()
                 # TODO: handle other classes ...
                 if isinstance(obj, orb.classes['Activity']):
@@ -3616,6 +4811,7 @@ class Main(QMainWindow):
                         data_elementz[oid] = modified[oid].copy()
                 state['dez_dts'] = dez_dts
                 orb.log.debug('  success: data_elementz updated.')
+                dispatcher.send('des changed', oids=list(modified))
         except:
             orb.log.debug('  failed: exception while processing msg content.')
 
@@ -3631,6 +4827,7 @@ class Main(QMainWindow):
             add_data_element(oid, deid)
             orb.log.debug('  added.')
             self.update_pgxno(mod_oids=[oid])
+            dispatcher.send('des changed', oids=[oid])
 
     def on_remote_de_del(self, content):
         """
@@ -3642,6 +4839,7 @@ class Main(QMainWindow):
             delete_data_element(oid, deid, local=False)
             orb.log.debug('  deleted.')
             self.update_pgxno(mod_oids=[oid])
+            dispatcher.send('des changed', oids=[oid])
         else:
             orb.log.debug('  does not exist locally; no action.')
 
@@ -3650,20 +4848,66 @@ class Main(QMainWindow):
     # instead of recomputing parameters locally
     # ------------------------------------------------------------------------
 
-    def get_parmz(self, oids=None):
+    def get_parmz(self, oids=None, attempt=0, full=False):
         """
         Handle local dispatcher signal "get parmz".
+
+        Parameters are fetched using the delta protocol:  the version token of
+        the local parameter cache (state['parmz_version']) is sent as `since`,
+        and the repository returns only the parameters changed since then (or
+        the full cache if there is no token or the token is too old).  If the
+        repository does not support the delta protocol, the full parameter
+        cache is requested (for the rest of the session).
+
+        Keyword Args:
+            oids (list):  ignored (this is also used as an rpc callback)
+            attempt (int):  number of failed attempts of this delta call
+            full (bool):  request the full parameter cache this time
         """
         # orb.log.debug('* get_parmz')
         if state.get('connected'):
             try:
-                rpc = self.mbus.session.call('vger.get_parmz')
-                rpc.addCallback(self.on_vger_get_parmz_result)
-                rpc.addErrback(self.on_failure)
+                if self.parmz_deltas and not full:
+                    since = state.get('parmz_version')
+                    rpc = self.mbus.session.call('vger.get_parmz',
+                                                 since=since)
+                    rpc.addCallback(self.on_vger_get_parmz_result)
+                    rpc.addErrback(self.on_get_parmz_delta_failure, attempt)
+                else:
+                    rpc = self.mbus.session.call('vger.get_parmz')
+                    rpc.addCallback(self.on_vger_get_parmz_result)
+                    rpc.addErrback(self.on_failure)
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
+
+    def on_get_parmz_delta_failure(self, f, attempt=0):
+        """
+        Handle failure of a delta (`since`) call to vger.get_parmz():  if the
+        repository rejects the call (an older repository has the procedure
+        but not the `since` argument, so it raises an error rather than "no
+        such procedure"), fall back to full pulls for the rest of the
+        session; after a timeout or a transport error retry the delta call
+        (up to FEATURE_RPC_RETRIES times, then do a full pull this time).
+
+        Args:
+            f (Failure):  the failure
+            attempt (int):  number of earlier failed attempts of the call
+        """
+        orb.log.debug('* vger.get_parmz(since=...) failed:')
+        orb.log.debug(f'  {f.getErrorMessage()}')
+        if rejected(f):
+            orb.log.debug('  falling back to full parameter pulls.')
+            self.parmz_deltas = False
+            state['parmz_version'] = None
+            self.get_parmz()
+        elif attempt < FEATURE_RPC_RETRIES:
+            orb.log.debug('  retrying ...')
+            self.get_parmz(attempt=attempt + 1)
+        else:
+            orb.log.debug('  retries failed -- full parameter pull.')
+            self.get_parmz(full=True)
 
     def on_vger_get_parmz_result(self, data):
         """
@@ -3674,10 +4918,25 @@ class Main(QMainWindow):
         """
         orb.log.info('* on_vger_get_parmz_result() [ovgpr]')
         # libs_refreshed = []
+        if is_versioned_parmz(data):
+            if data.get('expired'):
+                # our token is too old for the repository to compute a delta
+                orb.log.info('  [ovgpr] parmz version expired, full pull ...')
+                state['parmz_version'] = None
+                self.get_parmz()
+                return
+            oids = apply_parmz_delta(parameterz, data)
+            state['parmz_version'] = data['version']
+            kind = 'full' if data.get('full') else 'delta'
+            orb.log.info(f'  [ovgpr] {kind} parmz update: {len(oids)} oids')
+            # drop the cached dashboard cells of only the changed oids
+            dispatcher.send('parmz changed', oids=oids)
+        elif data:
+            # full (unversioned) parameter cache
+            parameterz.update(data)
+            state['parmz_version'] = None
+            dispatcher.send('parmz changed', oids=None)
         if data:
-            parmz_data = data
-            # orb.log.info('  [ovgpr] got parmz data, updating ...')
-            parameterz.update(parmz_data)
             oid, new = state.get("upd_obj_in_trees_needed", ("", ""))
             if oid:
                 obj = orb.get(oid)
@@ -3731,13 +4990,10 @@ class Main(QMainWindow):
                         # orb.log.info(f'  [ovgpr] calling {txt}')
                         self.system_model_window.on_signal_to_refresh()
                         state['diagram needs refresh'] = False
-            else:
-                # refresh dashboard and hw library if appropriate ...
-                if getattr(self, 'dashboard_panel', None):
-                    # NOTE: self.refresh_dashboard() is not enough.
-                    # txt = 'rebuild_dashboard(force=True) ...'
-                    # orb.log.info(f'  [ovgpr] calling {txt}')
-                    self.rebuild_dashboard(force=True)
+            # NOTE: the dashboard is no longer rebuilt here -- the "parmz
+            # changed" signal (above) makes the dashboard models drop the
+            # changed cells and repaint them, and on_parm_recompute() (below)
+            # refreshes the dashboard column widths
             # "parameters recomputed" triggers pgxnobject, rqtmanager,
             # powerdashboard, and wizard (data import) ...
             dispatcher.send("parameters recomputed")
@@ -3837,7 +5093,7 @@ class Main(QMainWindow):
                     txt = 'rpc failed (possible loss of transport)'
                     orb.log.debug(f'  ** {txt}')
                     orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
+                    self.on_transport_lost()
                     return
             else:
                 msg = 'getting parmz'
@@ -3929,7 +5185,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
 
     def rpc_update_mode_defs_result(self, result):
         """
@@ -3977,7 +5233,7 @@ class Main(QMainWindow):
                     txt = 'rpc failed (possible loss of transport)'
                     orb.log.debug(f'  ** {txt}')
                     orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
+                    self.on_transport_lost()
             else:
                 orb.log.debug('  - not connected, no rpc call.')
         else:
@@ -4039,6 +5295,10 @@ class Main(QMainWindow):
         # cname is needed here because at this point the local object has
         # already been deleted
         orb.log.debug(f'  cname="{cname}", oid="{oid}"')
+        if cname == 'Acu':
+            assembly_graph.remove_acu(oid)
+        elif cname == 'HardwareProduct':
+            assembly_graph.remove_product(oid)
         # always fix state['product'] and state['system'] if either matches the
         # deleted oid
         if (state.get('system') or {}).get(state.get('project')) == oid:
@@ -4058,8 +5318,10 @@ class Main(QMainWindow):
                 orb.log.debug('  to empty')
                 state['product'] = ''
         if not state.get('connected'):
-            # deletion was local -- do updates ...
-            recompute_parmz()
+            # deletion was local -- journal it and do updates ...
+            if not remote:
+                self.journal_op('delete', oids=[oid])
+            self.recompute_local_parmz()
             if (self.mode in ['component', 'system']
                 and cname == 'HardwareProduct'):
                 # if a library_widget exists, refresh it ...
@@ -4260,7 +5522,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
 
     # ------------------------------------------------------------------------
     # NOTE: self.remote_deleted_object is DEPRECATED in favor of dispatcher
@@ -4408,7 +5670,7 @@ class Main(QMainWindow):
                 state['product'] = ''
         if not state.get('connected'):
             # recompute parameters if operating unconnected to repo ...
-            recompute_parmz()
+            self.recompute_local_parmz()
         # only attempt to update tree and dashboard if in "system" mode ...
         if ((self.mode == 'system') and
             cname in ['Acu', 'ProjectSystemUsage', 'HardwareProduct']):
@@ -4445,7 +5707,9 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
+        else:
+            self.journal_op('delete', oids=[oid])
 
     def resync_current_project(self, msg=''):
         """
@@ -4473,6 +5737,10 @@ class Main(QMainWindow):
         dlg = FullSyncDialog(parent=self)
         if dlg.exec_():
             orb.log.debug('  confirmed, resyncing ...')
+            clear_sync_cursors()
+            # a full resync is the recovery path, so rebuild the manifest
+            # digests from the db rather than trusting the incremental ones
+            self.manifest_digests.reset()
             self.sync_with_services(force=True)
         else:
             return
@@ -4509,6 +5777,7 @@ class Main(QMainWindow):
             orb.log.debug('  calling sync_current_project()')
             rpc = self.sync_current_project(None, msg=msg)
             rpc.addCallback(self.on_project_sync_result)
+            rpc.addCallback(self.start_prefetch)
             rpc.addErrback(self.on_failure)
         else:
             self.sys_tree_rebuilt = False
@@ -4803,17 +6072,20 @@ class Main(QMainWindow):
         """
         # orb.log.debug('* refresh_tree_and_dashboard()')
         if not state.get('connected'):
-            recompute_parmz()
+            self.recompute_local_parmz()
         self.sys_tree_rebuilt = False
         self.dashboard_rebuilt = False
         self.refresh_tree_views(selected_link_oid=selected_link_oid)
 
+    @importtimes.first_call('first refresh_tree_views')
     def refresh_tree_views(self, rebuilding=False, selected_link_oid=None):
         """
         Refresh and/or rebuild the system tree and dashboard(s).  This is used
         both at startup when a project is initially set and whenever the
         current project is changed or when switching to "system mode" from
-        another mode.
+        another mode -- in those cases the views are rebuilt.  Otherwise
+        (e.g. after Acus have been added, modified or deleted) the existing
+        tree and dashboards are updated in place.
 
         Keyword Args:
             rebuilding (bool): views need to be rebuilt
@@ -4821,25 +6093,38 @@ class Main(QMainWindow):
                 that was selected when this project was last viewed.
         """
         # orb.log.debug('* refresh_tree_views()')
-        # first check for cycles in the current project systems
+        # first check for cycles in the current project systems (the
+        # assembly graph analysis is memoized, so only assemblies that have
+        # changed since the last refresh are traversed)
         psus = orb.search_exact(cname='ProjectSystemUsage',
                                 project=self.project)
-        systems = [psu.system for psu in psus]
+        systems = [psu.system for psu in psus if psu.system]
         level_count = 0
         for system in systems:
-            cycles = check_for_cycles(system)
+            cycles = assembly_graph.cycles(system.oid)
             if cycles:
+                cycle_ids = ', '.join(getattr(orb.get(oid), 'id', oid)
+                                      for oid in cycles[0])
                 html = '<h3>Cycles Found</h3>'
-                html += f'<p><b><font color="red">{cycles}</font></b></p>'
+                html += f'<p><b><font color="red">{cycle_ids}</font></b></p>'
                 dlg = NotificationDialog(html, parent=self)
                 dlg.show()
                 return
             else:
                 # determine how many levels are in the assembly ---------------
-                system_level_count = get_level_count(system)
+                system_level_count = assembly_graph.depth(system.oid)
                 if system_level_count > level_count:
                     level_count = system_level_count
         # orb.log.debug(f"* level count = {level_count}")
+        if not rebuilding and self.tree_views_current():
+            # update the existing tree and dashboards in place, which keeps
+            # their expanded nodes, selection, and scroll position
+            orb.log.debug('* refresh_tree_views(): updating in place ...')
+            self.sys_tree.source_model.sync_nodes()
+            self.multidashboard.sync_nodes()
+            self.set_expansion_levels(level_count)
+            self.refresh_dashboard()
+            return
         ######################################################################
         # TODO: possibly use get_bom() or get_assembly() when the current
         # project is set to get all sys tree items for the current project,
@@ -4912,9 +6197,7 @@ class Main(QMainWindow):
         self.expansion_select.setStyleSheet(
                                         'font-weight: bold; font-size: 14px')
         # set available expansion levels based on computed level_count ...
-        if level_count and level_count >= 1:
-            for n in range(2, level_count + 1):
-                self.expansion_select.addItem(f'{n} levels', QVariant())
+        self.set_expansion_levels(level_count)
         sys_tree_layout.addWidget(self.expansion_select)
         sys_tree_layout.addWidget(self.sys_tree)
         gripper = Gripper(self.sys_tree, w=10, h=10)
@@ -4931,6 +6214,46 @@ class Main(QMainWindow):
             state['sys_tree_expansion'][self.project.oid] = 0
         self.set_systree_expansion()
 
+    def tree_views_current(self):
+        """
+        Return True if the system tree and the dashboards exist and display
+        the current project, so that they can be updated in place.
+        """
+        try:
+            return bool(getattr(self, 'sys_tree', None)
+                        and getattr(self, 'multidashboard', None)
+                        and self.sys_tree.project.oid == self.project.oid
+                        and (self.left_dock.widget() is
+                             self.sys_tree.parentWidget())
+                        and (getattr(self, 'top_dock_widget', None)
+                             and self.top_dock_widget.widget() is
+                             getattr(self, 'dashboard_panel', None)))
+        except RuntimeError:
+            # a C++ object has been deleted (e.g. when the mode was changed)
+            return False
+
+    def set_expansion_levels(self, level_count):
+        """
+        Set the items of the tree expansion level selector (from 2 levels to
+        the number of levels in the project's assemblies).
+
+        Args:
+            level_count (int):  number of levels
+        """
+        n_items = max(level_count - 1, 0)
+        if self.expansion_select.count() == n_items:
+            return
+        # the selected level is kept, so the tree is not re-expanded
+        self.expansion_select.blockSignals(True)
+        self.expansion_select.clear()
+        for n in range(2, level_count + 1):
+            self.expansion_select.addItem(f'{n} levels', QVariant())
+        if n_items:
+            index = min(state['sys_tree_expansion'].get(self.project.oid)
+                        or 0, n_items - 1)
+            self.expansion_select.setCurrentIndex(index)
+        self.expansion_select.blockSignals(False)
+
     def set_systree_expansion(self, index=None):
         if index is None:
             index = state.get('sys_tree_expansion', {}).get(
@@ -4979,7 +6302,18 @@ class Main(QMainWindow):
             # self.dashboard_title_layout.addWidget(self.dash_select)
         # -------------------------------------------------------------------
 
+    def recompute_local_parmz(self):
+        """
+        Recompute all parameters locally (when not connected to the
+        repository) and drop all cached dashboard cells.
+        """
+        recompute_parmz()
+        dispatcher.send('parmz changed', oids=None)
+
     def on_parm_recompute(self):
+        # NOTE: the cached dashboard cells of the recomputed parameters (and of
+        # the assemblies that roll them up) have already been dropped by the
+        # "parmz changed" signal sent with the get_parmz result
         # rebuilding dashboard is only needed in "system" mode
         if self.mode == 'system':
             try:
@@ -5172,7 +6506,7 @@ class Main(QMainWindow):
                     orb.log.debug('    {}'.format(log_msg))
                     if cname == 'ProjectSystemUsage':
                         if new:
-                            # rebuild tree when a new system has been added
+                            # update tree when a new system has been added
                             self.refresh_tree_and_dashboard()
                         else:
                             # log_msg = 'obj is psu -- update project node'
@@ -5477,8 +6811,10 @@ class Main(QMainWindow):
                 pass
         w = self.geometry().width()
         h = self.geometry().height()
-        self.rqtmgr = RequirementManager(project=self.project, width=w,
-                                         height=h, parent=self)
+        rqtmanager = lazy_import('pangalactic.node.rqtmanager')
+        self.rqtmgr = rqtmanager.RequirementManager(project=self.project,
+                                                    width=w, height=h,
+                                                    parent=self)
         self.rqtmgr.show()
 
     def show_about(self):
@@ -5511,7 +6847,8 @@ class Main(QMainWindow):
         webbrowser.open_new(ref_url)
 
     def open_viewer(self, file_path):
-        self.cad_viewer = Model3DViewer(file_path)
+        viewer = lazy_import('pangalactic.node.cad.viewer')
+        self.cad_viewer = viewer.Model3DViewer(file_path)
         self.cad_viewer.show()
 
     def view_cad_success(self, result):
@@ -5521,7 +6858,8 @@ class Main(QMainWindow):
         orb.log.info('  - view_cad_error: {}'.format(e))
 
     def open_viewer_dialog(self, file_path):
-        dlg = Model3dDialog(file_path, parent=self)
+        viewer = lazy_import('pangalactic.node.cad.viewer')
+        dlg = viewer.Model3dDialog(file_path, parent=self)
         dlg.show()
 
     def new_project(self):
@@ -5611,7 +6949,7 @@ class Main(QMainWindow):
                 except:
                     orb.log.debug('  ** rpc failed (possible loss of transport)')
                     orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
+                    self.on_transport_lost()
         else:
             return
 
@@ -5632,7 +6970,7 @@ class Main(QMainWindow):
                     txt = 'rpc failed (possible loss of transport)'
                     orb.log.debug(f'  ** {txt}')
                     orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
+                    self.on_transport_lost()
                     return
         else:
             orb.log.info('  no test objects found.')
@@ -5674,7 +7012,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
                 return
         else:
             orb.log.debug('  incomplete signature, rpc not called')
@@ -5724,7 +7062,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
                 return
         else:
             orb.log.debug('  incomplete signature, rpc not called')
@@ -5760,72 +7098,33 @@ class Main(QMainWindow):
 
     def read_and_upload_file(self, fpath='', rep_file_oid='', chunk_size=None):
         """
-        Read a file into a list of chunks and call upload_file() to upload it
-        to the server.
+        Upload a file to the server (see upload_file() -- the file is read in
+        chunks as they are sent, so it is never all in memory).
         """
         orb.log.info('* read_and_upload_file()')
-        fname = os.path.basename(fpath)
-        self.chunk_progress = ProgressDialog(title='Reading File',
-                                             label=f'reading "{fname}" ...',
-                                             parent=self)
-        self.chunk_progress.setMaximum(100)
-        self.chunk_progress.setAttribute(Qt.WA_DeleteOnClose)
-        self.chunks_to_upload = []
         self.fpath_to_upload = fpath
         self.rep_file_oid_to_upload = rep_file_oid
         if fpath:
-            worker = Worker(self.chunk_file, fpath, chunk_size)
-            # worker.signals.result.connect(self.print_output)
-            worker.signals.finished.connect(self.chunking_completed)
-            worker.signals.progress.connect(self.update_chunk_progress)
-            threadpool.start(worker)
+            self.upload_file(chunk_size=chunk_size)
         else:
             orb.log.info('  no file path specified.')
 
-    def chunk_file(self, fpath, chunk_size, progress_signal):
-        orb.log.info('* chunk_file()')
-        fsize = os.path.getsize(fpath)
-        chunk_size = chunk_size or 2**20
-        # chunk_size = chunk_size or 2**19
-        if chunk_size > fsize // 7:
-            chunk_size = fsize // 7
-        orb.log.info(f'  using chunk_size {chunk_size}')
-        with open(fpath, 'rb') as f:
-            for i, chunk in enumerate(iter(partial(f.read, chunk_size), b'')):
-                self.chunks_to_upload.append(chunk)
-                p = (len(self.chunks_to_upload) * chunk_size * 100) // fsize
-                time.sleep(.01)
-                progress_signal.emit('', p)
-        orb.log.info(f'  yielding {len(self.chunks_to_upload)} chunks.')
-        # return chunks
-        # return "Done."
-
-    def update_chunk_progress(self, what, n):
-        """
-        Set max and value for chunk_progress dialog.
-
-        Args:
-            n (float): progress as a fraction (<= 1.0)
+    def upload_file(self, chunk_size=None):
         """
-        orb.log.debug(f'  chunking {n}% done')
-        self.chunk_progress.setValue(n)
-
-    def chunking_completed(self):
-        orb.log.debug('  chunking thread completed.')
-        self.chunk_progress.done(0)
-        self.chunk_progress.close()
-        # self.chunk_progress.deleteLater()
-        self.upload_file()
+        Upload a file in chunks, optionally specifying a RepresentationFile.oid
+        which if provided will be prepended to the user file name to create
+        the vault file name.  The file is first stored in the local vault by
+        content hash, and the repository is asked (rpc
+        'vger.link_vault_file') whether it already has that content -- if it
+        does, no bytes are transferred.  Otherwise the chunks are streamed
+        from disk by a ChunkUploader (see start_chunk_upload()).
 
-    def upload_file(self):
-        """
-        Upload a file from list of chunks, optionally specifying a
-        RepresentationFile.oid which if provided will be prepended to the user
-        file name to create the vault file name.
+        Keyword Args:
+            chunk_size (int):  size of chunks to be used
         """
         fpath = self.fpath_to_upload
         rep_file_oid = self.rep_file_oid_to_upload
-        if fpath and self.chunks_to_upload:
+        if fpath and os.path.exists(fpath):
             fname = os.path.basename(fpath)
             orb.log.info(f'* uploading file: "{fname}"')
             if rep_file_oid:
@@ -5833,78 +7132,180 @@ class Main(QMainWindow):
                 orb.log.info(f'  using vault file name: "{self.vault_fname}"')
             else:
                 self.vault_fname = fname
-            # before uploading file, copy it to local vault ...
-            shutil.copy(fpath, os.path.join(orb.vault, self.vault_fname))
-            orb.log.info('  [copied to local vault]')
-            self.uploaded_chunks = 0
-            self.failed_chunks = 0
-            self.upload_progress = ProgressDialog(title='File Upload',
-                                              label=f'uploading "{fname}" ...',
-                                              parent=self)
-            self.upload_progress.setAttribute(Qt.WA_DeleteOnClose)
+            # before uploading file, store it in the local vault -- by content
+            # hash, so a file that is already there takes no extra space
             try:
-                numchunks = len(self.chunks_to_upload)
-                self.upload_progress.setMaximum(numchunks)
-                self.upload_progress.setValue(0)
-                self.upload_progress.setMinimumDuration(2000)
-                orb.log.info(f'  using {numchunks} chunks ...')
+                digest = self.vault.store(fpath, self.vault_fname)
+            except OSError as e:
+                orb.log.info(f'  could not store file in vault: {e}')
+                digest = ''
+            else:
+                orb.log.info(f'  [stored in local vault, sha256 {digest[:12]}]')
+            fsize = os.path.getsize(fpath)
+            if digest and self.vault_dedup_supported:
+                # ask the repository whether it already has the content -- if
+                # so, it links the vault file name to it and no bytes need to
+                # be transferred
                 try:
-                    rpc = self.mbus.session.call('vger.upload_chunk',
+                    rpc = self.mbus.session.call('vger.link_vault_file',
                                                  fname=self.vault_fname,
-                                                 seq=0,
-                                                 data=self.chunks_to_upload[0])
-                    rpc.addCallback(self.on_chunk_upload_success)
-                    rpc.addErrback(self.on_chunk_upload_failure)
+                                                 sha256=digest, size=fsize)
                 except:
-                    txt = 'rpc failed (possible loss of transport)'
-                    orb.log.debug(f'  ** {txt}')
+                    orb.log.debug('  ** rpc failed (possible loss of transport)')
                     orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
+                    self.on_transport_lost()
+                    self.show_upload_not_done(fname)
                     return
-            except:
-                message = f'File "{fpath}" could not be uploaded.'
-                popup = QMessageBox(QMessageBox.Warning,
-                                    "Error in uploading", message,
-                                    QMessageBox.Ok, self)
-                popup.show()
-                return
+                rpc.addCallbacks(
+                    partial(self.on_link_vault_file_result, fpath,
+                            self.vault_fname, chunk_size),
+                    partial(self.on_link_vault_file_failure, fpath,
+                            self.vault_fname, chunk_size))
+            else:
+                self.start_chunk_upload(fpath, self.vault_fname, chunk_size)
         else:
-            orb.log.info('  file path or list of chunks were missing.')
+            orb.log.info('  file path was missing or not found.')
             return
 
-    def on_chunk_upload_success(self, result):
-        orb.log.info(f'  chunk {result} uploaded.')
-        self.uploaded_chunks += 1
-        self.upload_progress.setValue(self.uploaded_chunks)
-        if self.uploaded_chunks < len(self.chunks_to_upload):
-            try:
-                rpc = self.mbus.session.call('vger.upload_chunk',
-                                         fname=self.vault_fname,
-                                         seq=self.uploaded_chunks,
-                                         data=self.chunks_to_upload[
-                                                        self.uploaded_chunks])
-                rpc.addCallback(self.on_chunk_upload_success)
-                rpc.addErrback(self.on_chunk_upload_failure)
-            except:
-                orb.log.debug('  ** rpc failed (possible loss of transport)')
-                orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
-                return
-        else:
+    def on_link_vault_file_result(self, fpath, vault_fname, chunk_size,
+                                  linked):
+        """
+        Handle the result of the 'vger.link_vault_file' rpc:  if the
+        repository already had the file's content the upload is complete;
+        otherwise the file is uploaded.
+        """
+        if linked:
+            orb.log.info(f'  repository has content of "{vault_fname}" -- '
+                         'upload skipped.')
+            self.uploader = None
             self.on_file_upload_success()
+        else:
+            self.start_chunk_upload(fpath, vault_fname, chunk_size)
+
+    def on_link_vault_file_failure(self, fpath, vault_fname, chunk_size, f):
+        """
+        Handle failure of the 'vger.link_vault_file' rpc -- an older
+        repository does not have it, so the file is uploaded (and the check
+        is not attempted again in this session).  (If the transport is lost,
+        the call is parked and re-issued after reconnecting, so this only
+        sees a transport loss if the user disconnected -- the user is told
+        that the file was not uploaded.)
+        """
+        if transport_lost(f):
+            orb.log.debug('  ** rpc failed (possible loss of transport)')
+            orb.log.debug('     trying to reconnect ...')
+            self.on_transport_lost()
+            self.show_upload_not_done(os.path.basename(fpath))
+            return
+        orb.log.info('  vger.link_vault_file failed; '
+                     f'uploading file ({f.getErrorMessage()})')
+        self.vault_dedup_supported = False
+        self.start_chunk_upload(fpath, vault_fname, chunk_size)
+
+    def show_upload_not_done(self, fname):
+        """
+        Tell the user that a file was not uploaded because the connection to
+        the repository was lost.
+        """
+        orb.log.info(f'  file "{fname}" not uploaded (connection lost).')
+        message = f'File "{fname}" was not uploaded -- the connection to '
+        message += 'the repository was lost.  Please upload it again when '
+        message += 'reconnected.'
+        popup = QMessageBox(QMessageBox.Warning, "Error in uploading",
+                            message, QMessageBox.Ok, self)
+        popup.show()
 
-    def on_chunk_upload_failure(self, result):
-        orb.log.info(f'  chunk {result} failed.')
-        self.failed_chunks += 1
+    def start_chunk_upload(self, fpath, vault_fname, chunk_size=None):
+        """
+        Upload a file to the repository vault in chunks, streamed from disk by
+        a ChunkUploader.
 
-    def on_file_upload_success(self):
-        orb.log.info(f'  upload completed in {self.uploaded_chunks} chunks.')
+        Args:
+            fpath (str):  path of the file
+            vault_fname (str):  the vault file name
+
+        Keyword Args:
+            chunk_size (int):  size of chunks to be used
+        """
+        fname = os.path.basename(fpath)
+        fsize = os.path.getsize(fpath)
+        chunk_size = chunk_size or 2**20
+        if chunk_size > fsize // 7:
+            chunk_size = max(fsize // 7, 1)
+        def send(seq, data):
+            return self.mbus.session.call('vger.upload_chunk',
+                                          fname=vault_fname, seq=seq,
+                                          data=data)
+        # NOTE: chunks are sent strictly in sequence -- the repository
+        # appends them to the vault file in the order received
+        self.uploader = ChunkUploader(fpath, send, chunk_size=chunk_size,
+                            on_progress=self.on_chunk_upload_success,
+                            on_done=self.on_file_upload_success,
+                            on_failure=self.on_chunk_upload_failure)
+        self.uploaded_chunks = 0
+        self.upload_progress = ProgressDialog(title='File Upload',
+                                          label=f'uploading "{fname}" ...',
+                                          parent=self)
+        self.upload_progress.setAttribute(Qt.WA_DeleteOnClose)
+        self.upload_progress.setMaximum(self.uploader.numchunks)
+        self.upload_progress.setValue(0)
+        self.upload_progress.setMinimumDuration(2000)
+        orb.log.info(f'  using {self.uploader.numchunks} chunks '
+                     f'of {chunk_size} bytes ...')
+        try:
+            self.uploader.start()
+        except OSError:
+            self.upload_progress.done(0)
+            message = f'File "{fpath}" could not be uploaded.'
+            popup = QMessageBox(QMessageBox.Warning,
+                                "Error in uploading", message,
+                                QMessageBox.Ok, self)
+            popup.show()
+
+    def on_chunk_upload_success(self, n, throughput):
+        """
+        Progress callback of the ChunkUploader.
+
+        Args:
+            n (int):  number of chunks uploaded so far
+            throughput (float):  throughput so far [bytes/second]
+        """
+        orb.log.info(f'  chunk {n} uploaded.')
+        self.uploaded_chunks = n
+        fname = os.path.basename(self.fpath_to_upload)
+        self.upload_progress.setLabelText(f'uploading "{fname}" ... '
+                                          f'{throughput / 2**20:.1f} MB/s')
+        self.upload_progress.setValue(n)
+
+    def on_chunk_upload_failure(self, f):
+        """
+        Failure callback of the ChunkUploader (a chunk could not be uploaded
+        after retries):  an exception means the rpc could not be sent;
+        otherwise `f` is the Failure.
+        """
+        fname = os.path.basename(self.fpath_to_upload)
         self.upload_progress.done(0)
+        if isinstance(f, Exception):
+            orb.log.debug('  ** rpc failed (possible loss of transport)')
+            orb.log.debug('     trying to reconnect ...')
+            self.on_transport_lost()
+        else:
+            orb.log.info(f'  chunk upload failed: {f.getErrorMessage()}')
+        message = f'File "{fname}" could not be uploaded.'
+        popup = QMessageBox(QMessageBox.Warning, "Error in uploading",
+                            message, QMessageBox.Ok, self)
+        popup.show()
+
+    def on_file_upload_success(self):
+        if self.uploader:
+            rate = self.uploader.throughput() / 2**20
+            orb.log.info(f'  upload completed in {self.uploaded_chunks} '
+                         f'chunks ({rate:.1f} MB/s).')
+            self.upload_progress.done(0)
         model_window = getattr(self, 'system_model_window', None)
         self.fpath_to_upload = ''
         self.rep_file_oid_to_upload = ''
         self.vault_fname = ''
-        self.chunks_to_upload = []
         self.uploaded_chunks = 0
         if model_window:
             try:
@@ -5926,7 +7327,7 @@ class Main(QMainWindow):
             chunk_size (int):  size of chunks to be used
         """
         vault_fpath = orb.get_vault_fpath(rep_file)
-        if os.path.exists(vault_fpath):
+        if self.vault.record_access(os.path.basename(vault_fpath)):
             self.open_vault_file(rep_file=rep_file)
         else:
             self.download_file(digital_file=rep_file, open_file=True)
@@ -5980,7 +7381,11 @@ class Main(QMainWindow):
     def download_file(self, digital_file=None, chunk_size=None,
                       open_file=False):
         """
-        Download a file corresponding to a DigitalFile instance.
+        Download a file corresponding to a DigitalFile instance.  The chunks
+        are downloaded by a ChunkDownloader, which keeps up to
+        prefs['download_window'] (default: 4) chunk requests in flight, writes
+        each chunk at its offset in a partial file, and records the chunks
+        written so that an interrupted download is resumed.
 
         Args:
             digital_file (DigitalFile): the DigitalFile whose physical file is
@@ -5998,74 +7403,210 @@ class Main(QMainWindow):
             oid = digital_file.oid
             orb.log.info(f'* downloading to vault: "{fname}"')
             orb.log.info(f'  of digital file: "{oid}"')
+            if self.prefetcher:
+                # don't prefetch it at the same time
+                self.prefetcher.discard(oid)
+            fetch = partial(self.fetch_file_chunk, oid,
+                            call_site='download_file')
+            on_done = partial(self.on_file_download_success, oid,
+                              open_file=open_file)
+            self.downloader = ChunkDownloader(
+                                orb.get_vault_fpath(digital_file),
+                                digital_file.file_size or 0, fetch,
+                                chunk_size=chunk_size,
+                                window=prefs.get('download_window') or 4,
+                                on_progress=self.on_chunk_download_success,
+                                on_done=on_done,
+                                on_failure=self.on_chunk_download_failure)
             self.downloaded_chunks = 0
-            self.failed_chunks = 0
             self.download_progress = ProgressDialog(title='File Download',
                                           label=f'downloading "{fname}" ...',
                                           parent=self)
             self.download_progress.setAttribute(Qt.WA_DeleteOnClose)
+            self.download_progress.setMaximum(self.downloader.numchunks)
+            self.download_progress.setValue(0)
+            self.download_progress.setMinimumDuration(2000)
+            orb.log.info(f'  using {self.downloader.numchunks} chunks ...')
             try:
-                fsize = digital_file.file_size
-                numchunks = math.ceil(fsize / chunk_size)
-                self.download_progress.setMaximum(numchunks)
-                self.download_progress.setValue(0)
-                self.download_progress.setMinimumDuration(2000)
-                orb.log.info(f'  using {numchunks} chunks ...')
-                for i in range(numchunks):
-                    try:
-                        rpc = self.mbus.session.call('vger.download_chunk',
-                                                     digital_file_oid=oid,
-                                                     seq=i)
-                        rpc.addCallback(self.on_chunk_download_success)
-                        rpc.addErrback(self.on_chunk_download_failure)
-                        if i == numchunks - 1:
-                            if open_file:
-                                rpc.addCallback(self.on_download_open_success)
-                            else:
-                                rpc.addCallback(self.on_file_download_success)
-                    except:
-                        txt = 'rpc failed (possible loss of transport)'
-                        orb.log.debug(f'  ** {txt}')
-                        orb.log.debug('     trying to reconnect ...')
-                        self.set_bus_state()
-                        return
-            except:
+                self.downloader.start()
+            except OSError:
+                self.download_progress.done(0)
                 message = f'File "{fname}" could not be downloaded.'
                 popup = QMessageBox(QMessageBox.Warning,
                                     "Error in downloading", message,
                                     QMessageBox.Ok, self)
                 popup.show()
                 return
+            if self.downloader.done:
+                orb.log.info(f'  resuming: {len(self.downloader.done)} '
+                             'chunks already downloaded.')
         else:
             orb.log.info('  no DigitalFile instance; returning None.')
             return
 
-    def on_chunk_download_success(self, result):
-        oid, seq, data = result
-        orb.log.info(f'  chunk {seq} received ...')
-        self.downloaded_chunks += 1
-        self.download_progress.setValue(self.downloaded_chunks)
-        digital_file = orb.get(oid)
-        vault_fpath = orb.get_vault_fpath(digital_file)
-        with open(vault_fpath, 'ab') as vaultf:
-            vaultf.write(data)
-        orb.log.info('  appended to vault file.')
-        return result
+    def fetch_file_chunk(self, oid, seq, call_site=None):
+        """
+        Request a chunk of the physical file of a DigitalFile.
 
-    def on_chunk_download_failure(self, result):
-        orb.log.info(f'  chunk {result} failed.')
-        self.failed_chunks += 1
+        Args:
+            oid (str):  oid of the DigitalFile
+            seq (int):  sequence number of the chunk
 
-    def on_file_download_success(self, result):
-        orb.log.info(f'  download done in {self.downloaded_chunks} chunks.')
+        Keyword Args:
+            call_site (str):  call site to be recorded in the rpc stats (the
+                chunks are requested by a downloader or the prefetcher)
+
+        Returns:
+            deferred:  fires with the chunk data
+        """
+        rpc = self.mbus.session.call('vger.download_chunk',
+                                     digital_file_oid=oid, seq=seq,
+                                     call_site=call_site)
+        # result is (oid, seq, data)
+        rpc.addCallback(lambda result: result[2])
+        return rpc
+
+    def start_prefetch(self, res=None):
+        """
+        If prefs['prefetch_files'] is set, start downloading the model and
+        document files of the current project that are not in the local vault,
+        in the background:  files of the objects visible in the system tree
+        first (in display order), then the rest.  Chunks are requested only
+        while no other rpcs are in flight, at no more than
+        prefs['prefetch_rate_kb'] (default: 512) kB/s, and no more than
+        prefs['prefetch_budget_mb'] (default: 1000) MB of files are fetched
+        -- nor more than the vault cache quota leaves room for.
+
+        Args:
+            res:  result of the previous callback (passed on)
+        """
+        if not prefs.get('prefetch_files') or not state.get('connected'):
+            return res
+        self.stop_prefetch()
+        project = orb.get(state.get('project') or '')
+        if not project or project.oid == 'pgefobjects:SANDBOX':
+            return res
+        orb.log.info(f'* start_prefetch() for project {project.id}')
+        visible = []
+        if getattr(self, 'sys_tree', None):
+            visible = self.sys_tree.visible_object_oids()
+        rank = {oid: i for i, oid in enumerate(visible)}
+        budget = (prefs.get('prefetch_budget_mb') or 1000) * 2**20
+        quota_mb = prefs.get('vault_quota_mb')
+        if quota_mb:
+            budget = min(budget, max(0, int(quota_mb) * 2**20
+                                        - self.vault.stored_bytes()))
+        if not budget:
+            orb.log.info('  no room in vault quota; nothing prefetched.')
+            return res
+        fetch = partial(self.fetch_file_chunk, call_site='start_prefetch')
+        # (the message bus is None after a logout -- the prefetcher is then
+        # stopped, but a pending timer may still check is_busy())
+        self.prefetcher = Prefetcher(fetch, self.reactor,
+                            is_busy=lambda: (self.mbus is None
+                                             or self.mbus.in_flight > 0),
+                            rate=(prefs.get('prefetch_rate_kb') or 512) * 1024,
+                            budget=budget,
+                            on_file_done=self.on_prefetch_file_done,
+                            on_failure=self.on_prefetch_failure,
+                            on_done=self.on_prefetch_done)
+        queued = set()
+        for obj in orb.get_objects_for_project(project):
+            rep_files = []
+            for model in getattr(obj, 'has_models', None) or []:
+                rep_files += model.has_files or []
+            for doc_ref in getattr(obj, 'doc_references', None) or []:
+                rep_files += getattr(doc_ref.document, 'has_files', None) or []
+            for rep_file in rep_files:
+                vault_fpath = orb.get_vault_fpath(rep_file)
+                if (rep_file.oid in queued or not rep_file.file_size
+                    or os.path.exists(vault_fpath)):
+                    continue
+                queued.add(rep_file.oid)
+                self.prefetcher.add(rep_file.oid, vault_fpath,
+                                    rep_file.file_size,
+                                    priority=rank.get(obj.oid, len(rank)))
+        orb.log.info(f'  {len(queued)} files queued for prefetching.')
+        self.prefetcher.start()
+        return res
+
+    def stop_prefetch(self):
+        """
+        Stop the prefetcher, if any (its current partial file is closed and
+        kept, so the file's download resumes in the next prefetch).
+        """
+        if self.prefetcher:
+            orb.log.debug('* stopping prefetch ...')
+            self.prefetcher.stop()
+            self.prefetcher = None
+
+    def on_prefetch_file_done(self, oid, fpath):
+        orb.log.debug(f'  prefetched "{os.path.basename(fpath)}"')
+        try:
+            self.vault.adopt(os.path.basename(fpath))
+        except OSError as e:
+            orb.log.debug(f'  could not add prefetched file to vault: {e}')
+
+    def on_prefetch_failure(self, oid, f):
+        if isinstance(f, Exception):
+            msg = str(f)
+        else:
+            msg = f.getErrorMessage()
+        orb.log.info(f'  prefetch of file "{oid}" failed ({msg}); stopped.')
+
+    def on_prefetch_done(self):
+        if self.prefetcher:
+            orb.log.info(f'* prefetch done: {self.prefetcher.n_files} files.')
+
+    def on_chunk_download_success(self, n, throughput):
+        """
+        Progress callback of the ChunkDownloader.
+
+        Args:
+            n (int):  number of chunks written so far
+            throughput (float):  throughput so far [bytes/second]
+        """
+        orb.log.info(f'  chunk {n} received ...')
+        self.downloaded_chunks = n
+        self.download_progress.setLabelText(
+                        f'downloading ... {throughput / 2**20:.1f} MB/s')
+        self.download_progress.setValue(n)
+
+    def on_chunk_download_failure(self, f):
+        """
+        Failure callback of the ChunkDownloader (a chunk could not be
+        downloaded after retries):  an exception means the rpc could not be
+        sent (or the chunk was the wrong size); otherwise `f` is the Failure.
+        The partial file is kept, so the download can be resumed.
+        """
         self.download_progress.done(0)
+        if isinstance(f, Exception):
+            orb.log.info(f'  chunk download failed: {f}')
+            if not isinstance(f, ValueError):
+                self.on_transport_lost()
+        else:
+            orb.log.info(f'  chunk download failed: {f.getErrorMessage()}')
+        message = 'The file could not be downloaded -- try again later '
+        message += '(the download will be resumed).'
+        popup = QMessageBox(QMessageBox.Warning, "Error in downloading",
+                            message, QMessageBox.Ok, self)
+        popup.show()
 
-    def on_download_open_success(self, result):
+    def on_file_download_success(self, oid, open_file=False):
         orb.log.info(f'  download done in {self.downloaded_chunks} chunks.')
         self.download_progress.done(0)
-        oid, seq, data = result
-        digital_file = orb.get(oid)
-        self.open_vault_file(rep_file=digital_file)
+        # bring the downloaded file under content addressing (if its content
+        # is already in the vault, the copy is replaced by a link)
+        vault_fname = os.path.basename(self.downloader.fpath)
+        try:
+            self.vault.adopt(vault_fname)
+        except OSError as e:
+            orb.log.info(f'  could not add "{vault_fname}" to vault: {e}')
+        # make room for it (but never by evicting it)
+        self.enforce_vault_quota(keep={vault_fname})
+        if open_file:
+            digital_file = orb.get(oid)
+            self.open_vault_file(rep_file=digital_file)
 
     def on_new_hardware_clone(self, product=None, objs=None):
         # go to component mode when clone() sends "new hardware clone" signal
@@ -6089,7 +7630,7 @@ class Main(QMainWindow):
             except:
                 orb.log.debug('  ** rpc failed (possible loss of transport)')
                 orb.log.debug('     trying to reconnect ...')
-                self.set_bus_state()
+                self.on_transport_lost()
 
     def new_product_wizard(self):
         """
@@ -6122,10 +7663,11 @@ class Main(QMainWindow):
                 self.deleted_object.emit(oid, cname)
 
     def new_functional_rqt(self):
-        wizard = RqtWizard(parent=self, performance=False)
+        rqtwizard = lazy_import('pangalactic.node.rqtwizard')
+        wizard = rqtwizard.RqtWizard(parent=self, performance=False)
         if wizard.exec_() == QDialog.Accepted:
             # orb.log.debug('* rqt wizard completed.')
-            rqt_oid = rqt_wizard_state.get('rqt_oid')
+            rqt_oid = rqtwizard.rqt_wizard_state.get('rqt_oid')
             rqt = orb.get(rqt_oid)
             if rqt and getattr(wizard, 'pgxn_obj', None):
                 wizard.pgxn_obj.setAttribute(Qt.WA_DeleteOnClose)
@@ -6141,7 +7683,8 @@ class Main(QMainWindow):
                 wizard.pgxn_obj = None
 
     def new_performance_rqt(self):
-        wizard = RqtWizard(parent=self, performance=True)
+        rqtwizard = lazy_import('pangalactic.node.rqtwizard')
+        wizard = rqtwizard.RqtWizard(parent=self, performance=True)
         if wizard.exec_() == QDialog.Accepted:
             # orb.log.debug('* rqt wizard completed.')
             if getattr(wizard, 'pgxn_obj', None):
@@ -6209,12 +7752,15 @@ class Main(QMainWindow):
     def display_rqts_manager(self):
         w = self.geometry().width()
         h = self.geometry().height()
-        self.rqtmgr = RequirementManager(project=self.project, width=w,
-                                         height=h, parent=self)
+        rqtmanager = lazy_import('pangalactic.node.rqtmanager')
+        self.rqtmgr = rqtmanager.RequirementManager(project=self.project,
+                                                    width=w, height=h,
+                                                    parent=self)
         self.rqtmgr.show()
 
     def conops_modeler(self):
-        win = ConOpsModeler(parent=self)
+        conops = lazy_import('pangalactic.node.conops')
+        win = conops.ConOpsModeler(parent=self)
         win.move(50, 50)
         state['conops'] = True
         win.setAttribute(Qt.WA_DeleteOnClose)
@@ -6223,7 +7769,8 @@ class Main(QMainWindow):
     def sc_42_modeler(self):
         w = 4 * self.geometry().width() / 5
         h = self.geometry().height()
-        window = SC42Window(width=w, height=h, parent=self)
+        interface42 = lazy_import('pangalactic.node.interface42')
+        window = interface42.SC42Window(width=w, height=h, parent=self)
         window.show()
 
     def get_lom_surf_names(self, lom_oid=None):
@@ -6236,7 +7783,7 @@ class Main(QMainWindow):
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def on_vger_glsn_success(self, result):
         orb.log.debug('* on_vger_glsn_success()')
@@ -6256,7 +7803,7 @@ class Main(QMainWindow):
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def on_vger_gls_success(self, result):
         orb.log.debug('* on_vger_gls_success()')
@@ -6280,7 +7827,7 @@ class Main(QMainWindow):
         except:
             orb.log.debug('  ** rpc failed (possible loss of transport)')
             orb.log.debug('     trying to reconnect ...')
-            self.set_bus_state()
+            self.on_transport_lost()
 
     def on_vger_glp_success(self, result):
         orb.log.debug('* vger.get_lom_parms succeeded ...')
@@ -6402,21 +7949,51 @@ class Main(QMainWindow):
             self.load_serialized_objects(sobjs)
             orb.remove_deprecated_data()
 
+    def _deserialize_in_batches(self, sobjs, force_update=False):
+        """
+        Deserialize a list of serialized objects in class batches (in
+        DESERIALIZATION_ORDER), updating the progress bar and status bar once
+        per batch rather than once per object.  Used by
+        load_serialized_objects() and force_load_serialized_objects().
+
+        Args:
+            sobjs (list):  a list of serialized objects
+
+        Keyword Args:
+            force_update (bool):  force the deserializer to replace any local
+                versions of the objects
+
+        Returns:
+            list:  the deserialized objects
+        """
+        self.pb.show()
+        self.pb.setValue(0)
+        self.pb.setMaximum(len(sobjs))
+
+        def on_batch(cname, n_batch, n_done):
+            self.pb.setValue(n_done)
+            self.statusbar.showMessage(f'{cname}: {n_batch} deserialized')
+            QApplication.processEvents()
+
+        local_user_oid = getattr(self.local_user, 'oid', None)
+        objs = deserialize_in_batches(orb, sobjs,
+                                      local_user_oid=local_user_oid,
+                                      force_update=force_update,
+                                      progress=on_batch)
+        orb.log.debug(f'  {len(sobjs)} serialized objects loaded in batches.')
+        self.update_manifest_digests(objs=objs)
+        return objs
+
     def load_serialized_objects(self, sobjs, importing=False):
         objs = []
         if sobjs:
-            byclass = {}
             if importing:
                 begin = 'loading'
                 end = 'imported'
             else:
                 begin = 'syncing'
                 end = 'synced'
-            for so in sobjs:
-                if byclass.get(so['_cname']):
-                    byclass[so['_cname']].append(so)
-                else:
-                    byclass[so['_cname']] = [so]
+            byclass = group_by_class(sobjs)
             if 'Project' in byclass:
                 projid = byclass['Project'][0].get('id', '')
                 if projid:
@@ -6443,59 +8020,7 @@ class Main(QMainWindow):
                 else:
                     msg = f"data has been {end}."
             self.statusbar.showMessage(start_msg)
-            self.pb.show()
-            self.pb.setValue(0)
-            self.pb.setMaximum(len(sobjs))
-            i = 0
-            user_is_me = (getattr(self.local_user, 'oid', None) == 'me')
-            for cname in DESERIALIZATION_ORDER:
-                if cname in byclass:
-                    if cname == "Activity":
-                        # instances of Activity must all be deserialized
-                        # together so "subactivity_of" is handled properly
-                        for so in byclass[cname]:
-                            # if objs are still owned by 'me' but user has
-                            # logged in and has a local_user object ...
-                            if so.get('creator') == 'me' and not user_is_me:
-                                so['creator'] = self.local_user.oid
-                                so['modifier'] = self.local_user.oid
-                        n_byclass = len(byclass[cname])
-                        objs += deserialize(orb, byclass[cname],
-                                            force_no_recompute=True)
-                        i += n_byclass
-                        self.pb.setValue(i)
-                        msg = f'{n_byclass} Activities deserialized'
-                        self.statusbar.showMessage(msg)
-                    else:
-                        for so in byclass[cname]:
-                            # if objs are still owned by 'me' but user has
-                            # logged in and has a local_user object ...
-                            if so.get('creator') == 'me' and not user_is_me:
-                                so['creator'] = self.local_user.oid
-                                so['modifier'] = self.local_user.oid
-                            # n_byclass = len(byclass[cname])
-                            objs += deserialize(orb, [so],
-                                                force_no_recompute=True)
-                            i += 1
-                            self.pb.setValue(i)
-                            name = so.get('name', '')
-                            msg = f'{cname}:  {name}'
-                            self.statusbar.showMessage(msg)
-                    byclass.pop(cname)
-            # deserialize any other classes ...
-            if byclass:
-                for cname in byclass:
-                    for so in byclass[cname]:
-                        # if objs are still owned by 'me' but user has
-                        # logged in and has a local_user object ...
-                        if so.get('creator') == 'me' and not user_is_me:
-                            so['creator'] = self.local_user.oid
-                            so['modifier'] = self.local_user.oid
-                        # n_byclass = len(byclass[cname])
-                        objs += deserialize(orb, [so],
-                                            force_no_recompute=True)
-                        i += 1
-                        self.pb.setValue(i)
+            objs = self._deserialize_in_batches(sobjs)
             self.pb.hide()
             if not msg:
                 msg = "data has been {}.".format(end)
@@ -6509,19 +8034,10 @@ class Main(QMainWindow):
                 if state.get('connected'):
                     state['lib updates needed'] = True
                     # if connected, call get_parmz() ...
-                    try:
-                        rpc = self.mbus.session.call('vger.get_parmz')
-                        rpc.addCallback(self.on_vger_get_parmz_result)
-                        rpc.addErrback(self.on_failure)
-                    except:
-                        txt = 'rpc failed (possible loss of transport)'
-                        orb.log.debug(f'  ** {txt}')
-                        orb.log.debug('     trying to reconnect ...')
-                        self.set_bus_state()
-                        return
+                    self.get_parmz()
                 else:
                     # if not connected, work in synchronous mode ...
-                    recompute_parmz()
+                    self.recompute_local_parmz()
                     if self.mode == 'system':
                         for obj in new_products_psus_or_acus:
                             self.update_object_in_trees(obj)
@@ -6557,18 +8073,13 @@ class Main(QMainWindow):
         """
         objs = []
         if sobjs:
-            byclass = {}
             if importing:
                 begin = 'loading'
                 end = 'imported'
             else:
                 begin = 'syncing'
                 end = 'synced'
-            for so in sobjs:
-                if byclass.get(so['_cname']):
-                    byclass[so['_cname']].append(so)
-                else:
-                    byclass[so['_cname']] = [so]
+            byclass = group_by_class(sobjs)
             if 'Project' in byclass:
                 projid = byclass['Project'][0].get('id', '')
                 if projid:
@@ -6595,39 +8106,7 @@ class Main(QMainWindow):
                 else:
                     msg = f"data has been {end}."
             self.statusbar.showMessage(start_msg)
-            self.pb.show()
-            self.pb.setValue(0)
-            self.pb.setMaximum(len(sobjs))
-            i = 0
-            user_is_me = (getattr(self.local_user, 'oid', None) == 'me')
-            for cname in DESERIALIZATION_ORDER:
-                if cname in byclass:
-                    for so in byclass[cname]:
-                        # if objs are still owned by 'me' but user has
-                        # logged in and has a local_user object ...
-                        if so.get('creator') == 'me' and not user_is_me:
-                            so['creator'] = self.local_user.oid
-                            so['modifier'] = self.local_user.oid
-                        objs += deserialize(orb, [so], force_no_recompute=True,
-                                            force_update=True)
-                        i += 1
-                        self.pb.setValue(i)
-                        self.statusbar.showMessage('{}: {}'.format(cname,
-                                                       so.get('id', '')))
-                    byclass.pop(cname)
-            # deserialize any other classes ...
-            if byclass:
-                for cname in byclass:
-                    for so in byclass[cname]:
-                        # if objs are still owned by 'me' but user has
-                        # logged in and has a local_user object ...
-                        if so.get('creator') == 'me' and not user_is_me:
-                            so['creator'] = self.local_user.oid
-                            so['modifier'] = self.local_user.oid
-                        objs += deserialize(orb, [so], force_no_recompute=True,
-                                            force_update=True)
-                        i += 1
-                        self.pb.setValue(i)
+            objs = self._deserialize_in_batches(sobjs, force_update=True)
             self.pb.hide()
             if not msg:
                 msg = "data has been {}.".format(end)
@@ -6641,19 +8120,10 @@ class Main(QMainWindow):
                 if state.get('connected'):
                     # if connected, call get_parmz() ...
                     state['lib updates needed'] = True
-                    try:
-                        rpc = self.mbus.session.call('vger.get_parmz')
-                        rpc.addCallback(self.on_vger_get_parmz_result)
-                        rpc.addErrback(self.on_failure)
-                    except:
-                        txt = 'rpc failed (possible loss of transport)'
-                        orb.log.debug(f'  ** {txt}')
-                        orb.log.debug('     trying to reconnect ...')
-                        self.set_bus_state()
-                        return
+                    self.get_parmz()
                 else:
                     # if not connected, work in synchronous mode ...
-                    recompute_parmz()
+                    self.recompute_local_parmz()
                     if hasattr(self, 'library_widget'):
                         self.library_widget.refresh()
                     if self.mode == 'system':
@@ -6837,13 +8307,16 @@ class Main(QMainWindow):
             orb.log.debug('  - prefs dialog completed.')
 
     def on_units_set(self):
+        # dashboard cells are cached with their units
+        dispatcher.send('units changed')
         lib_widget = getattr(self, 'library_widget', None)
         if lib_widget:
             lib_widget.refresh()
 
     def do_admin_stuff(self):
         orb.log.debug('* admin dialog')
-        self.admin_dlg = AdminDialog(org=self.project, parent=self)
+        admin = lazy_import('pangalactic.node.admin')
+        self.admin_dlg = admin.AdminDialog(org=self.project, parent=self)
         self.admin_dlg.ldap_search_button.clicked.connect(
                                                 self.open_person_dlg)
         self.admin_dlg.new_object.connect(self.on_new_object_qtsignal)
@@ -6863,7 +8336,8 @@ class Main(QMainWindow):
         """
         Invoke the PersonSearchDialog.
         """
-        self.person_dlg = PersonSearchDialog(parent=self)
+        admin = lazy_import('pangalactic.node.admin')
+        self.person_dlg = admin.PersonSearchDialog(parent=self)
         self.person_dlg.search_button.clicked.connect(self.do_person_search)
         self.person_dlg.show()
 
@@ -6888,7 +8362,7 @@ class Main(QMainWindow):
                     txt = 'rpc failed (possible loss of transport)'
                     orb.log.debug(f'  ** {txt}')
                     orb.log.debug('     trying to reconnect ...')
-                    self.set_bus_state()
+                    self.on_transport_lost()
                     return
         else:
             orb.log.info('  bad query: must have Last Name, AUID, or UUPIC')
@@ -7012,6 +8486,8 @@ class Main(QMainWindow):
             state['connected'] = False
         if diagramz:
             orb._save_diagramz()
+        if self.rpc_stats.stats:
+            self.write_rpc_stats()
         # if hasattr(self, 'system_model_window'):
             # self.system_model_window.cache_block_model()
         # NOTE: the order of these incantations is important ...
@@ -7040,10 +8516,51 @@ def cleanup_and_save():
     state['network_warning_displayed'] = False
     write_state(os.path.join(orb.home, 'state'))
     write_trash(os.path.join(orb.home, 'trash'))
+    # append the startup report (including the subsystems loaded on first use
+    # during the session) to the history file
+    try:
+        importtimes.write_report(os.path.join(orb.home, 'import_times.json'),
+                                 version=__version__)
+    except Exception:
+        pass
+
+def finish_startup_trace():
+    """
+    Record that the main window is usable, stop timing startup phases, and
+    write the startup profile to [orb.home]/startup.prof, if
+    --profile-startup was used.  (The startup report is appended to
+    [orb.home]/import_times.json at exit -- see cleanup_and_save().)
+    """
+    importtimes.mark('window usable')
+    importtimes.finish()
+    for name, t0, elapsed, depth in importtimes.phases:
+        orb.log.debug(f'  {"  " * depth}- {name}: {elapsed:.3f} s')
+    orb.log.info('* startup: window usable at '
+                 f'{importtimes.marks[-1][1]:.3f} s')
+    if importtimes.profiler:
+        prof_path = os.path.join(orb.home, 'startup.prof')
+        try:
+            importtimes.write_profile(prof_path)
+            orb.log.info(f'  startup profile written to "{prof_path}"')
+        except Exception as e:
+            orb.log.debug(f'  could not write startup profile: {e}')
+
+
+def log_import_times():
+    """
+    Log the startup import-time report.  (The full report is appended to
+    [orb.home]/import_times.json at exit -- see cleanup_and_save().)
+    """
+    rpt = importtimes.report()
+    for label, t in rpt['marks']:
+        orb.log.info(f'* startup: {label} at {t:.3f} s')
+    for modname, t in rpt['slowest_modules'][:10]:
+        orb.log.debug(f'  - import {modname}: {t:.3f} s')
+
 
 def run(app_base_name='', app_version='', app_home='', release_mode='',
         host=None, port=None, use_tls=True, auth_method='crypto', cert=False,
-        splash_image=None, console=False, debug=False):
+        splash_image=None, console=False, debug=False, profile_startup=False):
     """
     app_base_name (str): base name of the app; default: "Pangalaxian";
                          release_mode will be appended if "dev" or "test"
@@ -7060,8 +8577,14 @@ def run(app_base_name='', app_version='', app_home='', release_mode='',
     splash_image (str):  name of the splash image file
     console (bool):      send log messages to stdout (default: False)
     debug (bool):        set logging to debug level (default: False)
+    profile_startup (bool): dump a cProfile of startup to
+                         [home]/startup.prof (default: False)
     """
-    app = QApplication(sys.argv)
+    if profile_startup:
+        importtimes.start_profile()
+    importtimes.mark('run')
+    with importtimes.phase('QApplication'):
+        app = QApplication(sys.argv)
     app_base_name = app_base_name or 'Pangalaxian'
     # app.setStyleSheet('QToolTip { border: 2px solid;}')
     # app.setStyleSheet("QToolTip { color: #ffffff; "
@@ -7140,9 +8663,10 @@ def run(app_base_name='', app_version='', app_home='', release_mode='',
     x = screen_resolution.width() // 2
     y = screen_resolution.height() // 2
     # BEGIN importing and installing the reactor
-    import qt5reactor
-    qt5reactor.install()
-    from twisted.internet import reactor
+    with importtimes.phase('reactor install'):
+        import qt5reactor
+        qt5reactor.install()
+        from twisted.internet import reactor
     # from twisted.internet.defer import setDebugging
     # END importing and installing the reactor
     if splash_path:
@@ -7153,19 +8677,26 @@ def run(app_base_name='', app_version='', app_home='', release_mode='',
         splash.showMessage('Starting ...')
         # processEvents() is needed for image to load
         QApplication.processEvents()
+        importtimes.mark('splash shown')
         # TODO:  updates to showMessage() using thread/slot+signal
-        main = Main(home=home, app_base_name=app_base_name,
-                    app_version=app_version, host=host, port=port,
-                    use_tls=use_tls, auth_method=auth_method, cert=cert,
-                    reactor=reactor, console=console, debug=debug)
+        with importtimes.phase('Main.__init__'):
+            main = Main(home=home, app_base_name=app_base_name,
+                        app_version=app_version, host=host, port=port,
+                        use_tls=use_tls, auth_method=auth_method, cert=cert,
+                        reactor=reactor, console=console, debug=debug)
         splash.finish(main)
     else:
-        main = Main(home=home, app_base_name=app_base_name,
-                    app_version=app_version, host=host, port=port,
-                    use_tls=use_tls, auth_method=auth_method, cert=cert,
-                    reactor=reactor, console=console, debug=debug)
+        with importtimes.phase('Main.__init__'):
+            main = Main(home=home, app_base_name=app_base_name,
+                        app_version=app_version, host=host, port=port,
+                        use_tls=use_tls, auth_method=auth_method, cert=cert,
+                        reactor=reactor, console=console, debug=debug)
     main.setContextMenuPolicy(Qt.PreventContextMenu)
     main.show()
+    importtimes.mark('first window')
+    log_import_times()
+    # the main window is usable when the event loop first becomes idle
+    QTimer.singleShot(0, finish_startup_trace)
     main.auto_connect()
     atexit.register(cleanup_and_save)
     # run the reactor after creating the main window but before starting the
@@ -7233,6 +8764,10 @@ if __name__ == "__main__":
                         help='debug mode (verbose logging)')
     parser.add_argument('-c', '--console', action='store_true',
                         help='send log msgs to stdout (default: False)')
+    parser.add_argument('--profile-startup', dest='profile_startup',
+                        action='store_true',
+                        help='write a cProfile of startup to '
+                             '[home]/startup.prof (default: False)')
     options = parser.parse_args()
     # DO NOT ever use an unencrypted transport!
     # tls = not options.unencrypted
@@ -7240,5 +8775,6 @@ if __name__ == "__main__":
         app_home=options.app_home, release_mode=options.release_mode,
         host=options.host, port=options.port, cert=options.cert,
         debug=options.debug, console=options.console, auth_method=options.auth,
-        splash_image=options.splash_image)
+        splash_image=options.splash_image,
+        profile_startup=options.profile_startup)
 
@@ -47,7 +47,6 @@ from pangalactic.core.units           import alt_units, in_si, ureg
 from pangalactic.core.utils.datetimes import dtstamp
 from pangalactic.core.validation      import validate_all
 from pangalactic.node.buttons         import SizedButton
-from pangalactic.node.cad.viewer      import Model3DViewer
 from pangalactic.node.dialogs         import (CannotFreezeDialog,
                                               CloningDialog,
                                               DocImportDialog,
@@ -57,6 +56,7 @@ from pangalactic.node.dialogs         import (CannotFreezeDialog,
                                               ModelsAndDocsInfoDialog,
                                               ObjectSelectionDialog,
                                               ValidationDialog)
+from pangalactic.node.importtimes     import lazy_import
 from pangalactic.node.utils           import (get_all_project_usages,
                                               get_object_title,
                                               extract_mime_data)
@@ -1532,9 +1532,13 @@ class PgxnObject(QDialog):
         if fpaths:
             fpath = fpaths[0]
             # orb.log.debug(f'  step file: "{fpath}"')
+            # for the vault cache statistics
+            dispatcher.send('vault file accessed', fpath=fpath)
         try:
             if fpath:
-                viewer = Model3DViewer(fpath=fpath, parent=self)
+                # the CAD viewer (pythonocc) is loaded on first use
+                cad_viewer = lazy_import('pangalactic.node.cad.viewer')
+                viewer = cad_viewer.Model3DViewer(fpath=fpath, parent=self)
                 viewer.show()
         except:
             orb.log.debug('  CAD model not found or not in STEP format.')
@@ -6,7 +6,7 @@ from functools import partial
 
 from pydispatch import dispatcher
 
-from PyQt5.QtCore    import QSize, Qt, QModelIndex
+from PyQt5.QtCore    import QSize, Qt
 from PyQt5.QtGui     import QCursor
 from PyQt5.QtWidgets import (QAction, QApplication, QComboBox, QGridLayout,
                              QMenu, QSizePolicy, QTreeView, QHBoxLayout,
@@ -25,7 +25,6 @@ from pangalactic.core.parametrics import (get_pval, get_power_contexts,
                                           get_modal_power,
                                           mode_defz, round_to,
                                           set_modal_context)
-from pangalactic.core.validation  import get_assembly
 from pangalactic.node.buttons     import ItemButton, SizedButton
 from pangalactic.node.pgxnobject  import PgxnObject
 from pangalactic.node.systemtree  import SystemTreeModel, SystemTreeProxyModel
@@ -112,103 +111,18 @@ class SystemSelectionView(QTreeView):
             if link.oid in sys_dict:
                 dispatcher.send(signal='set no compute', link_oid=link.oid)
 
-    def link_indexes_in_assembly(self, link, idx):
-        """
-        Find the source model indexes of all nodes in an assembly that have the
-        specified link as their `link` attribute and the specified source model
-        index.
-
-        Args:
-            link (Acu):  specified link
-            idx (QModelIndex):  index of the assembly or project node
-        """
-        if link:
-            model = self.source_model
-            assembly_node = model.get_node(idx)
-            if assembly_node.link is None:
-                return []
-            if hasattr(assembly_node.link, 'component'):
-                assembly = assembly_node.link.component
-            else:
-                assembly = assembly_node.link.system
-            # orb.log.debug('* link_indexes_in_assembly({})'.format(link.id))
-            if link.oid == assembly_node.link.oid:
-                # orb.log.debug('  assembly node *is* the link node')
-                return [idx]
-            elif model.hasChildren(idx) and link in get_assembly(assembly):
-                # orb.log.debug('  link in assembly -- looking for indexes ...')
-                link_idxs = []
-                comp_idxs = [model.index(row, 0, idx)
-                             for row in range(model.rowCount(idx))]
-                for comp_idx in comp_idxs:
-                    link_idxs += self.link_indexes_in_assembly(link, comp_idx)
-                return link_idxs
-            return []
-        return []
-
     def link_indexes_in_tree(self, link):
         """
         Find the source model indexes of all nodes in the system tree that
-        reference the specified link (Acu or ProjectSystemUsage) -- this is
-        needed for updating the tree in-place when a link object is modified.
+        reference the specified link (Acu or ProjectSystemUsage).  The nodes
+        are found in the model's node index (the nodes on the path to the link
+        are loaded if necessary).
 
         Args:
             link (Acu or ProjectSystemUsage):  specified link object
         """
         # orb.log.debug('* link_indexes_in_tree({})'.format(link.id))
-        model = self.proxy_model.sourceModel()
-        project_index = model.index(0, 0, QModelIndex())
-        # project_node = model.get_node(project_index)
-        # orb.log.debug('  for project {}'.format(project_node.obj.id))
-        # orb.log.debug('  (node cname: {})'.format(project_node.cname))
-        # ----------------------------------------------------
-        # IMPORTANT: fully populate model with child nodes ...
-        # ----------------------------------------------------
-        model.populate()
-        # first check whether link is a PSU:
-        is_a_psu = [psu for psu in model.project.systems
-                    if psu.oid == link.oid]
-        # then check whether link occurs in any system boms:
-        systems = [psu.system for psu in model.project.systems]
-        in_system = [sys for sys in systems if link in get_assembly(sys)]
-        if is_a_psu or in_system:
-            # systems exist -> project_index has children, so ...
-            child_count = model.rowCount(project_index)
-            if child_count == 0:
-                # orb.log.debug('  - no child nodes found.')
-                return []
-            sys_idxs = [model.index(row, 0, project_index)
-                        for row in range(child_count)]
-            if not sys_idxs:
-                # orb.log.debug('  - no child indexes found.')
-                return []
-            link_idxs = []
-            if is_a_psu:
-                # orb.log.debug('  - link is a ProjectSystemUsage ...')
-                # orb.log.debug('    project has {} system(s).'.format(
-                                                            # len(systems)))
-                # orb.log.debug('    tree has {} system(s).'.format(
-                                                            # len(sys_idxs)))
-                for idx in sys_idxs:
-                    system_node = model.get_node(idx)
-                    if system_node.link.oid == link.oid:
-                        # orb.log.debug('    + {}'.format(system_node.link.id))
-                        # orb.log.debug('      system: {}'.format(
-                                                        # system_node.obj.id))
-                        link_idxs.append(idx)
-                # orb.log.debug('    {} system occurrences found.'.format(
-                              # len(link_idxs)))
-            if in_system:
-                # orb.log.debug('  - link is an Acu ...')
-                for sys_idx in sys_idxs:
-                    link_idxs += self.link_indexes_in_assembly(link, sys_idx)
-                # orb.log.debug('    {} link occurrences found.'.format(
-                              # len(link_idxs)))
-            return link_idxs
-        else:
-            # orb.log.debug('  - link not found in tree.')
-            return []
-        return []
+        return self.source_model.link_indexes(link)
 
 
 class ModeDefinitionDashboard(QWidget):
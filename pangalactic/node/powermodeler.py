@@ -40,7 +40,7 @@ from pangalactic.core.parametrics     import (get_pval,
                                               round_to)
 from pangalactic.core.utils.datetimes import dtstamp, date2str
 from pangalactic.core.utils.reports   import write_power_modes_to_xlsx
-from pangalactic.core.validation      import get_level_count
+from pangalactic.node.assemblygraph   import assembly_graph
 from pangalactic.node.powerdashboard  import (ModeDefinitionDashboard,
                                               SystemSelectionView)
 from pangalactic.node.dialogs         import (DefineModesDialog, PlotDialog,
@@ -145,7 +145,7 @@ class PowerModeler(QWidget):
             elif isinstance(self._usage, orb.classes['Acu']):
                 comp = self._usage.component
             if comp is not None:
-                level_count = get_level_count(comp)
+                level_count = assembly_graph.depth(comp.oid)
         else:
             orb.log.debug("  no usage found")
         orb.log.debug(f"* level count = {level_count}")
@@ -18,8 +18,8 @@ from pangalactic.node.buttons     import SizedButton
 from pangalactic.node.dialogs     import (NotificationDialog, RqtFieldsDialog,
                                           RqtParmDialog, SelectColsDialog)
 from pangalactic.node.filters     import FilterPanel
+from pangalactic.node.importtimes import lazy_import
 from pangalactic.node.systemtree  import SystemTreeView
-from pangalactic.node.rqtwizard   import RqtWizard
 from pangalactic.node.widgets     import ColorLabel
 from pangalactic.node.wizards     import DataImportWizard
 
@@ -408,7 +408,9 @@ class RequirementManager(QDialog):
         if rqt:
             if 'modify' in get_perms(rqt):
                 is_perf = (rqt.rqt_type == 'performance')
-                wizard = RqtWizard(parent=self, rqt=rqt, performance=is_perf)
+                rqtwizard = lazy_import('pangalactic.node.rqtwizard')
+                wizard = rqtwizard.RqtWizard(parent=self, rqt=rqt,
+                                             performance=is_perf)
                 if wizard.exec_() == QDialog.Accepted:
                     orb.log.info('* rqt wizard completed.')
                 else:
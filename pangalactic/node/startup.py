@@ -2,17 +2,20 @@
 """
 Startup processes for pangalaxian.
 """
-import os, shutil
+import hashlib, json, os, shutil
 # import platform
 from copy import deepcopy
 
+# PyQt5
+from PyQt5.QtCore import QResource
+
 # pangalactic
 from pangalactic.core         import orb
 from pangalactic.core         import config, prefs, state
 from pangalactic.core.meta    import (DEFAULT_CLASS_PARAMETERS,
                                       DEFAULT_DASHBOARD_SCHEMAS,
                                       PGXN_PARAMETERS)
-from pangalactic.node         import docs, icons, images
+from pangalactic.node         import __version__, docs, icons, images
 from pangalactic.node.docs    import images as doc_images
 
 
@@ -100,116 +103,163 @@ def setup_dirs_and_state(app_name='Pangalaxian'):
     # icon and image paths are set relative to home dir (icon_dir is used for
     # standard PanGalactic icons; icons created at runtime are saved into the
     # 'vault' directory, along with other runtime-created files)
-    # [1] copy pangalactic image files from 'images' module to orb.image_dir
     orb.image_dir = os.path.join(orb.home, 'images')
-    image_files = set()
-    # orb.log.debug('* checking for images in [orb.home]/images ...')
-    if not os.path.exists(orb.image_dir):
-        os.makedirs(orb.image_dir)
-    else:
-        image_files = set(os.listdir(orb.image_dir))
-    # orb.log.debug('  - found %i images' % len(image_files))
-    images_mod_path = images.__path__[0]
-    image_res_files = set([s for s in os.listdir(images_mod_path)
-                           if (not s.startswith('__init__')
-                           and not s.startswith('__pycache__'))
-                           ])
-    images_to_copy = image_res_files - image_files
-    # orb.log.debug('  - images to be installed: %i' % len(images_to_copy))
-    if images_to_copy:
-        # orb.log.debug('  - copying images into images dir ...')
-        images_cpd = []
-        for p in images_to_copy:
-            shutil.copy(os.path.join(images_mod_path, p), orb.image_dir)
-            images_cpd.append(p)
-        # orb.log.debug('  - new images installed: {}'.format(str(images_cpd)))
-    else:
-        # orb.log.debug('  - all images already installed.')
-        pass
-    # [2] copy pangalactic icon files from 'icons' module to orb.icon_dir
     orb.icon_dir = os.path.join(orb.home, 'icons')
     state['icon_dir'] = os.path.join(orb.home, 'icons')
-    icon_files = set()
-    # orb.log.debug('* checking for icons in [orb.home]/icons ...')
-    if not os.path.exists(state['icon_dir']):
-        os.makedirs(state['icon_dir'])
-    else:
-        icon_files = set(os.listdir(state['icon_dir']))
-    # orb.log.debug('  - found %i icons' % len(icon_files))
-    icons_mod_path = icons.__path__[0]
-    icon_res_files = set([s for s in os.listdir(icons_mod_path)
-                          if (not s.startswith('__init__')
-                          and not s.startswith('__pycache__'))
-                          ])
-    icons_to_copy = icon_res_files - icon_files
-    # orb.log.debug('  - icons to be installed: %i' % len(icons_to_copy))
-    if icons_to_copy:
-        # orb.log.debug('  - copying icons into icons dir ...')
-        icons_cpd = []
-        for p in icons_to_copy:
-            shutil.copy(os.path.join(icons_mod_path, p), state['icon_dir'])
-            icons_cpd.append(p)
-        # orb.log.debug('  - new icons installed: {}'.format(str(icons_cpd)))
-    else:
-        # orb.log.debug('  - all icons already installed.')
-        pass
-    # [3] copy pangalactic docs files from 'docs' module to orb.docs_dir
     orb.docs_dir = os.path.join(orb.home, 'docs')
     state['docs_dir'] = os.path.join(orb.home, 'docs')
-    docs_files = set()
-    # orb.log.debug('* checking for docs in [orb.home]/docs ...')
-    if not os.path.exists(state['docs_dir']):
-        os.makedirs(state['docs_dir'])
-    else:
-        docs_files = set(os.listdir(state['docs_dir']))
-    # orb.log.debug('  - found %i docs' % len(docs_files))
-    docs_mod_path = docs.__path__[0]
-    docs_res_files = set([s for s in os.listdir(docs_mod_path)
-                          if (not s.startswith('__init__')
-                              and not s.startswith('__pycache__')
-                              and not s == 'images')
-                          ])
-    docs_to_copy = docs_res_files - docs_files
-    # orb.log.debug('  - docs to be installed: %i' % len(docs_to_copy))
-    if docs_to_copy:
-        # orb.log.debug('  - copying docs into docs dir ...')
-        docs_cpd = []
-        for p in docs_to_copy:
-            shutil.copy(os.path.join(docs_mod_path, p), state['docs_dir'])
-            docs_cpd.append(p)
-        # orb.log.debug('  - new docs installed: {}'.format(str(docs_cpd)))
-    else:
-        # orb.log.debug('  - all docs already installed.')
-        pass
-    # [4] copy pangalactic docs/images files from 'docs' module to
-    # orb.doc_images_dir
     orb.doc_images_dir = os.path.join(orb.home, 'docs', 'images')
     state['doc_images_dir'] = os.path.join(orb.home, 'docs', 'images')
-    doc_images_files = set()
-    # orb.log.debug('* checking for docs/images in [orb.home]/docs ...')
-    if not os.path.exists(state['doc_images_dir']):
-        os.makedirs(state['doc_images_dir'])
-    else:
-        doc_images_files = set(os.listdir(state['doc_images_dir']))
-    # orb.log.debug('  - found %i doc images' % len(doc_images_files))
-    doc_images_mod_path = doc_images.__path__[0]
-    doc_images_res_files = set([s for s in os.listdir(doc_images_mod_path)
-                                 if (not s.startswith('__init__')
-                                     and not s.startswith('__pycache__'))
-                                 ])
-    doc_images_to_copy = doc_images_res_files - doc_images_files
-    n = len(doc_images_to_copy)
-    orb.log.debug(f'  - doc images to be installed: {n}')
-    if doc_images_to_copy:
-        # orb.log.debug('  - copying doc images into docs/images dir ...')
-        doc_images_cpd = []
-        for p in doc_images_to_copy:
-            shutil.copy(os.path.join(doc_images_mod_path, p),
-                        state['doc_images_dir'])
-            doc_images_cpd.append(p)
-        # n_imgs = len(doc_images_cpd)
-        # orb.log.debug(f'  - {n_imgs} new doc images installed.')
-    else:
-        # orb.log.debug('  - all doc images already installed.')
-        pass
+    # if configured, serve icons from a compiled Qt resource bundle rather
+    # than from the home directory
+    use_icon_bundle = register_icon_bundle()
+    install_resources(skip=['icons'] if use_icon_bundle else [])
+
+
+def register_icon_bundle():
+    """
+    If config['icon_resource_file'] specifies a compiled Qt resource bundle
+    containing the icons under the prefix "/icons" (created from a .qrc file
+    by `rcc -binary icons.qrc -o icons.rcc`), register it and set the icon
+    dir to ":/icons" so that icons are loaded from the bundle and the home
+    directory (which may be on a slow network share) is not touched.
+    (Icon paths in a bundle are checked with utils.icon_exists(), since
+    os.path.exists() is always False for them.  The bundle is not used on
+    platforms whose path separator is not "/", because icon paths are built
+    with os.path.join(), which would produce invalid resource paths.)
+
+    Returns:
+        bool:  True if the bundle was registered
+    """
+    rcc_path = config.get('icon_resource_file')
+    if not rcc_path:
+        return False
+    if os.sep != '/':
+        orb.log.debug('  - icon resource file ignored on this platform.')
+        return False
+    if not os.path.isabs(rcc_path):
+        rcc_path = os.path.join(orb.home, rcc_path)
+    if os.path.exists(rcc_path) and QResource.registerResource(rcc_path):
+        orb.log.debug(f'  - icons will be served from "{rcc_path}"')
+        orb.icon_dir = ':/icons'
+        state['icon_dir'] = ':/icons'
+        return True
+    orb.log.debug(f'  - icon resource file "{rcc_path}" could not be used.')
+    return False
+
+
+def get_resource_sets():
+    """
+    Return the packaged resource sets as a list of tuples:
+
+        (set name, packaged dir, installed dir, names to exclude)
+    """
+    return [('images', images.__path__[0], orb.image_dir, ()),
+            ('icons', icons.__path__[0], state['icon_dir'], ()),
+            ('docs', docs.__path__[0], state['docs_dir'], ('images',)),
+            ('doc_images', doc_images.__path__[0], state['doc_images_dir'],
+             ())]
+
+
+def file_hash(path):
+    """
+    Return the sha1 hex digest of a file's contents.
+    """
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def build_resource_manifest(src_dir, exclude=()):
+    """
+    Return a manifest {file name: [size, sha1 hex digest]} of the resource
+    files in a packaged resource dir.
+    """
+    manifest = {}
+    for name in os.listdir(src_dir):
+        if (name.startswith('__init__') or name.startswith('__pycache__')
+            or name in exclude):
+            continue
+        path = os.path.join(src_dir, name)
+        if os.path.isfile(path):
+            manifest[name] = [os.path.getsize(path), file_hash(path)]
+    return manifest
+
+
+def get_resource_stamp(src_dir):
+    """
+    Return the latest modification time of a packaged resource dir and of
+    the files in it (the dir's own mtime changes only when files are added,
+    removed, or renamed, not when a file is edited in place).
+    """
+    mtimes = [os.stat(src_dir).st_mtime]
+    for entry in os.scandir(src_dir):
+        if entry.is_file():
+            mtimes.append(entry.stat().st_mtime)
+    return max(mtimes)
+
+
+def install_resources(skip=None):
+    """
+    Install new or changed packaged resource files (images, icons, docs, and
+    doc images) into the app home directory.
+
+    A manifest of the installed resources -- {set name: {file name: [size,
+    sha1]}}, along with the package version and a stamp (the latest
+    modification time of each packaged resource dir and its files) -- is
+    kept in [orb.home]/resources.json.  If neither the version nor the
+    stamps have changed since the last install and all the installed files
+    are still present, nothing else is read; otherwise the packaged files
+    are hashed and only those whose size or hash differ from the manifest
+    (or which are missing from the home dir) are copied.  (Deleting
+    resources.json forces a full check on the next startup.)
 
+    Keyword Args:
+        skip (list of str):  names of resource sets not to install
+    """
+    skip = skip or []
+    manifest_path = os.path.join(orb.home, 'resources.json')
+    installed = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path) as f:
+                installed = json.load(f)
+        except (OSError, ValueError):
+            installed = {}
+    resource_sets = [rs for rs in get_resource_sets() if rs[0] not in skip]
+    for set_name, src_dir, dest_dir, exclude in resource_sets:
+        if not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+    stamp = {set_name: get_resource_stamp(src_dir)
+             for set_name, src_dir, dest_dir, exclude in resource_sets}
+    sets = installed.get('sets') or {}
+    if (installed.get('version') == __version__
+        and all(installed.get('stamp', {}).get(k) == v
+                for k, v in stamp.items())
+        and all(os.path.exists(os.path.join(dest_dir, name))
+                for set_name, src_dir, dest_dir, exclude in resource_sets
+                for name in (sets.get(set_name) or {}))):
+        # orb.log.debug('  - all resources already installed.')
+        return
+    orb.log.debug('* packaged resources changed -- checking manifest ...')
+    for set_name, src_dir, dest_dir, exclude in resource_sets:
+        packaged = build_resource_manifest(src_dir, exclude=exclude)
+        current = sets.get(set_name) or {}
+        n = 0
+        for name, entry in packaged.items():
+            dest_path = os.path.join(dest_dir, name)
+            if current.get(name) != entry or not os.path.exists(dest_path):
+                shutil.copy(os.path.join(src_dir, name), dest_dir)
+                n += 1
+        orb.log.debug(f'  - {set_name}: {n} new or changed file(s) installed')
+        sets[set_name] = packaged
+    installed_stamp = installed.get('stamp') or {}
+    installed_stamp.update(stamp)
+    installed = dict(version=__version__, stamp=installed_stamp, sets=sets)
+    try:
+        with open(manifest_path, 'w') as f:
+            json.dump(installed, f)
+    except OSError as e:
+        orb.log.debug(f'  - could not write resource manifest: {e}')
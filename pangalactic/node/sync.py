@@ -0,0 +1,1062 @@
+# -*- coding: utf-8 -*-
+"""
+Repository sync helpers for pangalaxian.
+
+These functions do not depend on Qt, so they can be used (and benchmarked)
+without a running GUI.
+"""
+import hashlib, json, os, time
+from contextlib import contextmanager
+
+from twisted.internet.defer import CancelledError, TimeoutError
+
+from pangalactic.core             import state
+from pangalactic.core.serializers import DESERIALIZATION_ORDER, deserialize
+
+
+def group_by_class(sobjs):
+    """
+    Group a list of serialized objects by class name, preserving the order in
+    which they were received within each class.
+
+    Args:
+        sobjs (list of dict):  serialized objects
+
+    Returns:
+        dict:  mapping of class name to list of serialized objects
+    """
+    byclass = {}
+    for so in sobjs:
+        if not so:
+            # ignore None or "empty" objects
+            continue
+        byclass.setdefault(so['_cname'], []).append(so)
+    return byclass
+
+
+def get_batch_order(byclass):
+    """
+    Return the class names in `byclass` in the order in which their batches
+    should be deserialized:  first those in DESERIALIZATION_ORDER, then any
+    other classes in the order in which they were received.
+
+    Args:
+        byclass (dict):  mapping of class name to serialized objects
+
+    Returns:
+        list:  class names
+    """
+    cnames = [cname for cname in DESERIALIZATION_ORDER if cname in byclass]
+    cnames += [cname for cname in byclass if cname not in cnames]
+    return cnames
+
+
+def deserialize_in_batches(orb, sobjs, local_user_oid=None,
+                           force_update=False, progress=None):
+    """
+    Deserialize a list of serialized objects in class-batched order, calling
+    deserialize() once per class (so that each class batch is deserialized in
+    a single transaction) rather than once per object.
+
+    Args:
+        orb (Uberorb):  the orb
+        sobjs (list of dict):  serialized objects
+
+    Keyword Args:
+        local_user_oid (str):  oid of the logged-in local user -- if given,
+            any objects whose creator is still "me" will be reassigned to the
+            local user
+        force_update (bool):  force the deserializer to replace any local
+            versions of the objects
+        progress (callable):  function to be called after each batch with the
+            args (cname, batch size, number of objects deserialized so far)
+
+    Returns:
+        list:  the objects returned by deserialize()
+    """
+    objs = []
+    byclass = group_by_class(sobjs)
+    kw = dict(force_no_recompute=True)
+    if force_update:
+        kw['force_update'] = True
+    n = 0
+    for cname in get_batch_order(byclass):
+        batch = byclass[cname]
+        if local_user_oid and local_user_oid != 'me':
+            for so in batch:
+                # if objs are still owned by 'me' but user has logged in and
+                # has a local_user object ...
+                if so.get('creator') == 'me':
+                    so['creator'] = local_user_oid
+                    so['modifier'] = local_user_oid
+        objs += deserialize(orb, batch, **kw) or []
+        n += len(batch)
+        if progress:
+            progress(cname, len(batch), n)
+    return objs
+
+
+class ChunkSizer(object):
+    """
+    Adaptive sizer for chunks of objects fetched from the repository.  The
+    chunk size grows while responses are fast and well under the transport
+    payload limit, and shrinks when a response nears the limit, is slow, or
+    times out.  Every decision is logged so that the server side can be tuned.
+
+    Attributes:
+        size (int):  the current chunk size (number of objects)
+        minimum (int):  smallest chunk size
+        maximum (int):  largest chunk size
+        max_payload (int):  transport payload limit [bytes]
+        target_latency (float):  round-trip time [seconds] below which the
+            chunk size may grow
+        bytes_per_obj (float):  running estimate of serialized bytes per
+            object (None until the first response)
+        log (callable):  function to be called with log messages
+    """
+    # fraction of max_payload that a response may reach before shrinking
+    high_water = 0.75
+    # fraction of max_payload that the next chunk may be expected to reach
+    # for growth to be allowed
+    low_water = 0.4
+    growth_factor = 1.5
+
+    def __init__(self, size=50, minimum=5, maximum=500, max_payload=1048576,
+                 target_latency=2.0, log=None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = min(max(int(size or minimum), minimum), maximum)
+        self.max_payload = max_payload
+        self.target_latency = target_latency
+        self.bytes_per_obj = None
+        self.log = log or (lambda msg: None)
+
+    def record(self, n_objs, payload, elapsed):
+        """
+        Record a response and adjust the chunk size.
+
+        Args:
+            n_objs (int):  number of objects requested in the chunk
+            payload (int):  size of the serialized response [bytes]
+            elapsed (float):  round-trip time [seconds]
+        """
+        if n_objs:
+            per_obj = payload / n_objs
+            if self.bytes_per_obj is None:
+                self.bytes_per_obj = per_obj
+            else:
+                # exponentially weighted moving average
+                self.bytes_per_obj = 0.7 * self.bytes_per_obj + 0.3 * per_obj
+        old_size = self.size
+        if payload >= self.high_water * self.max_payload:
+            self.size = max(self.minimum, self.size // 2)
+            why = 'near payload limit'
+        elif elapsed > 2 * self.target_latency:
+            self.size = max(self.minimum, self.size // 2)
+            why = 'slow'
+        elif elapsed < self.target_latency:
+            grown = int(self.size * self.growth_factor)
+            expected = grown * (self.bytes_per_obj or 0)
+            if expected <= self.low_water * self.max_payload:
+                self.size = min(self.maximum, grown)
+                why = 'fast'
+            else:
+                why = 'payload limit'
+        else:
+            why = 'steady'
+        self.log(f'[chunk sizer] {n_objs} objs, {payload} bytes, '
+                 f'{elapsed:.3f} s ({why}): size {old_size} -> {self.size}')
+
+    def record_timeout(self, n_objs):
+        """
+        Record a timed-out request and shrink the chunk size.
+
+        Args:
+            n_objs (int):  number of objects requested in the chunk
+        """
+        old_size = self.size
+        self.size = max(self.minimum, min(self.size, n_objs) // 2)
+        self.log(f'[chunk sizer] {n_objs} objs timed out: '
+                 f'size {old_size} -> {self.size}')
+
+
+# number of objects in a chunk of 'vger.get_objects' results from which the
+# size of the chunk is estimated (see payload_size())
+PAYLOAD_SAMPLE = 10
+
+
+def payload_size(data, sample=None):
+    """
+    Return the approximate size [bytes] of decoded rpc arguments or results
+    as they would be serialized on the wire (as JSON).
+
+    Keyword Args:
+        sample (int):  if specified and the data is a longer list (e.g. of
+            serialized objects), the size is estimated from the sizes of
+            `sample` items spread over the list, rather than serializing
+            all of it
+    """
+    try:
+        if sample and isinstance(data, list) and len(data) > sample:
+            step = len(data) / sample
+            items = [data[int(i * step)] for i in range(sample)]
+            return int(len(json.dumps(items, default=str))
+                       * len(data) / sample)
+        return len(json.dumps(data, default=str))
+    except Exception:
+        return 0
+
+
+class ChunkScheduler(object):
+    """
+    Scheduler for fetching a sequence of items (e.g. oids for the
+    `vger.get_objects` rpc) in chunks, keeping a fixed number of requests in
+    flight, buffering the responses, and handing them to the loader strictly
+    in the order of the items, so that network latency overlaps local
+    deserialization.  Chunks are cut as they are requested, using the current
+    size from a ChunkSizer if one is given.  A chunk that times out is
+    requested again (up to `max_retries` times) before the scheduler fails.
+
+    Attributes:
+        items (list):  the items to be fetched
+        fetch (callable):  function that takes a chunk (list of items) and
+            returns a Deferred whose result is the response for that chunk
+        on_chunk (callable):  function to be called with each response, in
+            order
+        on_done (callable):  function to be called (with no args) after the
+            last response has been loaded
+        on_failure (callable):  function to be called with the Failure (or
+            exception) if a fetch fails -- the scheduler is then stopped
+        window (int):  maximum number of requests in flight
+        chunk_size (int):  chunk size to use if there is no sizer
+        sizer (ChunkSizer):  adaptive chunk sizer (optional)
+        max_retries (int):  number of times a timed-out chunk is re-requested
+    """
+    def __init__(self, items, fetch, on_chunk, on_done=None, on_failure=None,
+                 window=3, chunk_size=50, sizer=None, max_retries=2):
+        self.items = list(items)
+        self.fetch = fetch
+        self.on_chunk = on_chunk
+        self.on_done = on_done
+        self.on_failure = on_failure
+        self.window = max(1, int(window or 1))
+        self.chunk_size = max(1, int(chunk_size or 1))
+        self.sizer = sizer
+        self.max_retries = max_retries
+        # chunks that have been cut, in order (index is the sequence number)
+        self.chunks = []
+        # position in self.items of the next item to be put in a chunk
+        self.next_item = 0
+        self.next_to_load = 0
+        self.in_flight = 0
+        self.retries = {}
+        self.buffer = {}
+        self.loading = False
+        self.stopped = False
+
+    @property
+    def done(self):
+        return (self.next_item >= len(self.items)
+                and self.next_to_load >= len(self.chunks))
+
+    def current_size(self):
+        if self.sizer:
+            return self.sizer.size
+        return self.chunk_size
+
+    def pending_chunks(self):
+        """
+        Return the chunks that have not yet been loaded, including an
+        estimate (at the current chunk size) of the chunks not yet cut.
+        """
+        pending = self.chunks[self.next_to_load:]
+        rest = self.items[self.next_item:]
+        size = self.current_size()
+        pending += [rest[i:i+size] for i in range(0, len(rest), size)]
+        return pending
+
+    def start(self):
+        """
+        Start fetching.  If there are no items, on_done is called at once.
+        """
+        if not self.items:
+            self.stopped = True
+            if self.on_done:
+                self.on_done()
+            return
+        self._fill_window()
+
+    def stop(self):
+        """
+        Stop the scheduler:  no further requests will be sent and any
+        responses still outstanding will be ignored.
+        """
+        self.stopped = True
+        self.buffer = {}
+
+    def _fill_window(self):
+        # responses received but not yet loaded count against the window, so
+        # that a slow early chunk cannot cause unbounded buffering
+        while (not self.stopped
+               and self.in_flight + len(self.buffer) < self.window
+               and self.next_item < len(self.items)):
+            size = self.current_size()
+            chunk = self.items[self.next_item:self.next_item + size]
+            self.next_item += len(chunk)
+            self.chunks.append(chunk)
+            if not self._request(len(self.chunks) - 1):
+                return
+
+    def _request(self, i):
+        self.in_flight += 1
+        try:
+            d = self.fetch(self.chunks[i])
+        except Exception as e:
+            self.in_flight -= 1
+            self._fail(e)
+            return False
+        d.addCallbacks(self._on_response, self._on_error,
+                       callbackArgs=(i, time.monotonic()), errbackArgs=(i,))
+        return True
+
+    def _on_response(self, data, i, t0):
+        self.in_flight -= 1
+        if self.stopped:
+            return
+        if self.sizer:
+            # (the size of the response is estimated from a sample of the
+            # objects, since this runs on the GUI thread)
+            self.sizer.record(len(self.chunks[i]),
+                              payload_size(data, sample=PAYLOAD_SAMPLE),
+                              time.monotonic() - t0)
+        self.buffer[i] = data
+        # request more before loading, so the server is working on the next
+        # chunks while this one is being deserialized
+        self._fill_window()
+        self._drain()
+
+    def _on_error(self, f, i):
+        self.in_flight -= 1
+        if self.stopped:
+            return
+        if (f.check(TimeoutError, CancelledError)
+            and self.retries.get(i, 0) < self.max_retries):
+            self.retries[i] = self.retries.get(i, 0) + 1
+            if self.sizer:
+                self.sizer.record_timeout(len(self.chunks[i]))
+            self._request(i)
+            return
+        self._fail(f)
+
+    def _fail(self, f):
+        if self.stopped:
+            return
+        self.stop()
+        if self.on_failure:
+            self.on_failure(f)
+
+    def _drain(self):
+        # on_chunk may process GUI events, during which further responses can
+        # arrive -- those are only buffered, and loaded by this loop
+        if self.loading:
+            return
+        self.loading = True
+        try:
+            while not self.stopped and self.next_to_load in self.buffer:
+                data = self.buffer.pop(self.next_to_load)
+                self.next_to_load += 1
+                self.on_chunk(data)
+                self._fill_window()
+        finally:
+            self.loading = False
+        if not self.stopped and self.done:
+            self.stopped = True
+            if self.on_done:
+                self.on_done()
+
+
+def is_versioned_parmz(data):
+    """
+    Return True if `data` (the result of the `vger.get_parmz` rpc) is a
+    versioned (delta protocol) result rather than a plain parameterz dict.
+
+    A versioned result is a dict of the form:
+
+        {'version': [version token of the server's parameter cache],
+         'full':    [True if 'parmz' is the complete cache],
+         'expired': [True if the requested token was too old],
+         'parmz':   {oid: {pid: parameter}} (changed since the token),
+         'removed': {oid: [pids] or None (all parameters of the oid)}}
+    """
+    return (isinstance(data, dict) and 'version' in data
+            and ('parmz' in data or 'expired' in data))
+
+
+def apply_parmz_delta(parmz_cache, data):
+    """
+    Apply a versioned `vger.get_parmz` result in place to a parameter cache
+    (e.g. `parameterz`).  Changed parameters of an object are merged into its
+    existing parameters unless the result is a full refresh, in which case
+    each object's parameters are replaced.
+
+    Args:
+        parmz_cache (dict):  the parameter cache
+        data (dict):  a versioned get_parmz result (see is_versioned_parmz)
+
+    Returns:
+        list:  oids whose parameters were changed or removed
+    """
+    changes = data.get('parmz') or {}
+    full = data.get('full')
+    for oid, parms in changes.items():
+        if full or oid not in parmz_cache:
+            parmz_cache[oid] = parms
+        else:
+            parmz_cache[oid].update(parms)
+    removed = data.get('removed') or {}
+    for oid, pids in removed.items():
+        if pids is None:
+            parmz_cache.pop(oid, None)
+        elif oid in parmz_cache:
+            for pid in pids:
+                parmz_cache[oid].pop(pid, None)
+    return list(changes) + [oid for oid in removed if oid not in changes]
+
+
+@contextmanager
+def savepoint(session):
+    """
+    Context manager to apply a block of operations (e.g. the handling of one
+    pubsub message) within a savepoint (nested transaction):  if the block
+    raises an exception, only its changes are rolled back, so that the
+    session can still be used for later blocks.  (If the block has already
+    committed the savepoint, the session is rolled back.)
+
+    Args:
+        session (Session):  the database session (e.g. `orb.db`)
+    """
+    nested = session.begin_nested()
+    try:
+        yield session
+    except Exception:
+        if nested.is_active:
+            nested.rollback()
+        else:
+            session.rollback()
+        raise
+    if nested.is_active:
+        nested.commit()
+
+
+# subjects of pubsub messages whose content is (authid, serialized objects)
+OBJECT_SUBJECTS = ('decloaked', 'new', 'modified')
+# subject used for the merged content of object messages in a batch
+RECEIVED_OBJECTS = 'received objects'
+
+
+def coalesce_pubsub_msgs(items, userid=None):
+    """
+    Coalesce a batch of pubsub messages:
+
+      - the serialized objects in "decloaked", "new", and "modified" messages
+        (except those resulting from the local user's own actions) are merged
+        into RECEIVED_OBJECTS messages, with only the last version received
+        of each object;
+      - repeated "deleted" messages for the same oid are dropped, as are any
+        received objects that were deleted later in the batch;
+      - repeated "parameters set" messages are dropped;
+      - "properties set" messages are merged, the merged content being
+        {oid: (props, mod_datetime string)} (later values win, and each oid
+        keeps the latest mod_datetime string of the messages that modified
+        it).
+
+    A merged message is placed at the position of the first of the messages
+    merged into it.  So that the updates of an object are still applied in
+    the order received, a message is not merged into an earlier one if any
+    of its oids are in a message of another kind ("deleted", "properties
+    set", or an object message) that arrived in between -- it starts a new
+    merged message at its own position instead.  All other messages are kept
+    in order.
+
+    Args:
+        items (list of tuples):  (subject, content) in order of arrival
+
+    Keyword Args:
+        userid (str):  the local user's userid
+
+    Returns:
+        tuple:  (list of (subject, content), dict of coalesced counts by
+                subject)
+    """
+    batch = []
+    coalesced = {}
+    # positions of the RECEIVED_OBJECTS messages -> {oid: serialized object}
+    obj_slots = {}
+    objs_pos = None
+    props_pos = None
+    # oids that can no longer be merged into the current objects or
+    # properties message (they are in a later message of another kind)
+    objs_closed = set()
+    props_closed = set()
+    deleted = set()
+    parms_set_pos = None
+    for subject, content in items:
+        if subject in OBJECT_SUBJECTS:
+            authid, sobjs = content
+            if authid == userid:
+                # ignore -- result of my action
+                coalesced[subject] = coalesced.get(subject, 0) + 1
+                continue
+            sobjs = [so for so in sobjs or [] if so]
+            oids = [so['oid'] for so in sobjs]
+            if objs_pos is None or objs_closed.intersection(oids):
+                objs_pos = len(batch)
+                obj_slots[objs_pos] = {}
+                objs_closed = set()
+                batch.append((RECEIVED_OBJECTS, None))
+            else:
+                coalesced[subject] = coalesced.get(subject, 0) + 1
+            for so in sobjs:
+                # later versions replace earlier ones, but keep the position
+                # of the first
+                obj_slots[objs_pos][so['oid']] = so
+            props_closed.update(oids)
+            # a later "deleted" message for these oids is not a repeat
+            deleted.difference_update(oids)
+        elif subject == 'deleted':
+            if content in deleted:
+                coalesced[subject] = coalesced.get(subject, 0) + 1
+                continue
+            deleted.add(content)
+            for slot in obj_slots.values():
+                slot.pop(content, None)
+            objs_closed.add(content)
+            props_closed.add(content)
+            batch.append((subject, content))
+        elif subject == 'parameters set':
+            if parms_set_pos is not None:
+                coalesced[subject] = coalesced.get(subject, 0) + 1
+                continue
+            parms_set_pos = len(batch)
+            batch.append((subject, content))
+        elif subject == 'properties set':
+            prop_mods, mod_dt_str = content
+            if props_pos is None or props_closed.intersection(prop_mods):
+                props_pos = len(batch)
+                props_closed = set()
+                batch.append((subject, {}))
+            else:
+                coalesced[subject] = coalesced.get(subject, 0) + 1
+            all_mods = batch[props_pos][1]
+            for oid, props in prop_mods.items():
+                if oid in all_mods:
+                    props_so_far, dt_str = all_mods[oid]
+                    props_so_far.update(props)
+                    all_mods[oid] = (props_so_far, max(dt_str, mod_dt_str))
+                else:
+                    all_mods[oid] = (dict(props), mod_dt_str)
+            objs_closed.update(prop_mods)
+        else:
+            batch.append((subject, content))
+    for pos, slot in obj_slots.items():
+        batch[pos] = (RECEIVED_OBJECTS, list(slot.values()))
+    return batch, coalesced
+
+
+class HandlerStats(object):
+    """
+    Per-subject counters and handling-time metrics for pubsub messages.
+
+    Attributes:
+        stats (dict):  maps subject to a dict with the keys "received",
+            "coalesced", "handled", "errors", "total" (total handling time
+            [seconds]), and "max" (longest handling time [seconds])
+    """
+    def __init__(self):
+        self.stats = {}
+
+    def _get(self, subject):
+        if subject not in self.stats:
+            self.stats[subject] = dict(received=0, coalesced=0, handled=0,
+                                       errors=0, total=0.0, max=0.0)
+        return self.stats[subject]
+
+    def received(self, subject, n=1):
+        self._get(subject)['received'] += n
+
+    def coalesced(self, subject, n=1):
+        self._get(subject)['coalesced'] += n
+
+    def handled(self, subject, elapsed, error=False):
+        s = self._get(subject)
+        s['handled'] += 1
+        s['total'] += elapsed
+        s['max'] = max(s['max'], elapsed)
+        if error:
+            s['errors'] += 1
+
+    def report(self):
+        """
+        Return a list of (subject, stats dict) sorted by decreasing total
+        handling time.
+        """
+        return sorted(self.stats.items(), key=lambda x: -x[1]['total'])
+
+
+def get_sync_cursor(scope):
+    """
+    Return the persisted sync cursor for a sync scope ("library", "user", or
+    "project:[project oid]"), or None.  A cursor is a dict of the form:
+
+        {'cursor':    [server timestamp or sequence number of the sync],
+         'local_dts': [local datetime string when the sync was started]}
+    """
+    return (state.get('sync_cursors') or {}).get(scope)
+
+
+def set_sync_cursor(scope, cursor, local_dts):
+    """
+    Persist the sync cursor for a sync scope.
+
+    Args:
+        scope (str):  the sync scope
+        cursor (str or int):  the cursor returned by the server
+        local_dts (str):  local datetime string when the sync was started
+    """
+    cursors = state.get('sync_cursors') or {}
+    cursors[scope] = dict(cursor=cursor, local_dts=local_dts)
+    state['sync_cursors'] = cursors
+
+
+def clear_sync_cursors(scope=None):
+    """
+    Clear the sync cursor for a scope, or all sync cursors if no scope is
+    specified, so that the next sync of the scope(s) uses a full manifest.
+    """
+    cursors = state.get('sync_cursors') or {}
+    if scope:
+        cursors.pop(scope, None)
+    else:
+        cursors = {}
+    state['sync_cursors'] = cursors
+
+
+def _dts_key(dts):
+    # compare datetime strings up to microseconds, ignoring any tz suffix
+    return str(dts)[:26]
+
+
+def dirty_since(mod_dts, local_dts):
+    """
+    Return the items of a {oid: mod_datetime string} manifest that were
+    modified after the local datetime string `local_dts`.
+    """
+    since = _dts_key(local_dts)
+    return {oid: dts for oid, dts in mod_dts.items()
+            if _dts_key(dts) > since}
+
+
+# the classes whose objects make up the library sync manifest -- the most
+# important subtypes of ManagedObject (the repository returns all subtypes)
+LIBRARY_SYNC_CNAMES = ['HardwareProduct', 'Template', 'DataElementDefinition',
+                       'Model', 'Document', 'RepresentationFile']
+
+
+class ManifestDigests(object):
+    """
+    Merkle-style bucketed digests of a {oid: mod_datetime string} manifest.
+
+    Each oid is assigned to one of `n_buckets` buckets by a hash of the oid;
+    the digest of a bucket is the sha1 of its sorted "oid|mod_datetime" lines
+    (mod_datetime truncated to microseconds, as in dirty_since()).  Comparing
+    the bucket digests with the repository's tells which buckets differ, and
+    only those buckets need to be expanded into a manifest.
+
+    The manifest is built once (load()) and then maintained incrementally as
+    objects are saved (update()) and deleted (discard()); a bucket digest is
+    only recomputed when its bucket has changed.
+
+    Attributes:
+        n_buckets (int):  number of buckets
+        built (bool):  whether the manifest has been loaded
+    """
+    def __init__(self, n_buckets=256):
+        self.n_buckets = n_buckets
+        self.buckets = [{} for i in range(n_buckets)]
+        self._digests = {}
+        self.built = False
+
+    def bucket(self, oid):
+        """
+        Return the index of the bucket for an oid.
+        """
+        h = hashlib.sha1(oid.encode('utf-8')).hexdigest()
+        return int(h[:8], 16) % self.n_buckets
+
+    def load(self, mod_dts):
+        """
+        (Re)build the manifest from a {oid: mod_datetime string} dict.
+        """
+        self.buckets = [{} for i in range(self.n_buckets)]
+        self._digests = {}
+        for oid, dts in mod_dts.items():
+            self.buckets[self.bucket(oid)][oid] = _dts_key(dts)
+        self.built = True
+
+    def reset(self):
+        """
+        Discard the manifest so that it will be rebuilt before next use.
+        """
+        self.buckets = [{} for i in range(self.n_buckets)]
+        self._digests = {}
+        self.built = False
+
+    def update(self, oid, dts):
+        """
+        Add or update an oid in the manifest (a no-op until it is built).
+        """
+        if not self.built or not oid:
+            return
+        i = self.bucket(oid)
+        key = _dts_key(dts)
+        if self.buckets[i].get(oid) != key:
+            self.buckets[i][oid] = key
+            self._digests.pop(i, None)
+
+    def discard(self, oid):
+        """
+        Remove an oid from the manifest, if present.
+        """
+        if not self.built or not oid:
+            return
+        i = self.bucket(oid)
+        if self.buckets[i].pop(oid, None) is not None:
+            self._digests.pop(i, None)
+
+    def digest(self, i):
+        """
+        Return the (cached) hex digest of bucket `i`.
+        """
+        if i not in self._digests:
+            lines = '\n'.join(f'{oid}|{dts}' for oid, dts in
+                              sorted(self.buckets[i].items()))
+            self._digests[i] = hashlib.sha1(lines.encode('utf-8')).hexdigest()
+        return self._digests[i]
+
+    def digests(self):
+        """
+        Return the digests of all buckets as a dict {str(index): hex digest}
+        (string keys, for transport).
+        """
+        return {str(i): self.digest(i) for i in range(self.n_buckets)}
+
+    def root(self):
+        """
+        Return the root digest (sha1 of the concatenated bucket digests).
+        """
+        return hashlib.sha1(''.join(self.digest(i) for i in
+                            range(self.n_buckets)).encode('ascii')).hexdigest()
+
+    def diff(self, remote):
+        """
+        Return the sorted indexes of the buckets whose digests differ from
+        those in `remote`, a {str(index): hex digest} dict.
+        """
+        return [i for i in range(self.n_buckets)
+                if remote.get(str(i)) != self.digest(i)]
+
+    def expand(self, mod_dts, buckets):
+        """
+        Return the part of a {oid: mod_datetime string} manifest that falls in
+        the specified buckets.
+        """
+        buckets = set(buckets)
+        return {oid: dts for oid, dts in mod_dts.items()
+                if self.bucket(oid) in buckets}
+
+
+class RpcBatcher(object):
+    """
+    Buffers the updates sent to the repository by the "parms set", "des set",
+    "act mods", "parm added", "parm del", and "new/modified objects" signal
+    handlers so that a burst of updates (e.g. editing a table of values, or
+    re-sequencing a timeline) can be sent as one call per rpc type.
+
+    Updates that touch the same oid are merged, the last value for each
+    (oid, property) winning; for parameter adds and deletes the last
+    operation on each (oid, pid) wins -- except that an add after a delete
+    keeps both, in order (re-adding a deleted parameter resets it) -- and a
+    delete discards any pending value for that parameter.
+
+    Attributes:
+        merged (int):  number of updates merged away since the last take()
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.objs = {}
+        self.parm_ops = {}
+        self.parms = {}
+        self.des = {}
+        self.props = {}
+        self.merged = 0
+
+    def __len__(self):
+        return (len(self.objs) + len(self.parm_ops) + len(self.parms)
+                + len(self.des) + len(self.props))
+
+    def _merge(self, target, updates):
+        for oid, vals in (updates or {}).items():
+            current = target.setdefault(oid, {})
+            self.merged += len(set(current) & set(vals or {}))
+            current.update(vals or {})
+
+    def save(self, objs):
+        for obj in objs or []:
+            if obj.oid in self.objs:
+                self.merged += 1
+            self.objs[obj.oid] = obj
+
+    def set_parms(self, parms):
+        self._merge(self.parms, parms)
+
+    def set_des(self, des):
+        self._merge(self.des, des)
+
+    def set_props(self, props):
+        self._merge(self.props, props)
+
+    def add_parm(self, oid, pid):
+        prev = self.parm_ops.pop((oid, pid), None)
+        if prev in ('add', 'del_add'):
+            self.merged += 1
+        if prev in ('del', 'del_add'):
+            # deleted, then added:  both are sent (the delete first)
+            self.parm_ops[(oid, pid)] = 'del_add'
+        else:
+            self.parm_ops[(oid, pid)] = 'add'
+
+    def del_parm(self, oid, pid):
+        if (oid, pid) in self.parm_ops:
+            self.merged += 1
+            del self.parm_ops[(oid, pid)]
+        self.parm_ops[(oid, pid)] = 'del'
+        if pid in self.parms.get(oid, {}):
+            self.merged += 1
+            del self.parms[oid][pid]
+            if not self.parms[oid]:
+                del self.parms[oid]
+
+    def take(self):
+        """
+        Return the pending updates and clear the batch.
+
+        Returns:
+            dict:  with the keys "objs" (list of objects to save), "parm_add"
+                and "parm_del" (lists of (oid, pid) in order -- the deletes
+                are to be sent before the adds), "parms",
+                "des", and "props" ({oid: {id: value}} dicts), and "merged"
+        """
+        batch = dict(objs=list(self.objs.values()),
+                     parm_add=[k for k, op in self.parm_ops.items()
+                               if op in ('add', 'del_add')],
+                     parm_del=[k for k, op in self.parm_ops.items()
+                               if op in ('del', 'del_add')],
+                     parms=self.parms, des=self.des, props=self.props,
+                     merged=self.merged)
+        self.clear()
+        return batch
+
+
+# journal ops, in the order in which their compacted forms are replayed (see
+# OpJournal.compact())
+JOURNAL_OPS = ['save', 'parm_del', 'parm_add', 'parms', 'des', 'props',
+               'freeze', 'thaw', 'delete']
+
+
+class OpJournal(object):
+    """
+    Durable, ordered journal of the updates made while not connected to the
+    repository, kept in a JSON-lines file in the app home directory.  Each
+    line is one entry:
+
+        {"seq": [n], "dts": [local datetime string], "op": [op],
+         "data": [op data]}
+
+    where op and data are one of:
+
+        "save":               {"oids": [oids], "new": [bool]}
+        "delete":             {"oids": [oids]}
+        "freeze", "thaw":     {"oids": [oids]}
+        "parms", "des",
+        "props":              {"values": {oid: {id: value}}}
+        "parm_add",
+        "parm_del":           {"oid": [oid], "pid": [pid]}
+
+    Each entry is flushed and fsync'ed when it is appended, so the journal
+    survives a crash; a partially written line is skipped on reading.
+
+    Attributes:
+        path (str):  path of the journal file
+        seq (int):  sequence number of the last entry
+        damaged (bool):  True if an entry could not be read (e.g. it was
+            only partially written), so that the journal may not have
+            captured all offline updates
+    """
+    def __init__(self, path):
+        self.path = path
+        self.damaged = False
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    # terminate a partially written last line (the app was
+                    # interrupted while appending) so appends start cleanly
+                    f.write(b'\n')
+        entries = self.entries()
+        self.seq = entries[-1]['seq'] if entries else 0
+
+    def __len__(self):
+        return len(self.entries())
+
+    def append(self, op, **data):
+        """
+        Append an entry to the journal.
+
+        Args:
+            op (str):  the op (see JOURNAL_OPS)
+
+        Keyword Args:
+            data:  the op data
+        """
+        self.seq += 1
+        entry = dict(seq=self.seq, dts=time.strftime('%Y-%m-%d %H:%M:%S'),
+                     op=op, data=data)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def entries(self):
+        """
+        Return the journal entries in order.
+        """
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                self.damaged = True
+        return entries
+
+    def clear(self, through=None):
+        """
+        Remove the journal entries (after a successful replay):  all of them,
+        or only those up to a sequence number -- the entries appended since
+        (e.g. while the replay was in progress) are kept.
+
+        Keyword Args:
+            through (int):  sequence number of the last entry to remove
+
+        Returns:
+            int:  number of entries kept
+        """
+        kept = []
+        if through is not None:
+            kept = [e for e in self.entries() if e.get('seq', 0) > through]
+        if kept:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                for entry in kept:
+                    f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self.damaged = False
+        return len(kept)
+
+    def compact(self):
+        """
+        Compact the journal into one batch per op:  updates of the same (oid,
+        id) are merged, the last write winning; for parameter adds and
+        deletes the last operation on each (oid, pid) wins; the last of
+        freeze or thaw on each oid wins; and a delete discards all earlier
+        updates of the oid -- if the object was also created while offline,
+        nothing is sent for it at all.
+
+        Returns:
+            dict:  with the keys "save", "delete", "freeze", and "thaw" (lists
+                of oids in journal order), "parm_add" and "parm_del" (lists of
+                (oid, pid)), "parms", "des", and "props" ({oid: {id: value}}
+                dicts), "entries" (number of entries), "merged" (number of
+                updates merged away), and "seq" (sequence number of the last
+                entry compacted, to be passed to clear() after the replay)
+        """
+        updates = RpcBatcher()
+        saves = {}
+        new_oids = set()
+        deletes = {}
+        deleted = set()
+        freezes = {}
+        entries = self.entries()
+        for entry in entries:
+            op, data = entry.get('op'), entry.get('data') or {}
+            if op == 'save':
+                for oid in data.get('oids') or []:
+                    if oid in saves:
+                        updates.merged += 1
+                        del saves[oid]
+                    saves[oid] = True
+                    deletes.pop(oid, None)
+                    deleted.discard(oid)
+                    if data.get('new'):
+                        new_oids.add(oid)
+            elif op in ('parms', 'des', 'props'):
+                getattr(updates, 'set_' + op)(data.get('values'))
+            elif op == 'parm_add':
+                updates.add_parm(data.get('oid'), data.get('pid'))
+            elif op == 'parm_del':
+                updates.del_parm(data.get('oid'), data.get('pid'))
+            elif op in ('freeze', 'thaw'):
+                for oid in data.get('oids') or []:
+                    if oid in freezes:
+                        updates.merged += 1
+                        del freezes[oid]
+                    freezes[oid] = op
+            elif op == 'delete':
+                for oid in data.get('oids') or []:
+                    saves.pop(oid, None)
+                    freezes.pop(oid, None)
+                    deleted.add(oid)
+                    if oid in new_oids:
+                        # created and deleted offline -- never sent
+                        new_oids.discard(oid)
+                        deletes.pop(oid, None)
+                    else:
+                        deletes[oid] = True
+        batch = updates.take()
+        # updates of deleted objects are moot
+        def live(vals):
+            return {oid: v for oid, v in vals.items() if oid not in deleted}
+        return dict(save=list(saves),
+                    parm_del=[k for k in batch['parm_del']
+                              if k[0] not in deleted],
+                    parm_add=[k for k in batch['parm_add']
+                              if k[0] not in deleted],
+                    parms=live(batch['parms']), des=live(batch['des']),
+                    props=live(batch['props']),
+                    freeze=[oid for oid, op in freezes.items()
+                            if op == 'freeze'],
+                    thaw=[oid for oid, op in freezes.items() if op == 'thaw'],
+                    delete=list(deletes), entries=len(entries),
+                    merged=batch['merged'],
+                    seq=entries[-1].get('seq', 0) if entries else 0)
@@ -22,7 +22,7 @@ from pangalactic.core.parametrics import (de_defz, get_dval, get_dval_as_str,
                                           get_modal_context, get_modal_power,
                                           parm_defz, mode_defz)
 from pangalactic.core.utils.datetimes import dtstamp
-from pangalactic.core.validation  import get_assembly, get_bom_oids
+from pangalactic.node.assemblygraph import assembly_graph
 from pangalactic.node.pgxnobject  import PgxnObject
 from pangalactic.node.utils       import get_pixmap
 
@@ -55,6 +55,9 @@ class Node(object):
         # TODO:  make 'cname' a property
         self.parent = None
         self.children = []
+        # (object oid, link oid) under which the node is in its model's node
+        # index (see SystemTreeModel.index_nodes())
+        self.index_keys = ()
         # if parent is not None:
             # parent.add_child(self)
 
@@ -320,6 +323,18 @@ class SystemTreeModel(QAbstractItemModel):
         self.root = Node(fake_root)
         self.root.parent = None
         self.object_nodes = {}
+        # index of the nodes in the tree by the oids of their objects and of
+        # their links, so that all occurrences of an object or a link are
+        # found without searching the tree (see object_indexes() and
+        # link_indexes()) -- maintained by add_nodes(), removeRows(), and
+        # setData(); values are dicts used as ordered sets of nodes
+        self.obj_oid_nodes = {}
+        self.link_oid_nodes = {}
+        # cache of the dashboard cells:  {node: {col_id: (text, value,
+        # brush)}} -- an entry is computed the first time a cell is painted
+        # and dropped only when parameters, units, or columns change (see
+        # cell() and invalidate_cells())
+        self.cell_cache = {}
         if obj is None:
             # create a "null" Project
             Project = orb.classes['Project']
@@ -327,9 +342,16 @@ class SystemTreeModel(QAbstractItemModel):
         self.project = obj
         top_node = self.node_for_object(obj, self.root)
         self.root.children = [top_node]
+        self.index_nodes(top_node)
         # set initial state for deletions as local (if remote,
         # on_remote_deletion() will be called and will set this to True)
         self.remote_deletion = False
+        # "parmz changed" and "des changed" are sent with the oids whose
+        # parameters or data elements changed (or None if all may have
+        # changed)
+        dispatcher.connect(self.invalidate_cells, 'parmz changed')
+        dispatcher.connect(self.invalidate_cells, 'des changed')
+        dispatcher.connect(self.invalidate_cells, 'units changed')
 
     @property
     def dash_name(self):
@@ -410,6 +432,304 @@ class SystemTreeModel(QAbstractItemModel):
                                link_oid)] = node
         return node
 
+    def index_nodes(self, node):
+        """
+        Add a node and its descendants to the node index.
+        """
+        nodes = [node]
+        while nodes:
+            n = nodes.pop()
+            # the keys are kept on the node, since its link may have been
+            # deleted by the time it is removed from the index
+            n.index_keys = (getattr(n.obj, 'oid', None),
+                            getattr(n.link, 'oid', None))
+            obj_oid, link_oid = n.index_keys
+            self.obj_oid_nodes.setdefault(obj_oid, {})[n] = None
+            if link_oid:
+                self.link_oid_nodes.setdefault(link_oid, {})[n] = None
+            nodes += n.children
+
+    def unindex_nodes(self, node):
+        """
+        Remove a node and its descendants from the node index (and their
+        cells from the cell cache).
+        """
+        nodes = [node]
+        while nodes:
+            n = nodes.pop()
+            self.cell_cache.pop(n, None)
+            for oid, oid_nodes in zip(n.index_keys,
+                                      (self.obj_oid_nodes,
+                                       self.link_oid_nodes)):
+                if n in oid_nodes.get(oid, {}):
+                    del oid_nodes[oid][n]
+                    if not oid_nodes[oid]:
+                        del oid_nodes[oid]
+            nodes += n.children
+
+    def drop_nodes(self, node):
+        """
+        Forget a node and its descendants (which are being removed from the
+        tree):  remove them from the node index and from object_nodes, so
+        that they are not reused by node_for_object().
+        """
+        self.unindex_nodes(node)
+        nodes = [node]
+        while nodes:
+            n = nodes.pop()
+            parent = n.parent
+            if parent is not None:
+                parent_oid = (parent.index_keys[0] if parent.index_keys
+                              else getattr(parent.obj, 'oid', None))
+                key = (n.index_keys[0], parent_oid, n.index_keys[1])
+                if self.object_nodes.get(key) is n:
+                    del self.object_nodes[key]
+            nodes += n.children
+
+    def index_for_node(self, node):
+        """
+        Return the (column 0) model index of a node.
+        """
+        if node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row(), 0, node)
+
+    def object_indexes(self, obj):
+        """
+        Return the model indexes of all loaded nodes of a Product (i.e. of
+        its occurrences as a system or a component) -- "TBD" components are
+        not included.
+
+        Args:
+            obj (Product):  the object
+        """
+        oid = getattr(obj, 'oid', None)
+        nodes = [n for n in self.obj_oid_nodes.get(oid, {})
+                 if n.link is not None]
+        if oid == 'pgefobjects:TBD':
+            nodes = [n for n in nodes
+                     if not isinstance(n.link, orb.classes['Acu'])]
+        return [self.index_for_node(n) for n in nodes]
+
+    def link_indexes(self, link):
+        """
+        Return the model indexes of all nodes of a link (Acu or
+        ProjectSystemUsage), first loading the nodes on the path to it if
+        they have not been loaded.
+
+        Args:
+            link (Acu or ProjectSystemUsage):  the link
+        """
+        if link is None:
+            return []
+        self.fetch_link_nodes(link)
+        return [self.index_for_node(n)
+                for n in self.link_oid_nodes.get(link.oid, {})]
+
+    def fetch_link_nodes(self, link, visited=None):
+        """
+        Load the nodes of a link, if not already loaded, by fetching the
+        children of the nodes of its assembly (loading those first, in the
+        same way, if necessary).  Only the nodes on the paths to the link
+        are loaded.
+        """
+        if link.oid in self.link_oid_nodes:
+            return
+        visited = visited if visited is not None else set()
+        if link.oid in visited:
+            # a cycle -- nothing more to be found
+            return
+        visited.add(link.oid)
+        if isinstance(link, orb.classes['ProjectSystemUsage']):
+            if getattr(link.project, 'oid', None) == self.project.oid:
+                project_idx = self.index(0, 0, QModelIndex())
+                if self.canFetchMore(project_idx):
+                    self.fetchMore(project_idx)
+            return
+        assembly = getattr(link, 'assembly', None)
+        if assembly is None:
+            return
+        if assembly.oid not in self.obj_oid_nodes:
+            for psu in self.project.systems:
+                if psu.system is assembly:
+                    self.fetch_link_nodes(psu, visited)
+            for acu in getattr(assembly, 'where_used', None) or []:
+                self.fetch_link_nodes(acu, visited)
+        for node in list(self.obj_oid_nodes.get(assembly.oid, {})):
+            idx = self.index_for_node(node)
+            if self.canFetchMore(idx):
+                self.fetchMore(idx)
+
+    def cell(self, node, col_id):
+        """
+        Return the cached (text, value, brush) of the dashboard cell of a
+        node in a parameter or data element column, computing it if it is
+        not cached.  Returns None if the column is neither a parameter nor a
+        data element.
+
+        Args:
+            node (Node):  the node
+            col_id (str):  id of the parameter or data element
+        """
+        node_cells = self.cell_cache.setdefault(node, {})
+        if col_id in node_cells:
+            return node_cells[col_id]
+        pd = parm_defz.get(col_id)
+        de_def = de_defz.get(col_id)
+        if pd:
+            # it's a parameter
+            units = prefs['units'].get(pd['dimensions'])
+            if pd['context_type'] == 'prescriptive':
+                # prescriptive parameters apply to node links
+                # (assembly nodes -> component/subsystem roles)
+                oid = getattr(node.link, 'oid', None)
+            else:
+                # descriptive parameters apply to node objects (components or
+                # subsystems), as do base parameters (no context)
+                oid = getattr(node.obj, 'oid', None)
+            if not oid or (pd['context_type'] == 'descriptive'
+                           and oid == 'pgefobjects:TBD'):
+                text, value = '-', '-'
+            else:
+                text = get_pval_as_str(oid, col_id, units=units)
+                value = get_pval(oid, col_id)
+        elif de_def:
+            # it's a data element (we hope :)
+            units = prefs['units'].get(de_def.get('dimensions')) or ''
+            text = get_dval_as_str(node.obj.oid, col_id, units=units)
+            value = get_dval(node.obj.oid, col_id, units=units)
+        else:
+            return None
+        if isinstance(value, (int, float)) and value <= 0:
+            brush = self.RED_BRUSH
+        else:
+            brush = self.BRUSH
+        node_cells[col_id] = (text, value, brush)
+        return node_cells[col_id]
+
+    def invalidate_cells(self, oids=None):
+        """
+        Drop the cached dashboard cells of the nodes of the specified objects
+        or links and of all their ancestors, whose rolled-up values (e.g. CBE
+        and MEV) depend on them (all cells if no oids are specified), and
+        signal the views to repaint them.  Handler for the dispatcher signals
+        "parmz changed", "des changed", and "units changed".
+
+        Keyword Args:
+            oids (iterable of str):  oids of the objects and links whose
+                parameters or data elements changed
+        """
+        last_col = self.columnCount() - 1
+        if oids is None:
+            self.cell_cache.clear()
+            # repaint the data columns of all loaded rows
+            parents = [n for nodes in self.obj_oid_nodes.values()
+                       for n in nodes if n.children]
+            ranges = [(self.index_for_node(n), 0, len(n.children) - 1)
+                      for n in parents]
+        else:
+            nodes = {}
+            for oid in oids:
+                nodes.update(self.obj_oid_nodes.get(oid) or {})
+                nodes.update(self.link_oid_nodes.get(oid) or {})
+            for node in list(nodes):
+                parent = node.parent
+                while (parent is not None and parent is not self.root
+                       and parent not in nodes):
+                    nodes[parent] = None
+                    parent = parent.parent
+            for node in nodes:
+                self.cell_cache.pop(node, None)
+            ranges = [(self.index_for_node(n.parent), n.row(), n.row())
+                      for n in nodes if n.parent is not None]
+        if last_col < 1:
+            return
+        try:
+            for parent, first, last in ranges:
+                self.dataChanged.emit(self.index(first, 1, parent),
+                                      self.index(last, last_col, parent))
+        except RuntimeError:
+            # the model's C++ object has been deleted (e.g. the dashboard was
+            # rebuilt) but the dispatcher still has a reference to it
+            dispatcher.disconnect(self.invalidate_cells, 'parmz changed')
+            dispatcher.disconnect(self.invalidate_cells, 'des changed')
+            dispatcher.disconnect(self.invalidate_cells, 'units changed')
+
+    def current_links(self, node):
+        """
+        Return the links (Acus or ProjectSystemUsages) to the current
+        children of a node's object (as in fetchMore(), links with no
+        component or system are ignored).
+        """
+        if getattr(node.obj, 'components', None):
+            return [acu for acu in node.obj.components if acu.component]
+        elif node.cname == 'Project':
+            return [psu for psu in node.obj.systems if psu.system]
+        return []
+
+    def sync_nodes(self):
+        """
+        Update the loaded nodes in place to match the current assemblies and
+        project systems (e.g. after Acus have been added, modified or
+        deleted):  the nodes of links that are gone or that now point to a
+        different object are removed, nodes are added for new links, and
+        the remaining rows are repainted.  Only nodes whose children have
+        been loaded are updated (the others are loaded when expanded).
+        Since rows are inserted and removed with the begin/end row signals,
+        the views keep their expanded nodes, selection, and scroll position.
+        """
+        orb.log.debug('* SystemTreeModel.sync_nodes()')
+        last_col = self.columnCount() - 1
+        top_node = self.root.children[0]
+        n_added = n_removed = 0
+        nodes = [top_node]
+        while nodes:
+            pnode = nodes.pop()
+            if not pnode.children and pnode is not top_node:
+                continue
+            parent = self.index_for_node(pnode)
+            links = self.current_links(pnode)
+            links_by_oid = {link.oid: link for link in links}
+            # remove the nodes of links that are gone or changed
+            rows = []
+            for row, child in enumerate(pnode.children):
+                obj_oid, link_oid = child.index_keys
+                link = links_by_oid.get(link_oid)
+                link_obj = (getattr(link, 'component', None)
+                            or getattr(link, 'system', None))
+                if getattr(link_obj, 'oid', None) != obj_oid:
+                    rows.append(row)
+            for row in reversed(rows):
+                self.beginRemoveRows(parent, row, row)
+                self.drop_nodes(pnode.children[row])
+                pnode.remove_children(row, 1)
+                self.endRemoveRows()
+            n_removed += len(rows)
+            # add nodes for new links
+            link_oids = set(child.index_keys[1] for child in pnode.children)
+            new_nodes = []
+            for link in links:
+                if link.oid not in link_oids:
+                    link_obj = (getattr(link, 'component', None)
+                                or getattr(link, 'system', None))
+                    new_nodes.append(self.node_for_object(link_obj, pnode,
+                                                          link=link))
+            if new_nodes:
+                self.add_nodes(new_nodes, parent)
+                n_added += len(new_nodes)
+            if pnode.children:
+                # names (reference designators, quantities) may have changed
+                self.dataChanged.emit(
+                            self.index(0, 0, parent),
+                            self.index(len(pnode.children) - 1, last_col,
+                                       parent))
+            nodes += pnode.children
+        # let the views recheck which nodes have children (a component may
+        # have become an assembly or vice versa)
+        self.layoutAboutToBeChanged.emit()
+        self.layoutChanged.emit()
+        orb.log.debug(f'  {n_added} nodes added, {n_removed} removed.')
+
     def flags(self, index):
         if not index.isValid():
             return Qt.ItemIsEnabled
@@ -538,6 +858,7 @@ class SystemTreeModel(QAbstractItemModel):
 
     def insertColumn(self, position, parent=QModelIndex()):
         orb.log.debug('* insertColumn({})'.format(position))
+        self.cell_cache.clear()
         self.beginInsertColumns(parent, position, position)
         success = True
         if position < 0 or position > len(self.cols) - 1:
@@ -547,6 +868,7 @@ class SystemTreeModel(QAbstractItemModel):
 
     def removeColumn(self, position, parent=QModelIndex()):
         # orb.log.debug('* removeColumn({})'.format(position))
+        self.cell_cache.clear()
         self.beginRemoveColumns(parent, position, position)
         success = True
         if position < 0 or position > len(self.cols) - 1:
@@ -634,7 +956,7 @@ class SystemTreeModel(QAbstractItemModel):
                     if len(mode_oids) > index.column() > 0:
                         mode_oid = mode_oids[index.column() -1]
                         sys_usage_oid = getattr(node.link, 'oid', None)
-                        oid = getattr(node.obj, 'oid', None)
+                        # oid = getattr(node.obj, 'oid', None)
                         modal_context = get_modal_context(self.project.oid,
                                                           sys_usage_oid,
                                                           mode_oid)
@@ -650,41 +972,10 @@ class SystemTreeModel(QAbstractItemModel):
                     if index.column() == 0:
                         return node.name
                     elif len(self.cols) > index.column() > 0:
-                        col_id = self.cols[index.column()]
-                        pd = parm_defz.get(col_id)
-                        de_def = de_defz.get(col_id)
-                        if pd:
-                            units = prefs['units'].get(pd['dimensions'])
-                            # it's a parameter
-                            pid = col_id
-                            # descriptive parameters apply to node objects
-                            # (components or subsystems)
-                            if pd['context_type'] == 'descriptive':
-                                oid = getattr(node.obj, 'oid', None)
-                                if oid and oid != 'pgefobjects:TBD':
-                                    return get_pval_as_str(node.obj.oid,
-                                                           pid, units=units)
-                                else:
-                                    return '-'
-                            # prescriptive parameters apply to node links
-                            # (assembly nodes -> component/subsystem roles)
-                            elif pd['context_type'] == 'prescriptive':
-                                oid = getattr(node.link, 'oid', None)
-                                if oid:
-                                    return get_pval_as_str(oid, pid,
-                                                           units=units)
-                                else:
-                                    return '-'
-                            else:
-                                # base parameter (no context)
-                                return get_pval_as_str(node.obj.oid,
-                                                       col_id, units=units)
-                        elif de_def:
-                            # it's a data element (we hope :)
-                            units = prefs['units'].get(
-                                                de_def.get('dimensions')) or ''
-                            return get_dval_as_str(node.obj.oid, col_id,
-                                                   units=units)
+                        # parameter and data element values are cached
+                        cell = self.cell(node, self.cols[index.column()])
+                        if cell:
+                            return cell[0]
                     else:
                         return ''
             else:
@@ -701,32 +992,9 @@ class SystemTreeModel(QAbstractItemModel):
                     else:
                         return self.BRUSH
             elif self.cols and len(self.cols) > index.column() > 0:
-                col_id = self.cols[index.column()]
-                pd = parm_defz.get(col_id)
-                de_def = de_defz.get(col_id)
-                if pd:
-                    if pd['context_type'] == 'descriptive':
-                        pval = get_pval(node.obj.oid, col_id)
-                    elif pd['context_type'] == 'prescriptive':
-                        oid = getattr(node.link, 'oid', None)
-                        if oid:
-                            pval = get_pval(node.link.oid, col_id)
-                        else:
-                            pval = '-'
-                    else:
-                        # base parameter (no context)
-                        pval = get_pval(node.obj.oid, col_id)
-                    if isinstance(pval, (int, float)) and pval <= 0:
-                        return self.RED_BRUSH
-                    else:
-                        return self.BRUSH
-                elif de_def:
-                    units = prefs['units'].get(de_def.get('dimensions')) or ''
-                    dval = get_dval(node.obj.oid, col_id, units=units)
-                    if isinstance(dval, (int, float)) and dval <= 0:
-                        return self.RED_BRUSH
-                    else:
-                        return self.BRUSH
+                cell = self.cell(node, self.cols[index.column()])
+                if cell:
+                    return cell[2]
                 elif ((self.show_mode_systems or
                      self.dash_name == 'System Power Modes')
                     and mode_defz.get(self.project.oid)):
@@ -788,7 +1056,9 @@ class SystemTreeModel(QAbstractItemModel):
                 # orb.save([node.link]) is called by Node obj setter
                 # ** NOTE: DO NOT dispatch "modified object" because this
                 # action may have been initiated by a remote event
+                self.unindex_nodes(node)
                 node.obj = value
+                self.index_nodes(node)
                 # signal the views that data has changed
                 self.dataChanged.emit(index, index)
                 return True
@@ -857,6 +1127,10 @@ class SystemTreeModel(QAbstractItemModel):
             orb.log.debug('  + deleting PSUs: {}'.format(
                           [l.oid for l in links_to_delete
                 if isinstance(l, orb.classes['ProjectSystemUsage'])]))
+        for node in parent_node.children[position:position + count]:
+            self.drop_nodes(node)
+        for acu_oid in acus_by_oid:
+            assembly_graph.remove_acu(acu_oid)
         orb.delete(links_to_delete)
         success = parent_node.remove_children(position, count)
         self.endRemoveRows()
@@ -919,6 +1193,7 @@ class SystemTreeModel(QAbstractItemModel):
         self.beginInsertRows(parent, position, position + len(nodes) - 1)
         for child in nodes:
             node.add_child(child)
+            self.index_nodes(child)
         self.endInsertRows()
         self.dataChanged.emit(parent, parent)
         self.dirty = True
@@ -1286,190 +1561,51 @@ class SystemTreeView(QTreeView):
         Find the source model indexes of all nodes in the system tree that
         reference the specified link (Acu or ProjectSystemUsage) -- this is
         needed for updating the tree in-place when a link object is modified.
+        The nodes are found in the model's node index (the nodes on the path
+        to the link are loaded if necessary).
 
         Args:
             link (Acu or ProjectSystemUsage):  specified link object
         """
         # orb.log.debug('* link_indexes_in_tree({})'.format(link.id))
-        model = self.proxy_model.sourceModel()
-        project_index = model.index(0, 0, QModelIndex())
-        # project_node = model.get_node(project_index)
-        # orb.log.debug('  for project {}'.format(project_node.obj.oid))
-        # orb.log.debug('  (node cname: {})'.format(project_node.cname))
-        # ----------------------------------------------------
-        # IMPORTANT: fully populate model with child nodes ...
-        # ----------------------------------------------------
-        model.populate()
-        # first check whether link is a PSU:
-        is_a_psu = [psu for psu in model.project.systems
-                    if psu.oid == link.oid]
-        # then check whether link occurs in any system boms:
-        systems = [psu.system for psu in model.project.systems]
-        in_system = [sys for sys in systems if link in get_assembly(sys)]
-        if is_a_psu or in_system:
-            # systems exist -> project_index has children, so ...
-            child_count = model.rowCount(project_index)
-            if child_count == 0:
-                # orb.log.debug('  - no child nodes found.')
-                return []
-            sys_idxs = [model.index(row, 0, project_index)
-                        for row in range(child_count)]
-            if not sys_idxs:
-                # orb.log.debug('  - no child indexes found.')
-                return []
-            link_idxs = []
-            if is_a_psu:
-                # orb.log.debug('  - link is a ProjectSystemUsage ...')
-                # orb.log.debug('    project has {} system(s).'.format(
-                                                            # len(systems)))
-                # orb.log.debug('    tree has {} system(s).'.format(
-                                                            # len(sys_idxs)))
-                for idx in sys_idxs:
-                    system_node = model.get_node(idx)
-                    if system_node.link.oid == link.oid:
-                        # orb.log.debug('    + {}'.format(system_node.link.id))
-                        # orb.log.debug('      system: {}'.format(
-                                                        # system_node.obj.id))
-                        link_idxs.append(idx)
-                # orb.log.debug('    {} system occurrences found.'.format(
-                              # len(link_idxs)))
-            if in_system:
-                # orb.log.debug('  - link is an Acu ...')
-                for sys_idx in sys_idxs:
-                    link_idxs += self.link_indexes_in_assembly(link, sys_idx)
-                # orb.log.debug('    {} link occurrences found.'.format(
-                              # len(link_idxs)))
-            return link_idxs
-        else:
-            # orb.log.debug('  - link not found in tree.')
-            return []
-        return []
+        return self.source_model.link_indexes(link)
 
     def object_indexes_in_tree(self, obj):
         """
         Find the source model indexes of all nodes in the system tree that
         reference the specified object (this is needed for updating the tree
-        in-place when an object is modified).
+        in-place when an object is modified).  The nodes are found in the
+        model's node index.
 
         Args:
             obj (Product):  specified object
         """
         # orb.log.debug('* object_indexes_in_tree({})'.format(obj.id))
-        # try:
-            # model = self.proxy_model.sourceModel()
-        # except:
-            # oops -- C++ object probably got deleted
-            # return []
-        model = self.source_model
-        project_index = model.index(0, 0, QModelIndex())
-        # project_node = model.get_node(project_index)
-        # orb.log.debug(f'  for project {project_node.obj.id}')
-        # orb.log.debug(f'  (node cname: {project_node.cname})')
-        # NOTE: systems could be created with a list comp except the sanity
-        # check "if psu.system" is needed in case a psu got corrupted
-        systems = []
-        for psu in model.project.systems:
-            if psu.system:
-                systems.append(psu.system)
-        # first check whether obj *is* one of the systems:
-        is_a_system = [sys for sys in systems if sys.oid == obj.oid]
-        # then check whether obj occurs in any system boms:
-        in_system = [sys for sys in systems if obj.oid in get_bom_oids(sys)]
-        if is_a_system or in_system:
-            # systems exist -> project_index has children, so ...
-            sys_idxs = [model.index(row, 0, project_index)
-                        for row in range(model.rowCount(project_index))]
-            system_idxs = []
-            obj_idxs = []
-            if is_a_system:
-                # orb.log.debug('  - object is a system.')
-                # orb.log.debug('    project has {} system(s).'.format(
-                                                            # len(systems)))
-                # orb.log.debug('    tree has {} system(s).'.format(
-                                                            # len(sys_idxs)))
-                for idx in sys_idxs:
-                    system_node = model.get_node(idx)
-                    # orb.log.debug('    + {}'.format(system_node.obj.id))
-                    if system_node.obj.oid == obj.oid:
-                        system_idxs.append(idx)
-                # orb.log.debug('    {} system occurrences found.'.format(
-                              # len(system_idxs)))
-            if in_system:
-                # orb.log.debug('  - object is a component.')
-                for sys_idx in sys_idxs:
-                    obj_idxs += self.object_indexes_in_assembly(obj, sys_idx)
-                # orb.log.debug('    {} component occurrences found.'.format(
-                              # len(obj_idxs)))
-            return list(set(system_idxs + obj_idxs))
-        else:
-            # orb.log.info('  - object not found in tree.')
-            return []
-        return []
+        return self.source_model.object_indexes(obj)
 
-    def object_indexes_in_assembly(self, obj, idx):
-        """
-        Find the source model indexes of all nodes in an assembly that reference
-        the specified object and source model index.
-
-        Args:
-            obj (Product):  specified object
-            idx (QModelIndex):  source model index of the assembly or project
-                node
+    def visible_object_oids(self):
         """
-        # NOTE: ignore "TBD" objects
-        if getattr(obj, 'oid', '') == 'pgefobjects:TBD':
-            return []
-        model = self.source_model
-        assembly_node = model.get_node(idx)
-        assembly = assembly_node.obj
-        # orb.log.debug('* object_indexes_in_assembly({})'.format(assembly.id))
-        if obj.oid == assembly.oid:
-            # orb.log.debug('  assembly *is* the object')
-            return [idx]
-        elif model.hasChildren(idx) and obj.oid in get_bom_oids(assembly):
-            # orb.log.debug('  obj in assembly bom -- look for children ...')
-            obj_idxs = []
-            comp_idxs = [model.index(row, 0, idx)
-                         for row in range(model.rowCount(idx))]
-            for comp_idx in comp_idxs:
-                obj_idxs += self.object_indexes_in_assembly(obj, comp_idx)
-            return obj_idxs
-        else:
-            return []
-
-    def link_indexes_in_assembly(self, link, idx):
+        Return the oids of the objects of the nodes that are currently visible
+        in the tree (i.e. all of whose ancestors are expanded), in the order
+        in which they are displayed (used to prioritize the prefetching of
+        model files).
         """
-        Find the source model indexes of all nodes in an assembly that have the
-        specified link as their `link` attribute and the specified source model
-        index.
-
-        Args:
-            link (Acu):  specified link
-            idx (QModelIndex):  index of the assembly or project node
-        """
-        if link:
-            model = self.source_model
-            assembly_node = model.get_node(idx)
-            if assembly_node.link is None:
-                return []
-            if hasattr(assembly_node.link, 'component'):
-                assembly = assembly_node.link.component
-            else:
-                assembly = assembly_node.link.system
-            # orb.log.debug('* link_indexes_in_assembly({})'.format(link.id))
-            if link.oid == assembly_node.link.oid:
-                # orb.log.debug('  assembly node *is* the link node')
-                return [idx]
-            elif model.hasChildren(idx) and link in get_assembly(assembly):
-                # orb.log.debug('  link in assembly -- looking for acus ...')
-                link_idxs = []
-                comp_idxs = [model.index(row, 0, idx)
-                             for row in range(model.rowCount(idx))]
-                for comp_idx in comp_idxs:
-                    link_idxs += self.link_indexes_in_assembly(link, comp_idx)
-                return link_idxs
-            return []
-        return []
+        oids = []
+        def walk(parent):
+            for row in range(self.proxy_model.rowCount(parent)):
+                idx = self.proxy_model.index(row, 0, parent)
+                node = self.get_node_for_index(idx)
+                oid = getattr(getattr(node, 'obj', None), 'oid', None)
+                if oid and oid not in oids:
+                    oids.append(oid)
+                if self.isExpanded(idx):
+                    walk(idx)
+        try:
+            walk(QModelIndex())
+        except:
+            # oops -- my C++ object probably got deleted
+            pass
+        return oids
 
 #---------------------------------------------------------------
 # Test/Prototyping script code ...
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: per-object deserialization (the loop previously used by
+Main.load_serialized_objects) vs. class-batched deserialization
+(pangalactic.node.sync.deserialize_in_batches).
+
+Usage:
+
+    python benchmark_loading.py [-n NUMBER_OF_OBJECTS]
+"""
+import argparse, os, shutil, time
+from copy import deepcopy
+
+# set the orb
+import pangalactic.core.set_uberorb  # noqa: F401
+
+from pangalactic.core              import orb
+from pangalactic.core.serializers  import DESERIALIZATION_ORDER, deserialize
+from pangalactic.core.test.utils   import (create_test_users,
+                                           create_test_project)
+from pangalactic.node.sync         import deserialize_in_batches
+
+
+def make_serialized_products(template, prefix, n):
+    """
+    Create `n` serialized HardwareProduct objects by copying a serialized
+    template object and giving each copy a unique oid and id.
+    """
+    sobjs = []
+    for i in range(n):
+        so = deepcopy(template)
+        so['oid'] = f'bench:{prefix}.{i}'
+        so['id'] = f'{prefix}-{i}'
+        so['name'] = f'Benchmark Product {prefix} {i}'
+        sobjs.append(so)
+    return sobjs
+
+
+def load_per_object(sobjs):
+    """
+    The per-object loop: one deserialize() call per serialized object.
+    """
+    byclass = {}
+    for so in sobjs:
+        byclass.setdefault(so['_cname'], []).append(so)
+    objs = []
+    for cname in DESERIALIZATION_ORDER:
+        for so in byclass.pop(cname, []):
+            objs += deserialize(orb, [so], force_no_recompute=True)
+    for cname in byclass:
+        for so in byclass[cname]:
+            objs += deserialize(orb, [so], force_no_recompute=True)
+    return objs
+
+
+def run(n):
+    home = os.path.join(os.getcwd(), 'pangalaxian_bench')
+    if os.path.exists(home):
+        shutil.rmtree(home)
+    os.makedirs(home, mode=0o755)
+    orb.start(home=home)
+    sobjs = create_test_users() + create_test_project()
+    deserialize(orb, sobjs)
+    template = [so for so in sobjs if so['_cname'] == 'HardwareProduct'][0]
+    results = {}
+    for label, fn in [('per-object', load_per_object),
+                      ('batched', lambda s: deserialize_in_batches(orb, s))]:
+        to_load = make_serialized_products(template, label, n)
+        t0 = time.perf_counter()
+        objs = fn(to_load)
+        elapsed = time.perf_counter() - t0
+        results[label] = elapsed
+        print(f'{label:>12}: {len(objs)} objects in {elapsed:.3f} s '
+              f'({1000 * elapsed / max(n, 1):.3f} ms/object)')
+    if results['batched']:
+        speedup = results['per-object'] / results['batched']
+        print(f'     speedup: {speedup:.1f}x')
+    shutil.rmtree(home)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='n', type=int, default=5000,
+                        help='number of objects to load [default: 5000]')
+    options = parser.parse_args()
+    run(options.n)
@@ -2,11 +2,16 @@
 """
 Unit tests for pangalactic.node modules
 """
+import copy
 import os
+import shutil
 import unittest
 
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.task import Clock
+
 # set the orb
-import pangalactic.core.set_uberorb
+import pangalactic.core.set_uberorb  # noqa: F401
 
 # pangalactic
 # from pangalactic.core.parametrics import (compute_margin,
@@ -26,11 +31,30 @@ import pangalactic.core.set_uberorb
                                           # serialize_des,
                                           # serialize_parms,
                                           # save_parmz, save_data_elementz)
+from pydispatch import dispatcher
+
 from pangalactic.core              import orb, prefs
+from pangalactic.core.clone        import clone
+from pangalactic.core.parametrics  import (add_parameter, get_pval,
+                                           recompute_parmz, set_pval)
 from pangalactic.core.serializers  import deserialize
 from pangalactic.core.test.utils   import (create_test_users,
                                            create_test_project)
+from pangalactic.node.assemblygraph import AssemblyGraph
+from pangalactic.node.message_bus  import (Backoff, MeasuredSerializer,
+                                           PayloadStats, rpc_call_site,
+                                           RpcStats)
 from pangalactic.node.powermodeler import flatten_subacts
+from pangalactic.node.transfer     import (ChunkDownloader,
+                                           ChunkUploader, Prefetcher)
+from pangalactic.node.sync         import (ChunkScheduler, ChunkSizer,
+                                           coalesce_pubsub_msgs,
+                                           deserialize_in_batches,
+                                           dirty_since, ManifestDigests,
+                                           OpJournal, payload_size,
+                                           RpcBatcher)
+from pangalactic.node.systemtree   import SystemTreeModel
+from pangalactic.node.vault        import ContentVault
 
 prefs['default_data_elements'] = ['TRL', 'Vendor', 'reference_missions']
 prefs['default_parms'] = [
@@ -67,6 +91,35 @@ serialized_test_objects += create_test_project()
 deserialize(orb, serialized_test_objects)
 
 
+def create_tree_project(tag):
+    """
+    Create a project whose system is an assembly of two components (each
+    system tree test gets its own, since the tree deletes Acus).
+
+    Args:
+        tag (str):  suffix of the ids of the objects
+
+    Returns:
+        tuple:  (project, system, components, acus)
+    """
+    project = clone('Project', id='TREE' + tag, name='Tree Test ' + tag)
+    system = clone('HardwareProduct', id='TREE-SC-' + tag,
+                   name='Tree Spacecraft ' + tag, owner=project)
+    comps = [clone('HardwareProduct', id='TREE-C{}-{}'.format(i, tag),
+                   name='Tree Component {} {}'.format(i, tag), owner=project)
+             for i in (1, 2)]
+    psu = clone('ProjectSystemUsage', id='TREE-PSU-' + tag,
+                name='Tree PSU ' + tag, system_role='Spacecraft',
+                project=project, system=system)
+    acus = [clone('Acu', id='TREE-ACU{}-{}'.format(i, tag),
+                  name='Tree Acu {} {}'.format(i, tag), assembly=system,
+                  component=comp, quantity=1,
+                  reference_designator='C{}'.format(i))
+            for i, comp in enumerate(comps, start=1)]
+    orb.save([project, system] + comps + [psu] + acus)
+    return project, system, comps, acus
+
+
 class NodeTest(unittest.TestCase):
     maxDiff = None
 
@@ -85,3 +138,583 @@ class NodeTest(unittest.TestCase):
         expected = [act1, act2, act3, act4, act5]
         self.assertEqual(expected, value)
 
+
+    def test_01_deserialize_in_batches(self):
+        """
+        CASE:  deserialize serialized objects in class batches
+        """
+        sobjs = create_test_users() + create_test_project()
+        batches = []
+        progress = lambda cname, n, done: batches.append((cname, n, done))
+        objs = deserialize_in_batches(orb, sobjs, force_update=True,
+                                      progress=progress)
+        cnames = [b[0] for b in batches]
+        expected = [len(set(so['_cname'] for so in sobjs)), len(sobjs)]
+        value = [len(cnames), batches[-1][2]]
+        self.assertEqual(expected, value)
+        self.assertEqual(len(cnames), len(set(cnames)))
+        self.assertTrue(all(o is not None for o in objs))
+
+    def test_02_chunk_scheduler_order(self):
+        """
+        CASE:  chunk responses arriving out of order are loaded in order, with
+        no more than `window` requests in flight
+        """
+        pending = {}
+        loaded = []
+        done = []
+
+        def fetch(chunk):
+            d = Deferred()
+            pending[chunk[0]] = d
+            return d
+
+        scheduler = ChunkScheduler([0, 1, 2, 3], fetch, loaded.append,
+                                   on_done=lambda: done.append(True),
+                                   window=2, chunk_size=1)
+        scheduler.start()
+        in_flight_at_start = sorted(pending)
+        pending.pop(1).callback('r1')
+        pending.pop(0).callback('r0')
+        pending.pop(3).callback('r3')
+        pending.pop(2).callback('r2')
+        expected = [[0, 1], ['r0', 'r1', 'r2', 'r3'], [True]]
+        value = [in_flight_at_start, loaded, done]
+        self.assertEqual(expected, value)
+
+    def test_03_chunk_sizer(self):
+        """
+        CASE:  chunk size grows on fast small responses and shrinks when a
+        response nears the payload limit or times out
+        """
+        sizer = ChunkSizer(size=50, max_payload=100000, target_latency=2.0)
+        sizer.record(50, 5000, 0.5)
+        grown = sizer.size
+        sizer.record(75, 90000, 0.5)
+        shrunk = sizer.size
+        sizer.record_timeout(37)
+        expected = [75, 37, 18]
+        value = [grown, shrunk, sizer.size]
+        self.assertEqual(expected, value)
+
+    def test_04_coalesce_pubsub_msgs(self):
+        """
+        CASE:  coalesce a batch of pubsub messages
+        """
+        a1 = {'_cname': 'HardwareProduct', 'oid': 'a', 'name': 'A1'}
+        a2 = {'_cname': 'HardwareProduct', 'oid': 'a', 'name': 'A2'}
+        b = {'_cname': 'HardwareProduct', 'oid': 'b', 'name': 'B'}
+        c = {'_cname': 'HardwareProduct', 'oid': 'c', 'name': 'C'}
+        items = [('modified', ('other', [a1])),
+                 ('parameters set', None),
+                 ('new', ('me', [c])),
+                 ('modified', ('other', [a2, b])),
+                 ('properties set', ({'a': {'m': 1}, 'b': {'m': 2}},
+                                     '2024-03-01 10:00:00')),
+                 ('deleted', 'b'),
+                 ('parameters set', None),
+                 ('properties set', ({'a': {'m': 3}}, '2024-03-01 11:00:00')),
+                 ('deleted', 'b')]
+        batch, coalesced = coalesce_pubsub_msgs(items, userid='me')
+        expected = [[('received objects', [a2]),
+                     ('parameters set', None),
+                     ('properties set',
+                      {'a': ({'m': 3}, '2024-03-01 11:00:00'),
+                       'b': ({'m': 2}, '2024-03-01 10:00:00')}),
+                     ('deleted', 'b')],
+                    {'modified': 1, 'new': 1, 'parameters set': 1,
+                     'properties set': 1, 'deleted': 1}]
+        value = [batch, coalesced]
+        self.assertEqual(expected, value)
+        # updates of an object are not reordered:  properties of a new object
+        # are set after it is received, and an object is not merged past
+        # properties set on it
+        x1 = {'_cname': 'HardwareProduct', 'oid': 'x', 'name': 'X1'}
+        x3 = {'_cname': 'HardwareProduct', 'oid': 'x', 'name': 'X3'}
+        dts = '2024-03-01 10:00:00'
+        items = [('properties set', ({'a': {'m': 1}}, dts)),
+                 ('new', ('other', [x1])),
+                 ('properties set', ({'x': {'m': 2}}, dts)),
+                 ('modified', ('other', [x3])),
+                 ('properties set', ({'a': {'m': 4}}, dts))]
+        batch, coalesced = coalesce_pubsub_msgs(items, userid='me')
+        expected = [[('properties set', {'a': ({'m': 1}, dts)}),
+                     ('received objects', [x1]),
+                     ('properties set', {'x': ({'m': 2}, dts),
+                                         'a': ({'m': 4}, dts)}),
+                     ('received objects', [x3])],
+                    {'properties set': 1}]
+        value = [batch, coalesced]
+        self.assertEqual(expected, value)
+
+    def test_05_dirty_since(self):
+        """
+        CASE:  select the items of a sync manifest modified since a cursor
+        """
+        mod_dts = {'a': '2024-03-01 10:00:00.000001',
+                   'b': '2024-03-01 12:30:00.000000+00:00',
+                   'c': '2024-02-28 09:00:00'}
+        value = dirty_since(mod_dts, '2024-03-01 10:00:00.000001')
+        expected = {'b': '2024-03-01 12:30:00.000000+00:00'}
+        self.assertEqual(expected, value)
+
+    def test_06_manifest_digests(self):
+        """
+        CASE:  find the manifest buckets that differ from a remote manifest
+        """
+        mod_dts = {f'test:{i}': '2024-03-01 10:00:00' for i in range(100)}
+        remote = ManifestDigests(n_buckets=16)
+        remote.load(mod_dts)
+        local = ManifestDigests(n_buckets=16)
+        local.load(mod_dts)
+        # incremental updates:  modify one object, delete another
+        local.update('test:7', '2024-03-02 09:00:00')
+        local.discard('test:42')
+        buckets = local.diff(remote.digests())
+        expected = [sorted(set([local.bucket('test:7'),
+                                local.bucket('test:42')])),
+                    ['test:42', 'test:7']]
+        value = [buckets,
+                 sorted(set(local.expand(mod_dts, buckets)) &
+                        set(['test:7', 'test:42']))]
+        self.assertEqual(expected, value)
+
+    def test_07_payload_stats(self):
+        """
+        CASE:  summarize recorded message payload sizes by serializer
+        """
+        stats = PayloadStats()
+        for n in range(1, 101):
+            stats.record('msgpack', 'in', n, 0.001)
+        stats.record('json', 'out', 300, 0.002)
+        expected = [('json', 'out', dict(messages=1, bytes=300, mean=300.0,
+                                         p95=300, max=300, time=0.002)),
+                    ('msgpack', 'in', dict(messages=100, bytes=5050,
+                                           mean=50.5, p95=96, max=100,
+                                           time=0.1))]
+        value = stats.report()
+        value[1][2]['time'] = round(value[1][2]['time'], 6)
+        self.assertEqual(expected, value)
+
+    def test_08_rpc_batcher(self):
+        """
+        CASE:  merge a burst of parameter updates into one batch
+        """
+        batch = RpcBatcher()
+        batch.set_parms({'a': {'m': 1.0, 'P': 2.0}})
+        batch.set_parms({'a': {'m': 3.0}, 'b': {'m': 4.0}})
+        batch.add_parm('b', 'R_D')
+        batch.del_parm('a', 'P')
+        # a parameter deleted and then added again is reset:  both are sent
+        batch.del_parm('b', 'm')
+        batch.add_parm('b', 'm')
+        value = batch.take()
+        expected = dict(objs=[], parm_add=[('b', 'R_D'), ('b', 'm')],
+                        parm_del=[('a', 'P'), ('b', 'm')],
+                        parms={'a': {'m': 3.0}},
+                        des={}, props={}, merged=3)
+        self.assertEqual(expected, value)
+
+    def test_09_op_journal_compaction(self):
+        """
+        CASE:  compact offline journal entries, last write winning per oid
+        """
+        journal = OpJournal(os.path.join(home, 'test_journal.jsonl'))
+        journal.clear()
+        journal.append('save', oids=['a', 'b'], new=True)
+        journal.append('parms', values={'b': {'m': 1.0}, 'c': {'m': 2.0}})
+        journal.append('parms', values={'c': {'m': 3.0}})
+        journal.append('freeze', oids=['c'])
+        journal.append('thaw', oids=['c'])
+        journal.append('delete', oids=['a', 'd'])
+        value = journal.compact()
+        journal.clear()
+        expected = dict(save=['b'], parm_del=[], parm_add=[],
+                        parms={'b': {'m': 1.0}, 'c': {'m': 3.0}},
+                        des={}, props={}, freeze=[], thaw=['c'],
+                        delete=['d'], entries=6, merged=2, seq=6)
+        self.assertEqual(expected, value)
+
+    def test_10_rpc_stats(self):
+        """
+        CASE:  summarize rpc latencies by uri and call site
+        """
+        stats = RpcStats()
+        for n in range(1, 101):
+            stats.record('vger.save', 'flush_rpc_batch', n / 1000)
+        stats.record('vger.get_parmz', 'get_parmz', 0.5, outcome='timeout',
+                     timeout=0.5)
+        value = [(uri, st['calls'], st['timeouts'], st['p50'], st['p99'],
+                  [site for site, n, t in st['sites']])
+                 for uri, st in stats.report()]
+        expected = [('vger.save', 100, 0, 0.051, 0.1, ['flush_rpc_batch']),
+                    ('vger.get_parmz', 1, 1, 0.5, 0.5, ['get_parmz'])]
+        self.assertEqual(expected, value)
+
+    def test_11_reconnect_backoff(self):
+        """
+        CASE:  reconnect delays grow exponentially up to the maximum
+        """
+        backoff = Backoff(initial=1, maximum=30, jitter=0.5,
+                          rand=lambda: 1.0)
+        value = [backoff.next_delay() for i in range(7)]
+        backoff.reset()
+        value.append(backoff.next_delay())
+        expected = [0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 15.0, 0.5]
+        self.assertEqual(expected, value)
+
+    def test_12_chunk_uploader(self):
+        """
+        CASE:  stream a file one chunk at a time, in sequence, re-sending a
+        failed chunk before any later one
+        """
+        fpath = os.path.join(home, 'test_upload.bin')
+        with open(fpath, 'wb') as f:
+            f.write(bytes(range(256)) * 40)
+        sent = []
+        def send(seq, data):
+            d = Deferred()
+            sent.append((seq, data, d))
+            return d
+        # the repository appends chunks in the order it receives them
+        received = []
+        uploader = ChunkUploader(fpath, send, chunk_size=1000)
+        uploader.start()
+        failed = False
+        max_in_flight = 0
+        while sent:
+            max_in_flight = max(max_in_flight, len(sent))
+            seq, data, d = sent.pop(0)
+            if seq == 3 and not failed:
+                failed = True
+                d.errback(Exception('chunk lost'))
+            else:
+                received.append(data)
+                d.callback(seq)
+        with open(fpath, 'rb') as f:
+            expected = (f.read(), 1)
+        value = (b''.join(received), max_in_flight)
+        self.assertEqual(expected, value)
+
+    def test_13_chunk_downloader_resume(self):
+        """
+        CASE:  write chunks received out of order at their offsets, and
+        resume an interrupted download with only the missing chunks
+        """
+        content = bytes(range(256)) * 40
+        fpath = os.path.join(home, 'test_download.bin')
+        if os.path.exists(fpath):
+            os.remove(fpath)
+        requested = []
+        def fetch(seq):
+            d = Deferred()
+            requested.append((seq, d))
+            return d
+        def respond(seq, d):
+            d.callback(content[seq * 1000:(seq + 1) * 1000])
+        # first attempt:  chunks 1 and 0 arrive (in that order), then stop
+        downloader = ChunkDownloader(fpath, len(content), fetch,
+                                     chunk_size=1000, window=3)
+        downloader.start()
+        respond(*requested[1])
+        respond(*requested[0])
+        downloader.stop()
+        # second attempt:  only the missing chunks are requested
+        requested.clear()
+        downloader = ChunkDownloader(fpath, len(content), fetch,
+                                     chunk_size=1000, window=3)
+        downloader.start()
+        resumed = set()
+        while requested:
+            seq, d = requested.pop()
+            resumed.add(seq)
+            respond(seq, d)
+        with open(fpath, 'rb') as f:
+            value = (sorted(resumed), f.read() == content)
+        expected = (list(range(2, 11)), True)
+        self.assertEqual(expected, value)
+
+    def test_14_content_vault_dedup_and_gc(self):
+        """
+        CASE:  store the same content under two vault file names as one
+        read-only blob, and collect the blob of a vault file that is no
+        longer live
+        """
+        vault_dir = os.path.join(home, 'test_vault')
+        if os.path.exists(vault_dir):
+            shutil.rmtree(vault_dir)
+        os.makedirs(vault_dir)
+        src_a = os.path.join(home, 'test_a.step')
+        src_b = os.path.join(home, 'test_b.step')
+        with open(src_a, 'wb') as f:
+            f.write(b'a' * 1000)
+        with open(src_b, 'wb') as f:
+            f.write(b'b' * 10)
+        vault = ContentVault(vault_dir)
+        vault.store(src_a, 'oid1_a.step')
+        vault.store(src_a, 'oid2_a.step')
+        vault.store(src_b, 'oid3_b.step')
+        stored = vault.stats()
+        mode = os.stat(os.path.join(vault_dir, 'oid1_a.step')).st_mode
+        removed = vault.collect_garbage(
+                                live_fnames={'oid1_a.step', 'oid2_a.step'})
+        value = (stored['blobs'], stored['saved'], mode & 0o222, removed,
+                 sorted(os.listdir(vault_dir)))
+        expected = (2, 1000, 0, (1, 10),
+                    ['blobs', 'oid1_a.step', 'oid2_a.step'])
+        self.assertEqual(expected, value)
+
+    def test_15_content_vault_lru_eviction(self):
+        """
+        CASE:  evict the least recently used downloaded files to fit a quota,
+        never evicting locally stored or kept (pinned) files
+        """
+        vault_dir = os.path.join(home, 'test_vault_lru')
+        if os.path.exists(vault_dir):
+            shutil.rmtree(vault_dir)
+        os.makedirs(vault_dir)
+        src = os.path.join(home, 'test_local.step')
+        with open(src, 'wb') as f:
+            f.write(b'L' * 100)
+        vault = ContentVault(vault_dir)
+        vault.store(src, 'oid0_local.step')
+        for i, fname in enumerate(['oid1_d.step', 'oid2_d.step',
+                                   'oid3_d.step']):
+            with open(os.path.join(vault_dir, fname), 'wb') as f:
+                f.write(bytes([65 + i]) * 100)
+            vault.adopt(fname)
+            vault.access[fname] = i
+        # accessing oid1 makes oid2 the least recently used
+        vault.record_access('oid1_d.step')
+        vault.record_access('oid9_missing.step')
+        evicted = vault.evict(250, keep={'oid3_d.step'})
+        vault_stats = vault.stats()
+        value = (evicted, sorted(os.listdir(vault_dir)),
+                 vault_stats['hit_rate'])
+        expected = ((2, 200), ['blobs', 'oid0_local.step', 'oid3_d.step'],
+                    0.5)
+        self.assertEqual(expected, value)
+
+    def test_16_prefetcher_priority_pause_and_budget(self):
+        """
+        CASE:  prefetch files in priority order, one rate-limited chunk at a
+        time, pausing while busy and skipping files beyond the budget
+        """
+        prefetch_dir = os.path.join(home, 'test_prefetch')
+        if os.path.exists(prefetch_dir):
+            shutil.rmtree(prefetch_dir)
+        os.makedirs(prefetch_dir)
+        contents = {'a': b'a' * 2500, 'b': b'b' * 1000, 'c': b'c' * 5000}
+        clock = Clock()
+        busy = [True]
+        fetched = []
+        def fetch(key, seq):
+            fetched.append((key, seq, clock.seconds()))
+            return succeed(contents[key][seq * 1000:(seq + 1) * 1000])
+        prefetcher = Prefetcher(fetch, clock, is_busy=lambda: busy[0],
+                                rate=1000, budget=4000, chunk_size=1000)
+        for priority, key in enumerate(['b', 'a', 'c']):
+            prefetcher.add(key, os.path.join(prefetch_dir, key),
+                           len(contents[key]), priority=priority)
+        prefetcher.start()
+        clock.advance(1)
+        busy[0] = False
+        for i in range(6):
+            clock.advance(1)
+        value = (fetched, sorted(os.listdir(prefetch_dir)))
+        expected = ([('b', 0, 2.0), ('a', 0, 3.0), ('a', 1, 4.0),
+                     ('a', 2, 5.0)], ['a', 'b'])
+        self.assertEqual(expected, value)
+
+    def test_17_assembly_graph_memoized_and_incremental(self):
+        """
+        CASE:  compute depth, BOM and cycles of assemblies once, then update
+        only the affected results when Acus are added and deleted
+        """
+        acus = {'S': [('a1', 'A'), ('a2', 'B'), ('a3', 'B')],
+                'A': [('a4', 'C')], 'B': [('a5', 'C')], 'C': []}
+        graph = AssemblyGraph(lambda oid: list(acus.get(oid, [])))
+        before = (graph.depth('S'), sorted(graph.bom_oids('S')),
+                  graph.cycles('S'), graph.n_analyzed)
+        # an Acu that makes C use S creates a cycle
+        acus['C'] = [('a6', 'S')]
+        graph.update_acu('a6', 'C', 'S')
+        cycle = (graph.cycles('B'), graph.n_analyzed)
+        acus['C'] = []
+        graph.remove_acu('a6')
+        after = (graph.depth('S'), graph.cycles('S'), graph.n_analyzed)
+        value = (before, cycle, after)
+        expected = ((3, ['A', 'B', 'C'], [], 4),
+                    ([('A', 'B', 'C', 'S')], 8),
+                    (3, [], 12))
+        self.assertEqual(expected, value)
+
+    def test_18_measured_serializer_copy(self):
+        """
+        CASE:  copy a measured serializer (attribute lookups that would
+        recurse through the wrapped serializer are not delegated)
+        """
+        class Serializer(object):
+            SERIALIZER_ID = 'test'
+            def serialize(self, obj):
+                return str(obj).encode(), False
+        stats = PayloadStats()
+        serializer = copy.copy(MeasuredSerializer(Serializer(), stats))
+        payload, is_binary = serializer.serialize('abc')
+        value = (serializer.SERIALIZER_ID, payload,
+                 [(sid, d, st['bytes']) for sid, d, st in stats.report()])
+        expected = ('test', b'abc', [('test', 'out', 3)])
+        self.assertEqual(expected, value)
+
+    def test_19_system_tree_node_index(self):
+        """
+        CASE:  index the system tree nodes by object and link oid as they
+        are loaded and removed
+        """
+        project, system, comps, acus = create_tree_project('19')
+        model = SystemTreeModel(project)
+        # loading the nodes of an Acu loads the nodes on the path to it
+        idxs = model.link_indexes(acus[0])
+        node = model.get_node(idxs[0])
+        loaded = (len(idxs), node.obj.oid, len(model.object_indexes(system)),
+                  len(model.object_indexes(comps[1])),
+                  len(model.link_indexes(project.systems[0])))
+        acu_oid = acus[0].oid
+        model.removeRows(node.row(), 1, model.index_for_node(node.parent))
+        removed = (acu_oid in model.link_oid_nodes,
+                   comps[0].oid in model.obj_oid_nodes,
+                   len(model.object_indexes(comps[1])))
+        value = (loaded, removed)
+        expected = ((1, comps[0].oid, 1, 1, 1), (False, False, 1))
+        self.assertEqual(expected, value)
+
+    def test_20_system_tree_cell_cache(self):
+        """
+        CASE:  keep the cached dashboard cells until "parmz changed" is sent
+        for their objects
+        """
+        prefs.setdefault('units', {})
+        prefs.setdefault('dashboards', {}).setdefault('MEL', ['m'])
+        project, system, comps, acus = create_tree_project('20')
+        for comp in comps:
+            add_parameter(comp.oid, 'm')
+            set_pval(comp.oid, 'm', 5.0)
+        model = SystemTreeModel(project)
+        nodes = [model.get_node(model.link_indexes(acu)[0]) for acu in acus]
+        before = [model.cell(node, 'm')[1] for node in nodes]
+        set_pval(comps[0].oid, 'm', 7.0)
+        cached = model.cell(nodes[0], 'm')[1]
+        dispatcher.send('parmz changed', oids=[comps[0].oid])
+        invalidated = (nodes[0] in model.cell_cache,
+                       nodes[1] in model.cell_cache)
+        after = model.cell(nodes[0], 'm')[1]
+        value = (before, cached, invalidated, after)
+        expected = ([5.0, 5.0], 5.0, (False, True), 7.0)
+        self.assertEqual(expected, value)
+
+    def test_21_system_tree_sync_nodes(self):
+        """
+        CASE:  update the loaded system tree nodes in place when Acus are
+        added and modified
+        """
+        project, system, comps, acus = create_tree_project('21')
+        model = SystemTreeModel(project)
+        idx = model.link_indexes(acus[1])[0]
+        kept_node = model.get_node(idx)
+        sys_node = kept_node.parent
+        # a new Acu and an Acu that now points to a new component
+        comp3 = clone('HardwareProduct', id='TREE-C3-21',
+                      name='Tree Component 3 21', owner=project)
+        acu3 = clone('Acu', id='TREE-ACU3-21', name='Tree Acu 3 21',
+                     assembly=system, component=comp3, quantity=1,
+                     reference_designator='C3')
+        acus[0].component = comp3
+        orb.save([comp3, acu3, acus[0]])
+        model.sync_nodes()
+        value = (sorted(n.link.oid for n in sys_node.children),
+                 model.get_node(model.link_indexes(acus[1])[0]) is kept_node,
+                 comps[0].oid in model.obj_oid_nodes,
+                 len(model.object_indexes(comp3)))
+        expected = (sorted([acus[0].oid, acus[1].oid, acu3.oid]), True,
+                    False, 2)
+        self.assertEqual(expected, value)
+
+    def test_22_rpc_call_site(self):
+        """
+        CASE:  find the call site of an rpc beyond the functions that only
+        forward rpcs
+        """
+        def call(call_site=None):
+            return call_site or rpc_call_site()
+        def call_sync_rpc():
+            return call()
+        def sync_library_objs():
+            return call_sync_rpc()
+        value = (sync_library_objs(), call(call_site='replay_op_journal'))
+        expected = ('sync_library_objs', 'replay_op_journal')
+        self.assertEqual(expected, value)
+
+    def test_23_payload_size_estimate(self):
+        """
+        CASE:  estimate the size of a list of serialized objects from a
+        sample of them
+        """
+        sobjs = [dict(oid='test:obj{:04d}'.format(i), name='x' * (i % 7))
+                 for i in range(1000)]
+        full = payload_size(sobjs)
+        estimate = payload_size(sobjs, sample=10)
+        value = (abs(estimate - full) < 0.05 * full,
+                 payload_size(sobjs[:5], sample=10) == payload_size(sobjs[:5]))
+        expected = (True, True)
+        self.assertEqual(expected, value)
+
+    def test_24_system_tree_rollup_cells(self):
+        """
+        CASE:  drop the cached cells of the assemblies of an object whose
+        parameters are edited (their rolled-up values depend on it), as
+        Main.on_parms_set() does for "parms set"
+        """
+        prefs.setdefault('units', {})
+        prefs.setdefault('dashboards', {}).setdefault('MEL', ['m'])
+        project, system, comps, acus = create_tree_project('24')
+        for obj in [system] + comps:
+            add_parameter(obj.oid, 'm')
+            add_parameter(obj.oid, 'm[CBE]')
+            set_pval(obj.oid, 'm', 5.0)
+        recompute_parmz()
+        model = SystemTreeModel(project)
+        comp_node = model.get_node(model.link_indexes(acus[0])[0])
+        sys_node = comp_node.parent
+        model.cell(comp_node, 'm')
+        model.cell(sys_node, 'm[CBE]')
+        parms = {comps[0].oid: {'m': 7.0}}
+        set_pval(comps[0].oid, 'm', 7.0)
+        recompute_parmz()
+        dispatcher.send('parmz changed', oids=list(parms))
+        invalidated = (comp_node in model.cell_cache,
+                       sys_node in model.cell_cache)
+        value = (invalidated, model.cell(comp_node, 'm')[1],
+                 model.cell(sys_node, 'm[CBE]')[1])
+        expected = ((False, False), 7.0, get_pval(system.oid, 'm[CBE]'))
+        self.assertEqual(expected, value)
+
+    def test_25_op_journal_keeps_entries_added_during_replay(self):
+        """
+        CASE:  clear only the replayed journal entries, keeping those
+        appended while the replay was in progress
+        """
+        journal = OpJournal(os.path.join(home, 'test_journal_replay.jsonl'))
+        journal.clear()
+        journal.append('parms', values={'a': {'m': 1.0}})
+        journal.append('delete', oids=['b'])
+        batch = journal.compact()
+        # offline edit while a replay call is parked
+        journal.append('parms', values={'a': {'m': 2.0}})
+        n_kept = journal.clear(through=batch['seq'])
+        reopened = OpJournal(journal.path)
+        value = (n_kept, [(e['op'], e['data']) for e in reopened.entries()],
+                 reopened.compact()['parms'])
+        journal.clear()
+        expected = (1, [('parms', {'values': {'a': {'m': 2.0}}})],
+                    {'a': {'m': 2.0}})
+        self.assertEqual(expected, value)
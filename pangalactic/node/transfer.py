@@ -0,0 +1,498 @@
+# -*- coding: utf-8 -*-
+"""
+File transfer helpers for pangalaxian (uploads of files to the repository
+vault, downloads of files from it, and background prefetching of files).
+
+These classes do not depend on Qt, so they can be used (and tested) without a
+running GUI.
+"""
+import heapq, json, math, os, time
+from collections import deque
+
+from twisted.internet.defer import Deferred
+
+
+class ChunkUploader(object):
+    """
+    Streams a file to the repository in chunks that are read from disk only
+    when they are sent, so the memory used does not depend on the size of
+    the file.  The repository appends the chunks to the vault file in the
+    order it receives them (`vger.upload_chunk` has no offset argument), so
+    the chunks are sent strictly in sequence, one at a time:  the next chunk
+    is sent only when the previous one has been uploaded, and a chunk whose
+    upload fails is re-sent (up to `max_retries` times) before any later
+    chunk, after which the upload fails.
+
+    Attributes:
+        fpath (str):  path of the file to be uploaded
+        send (callable):  function that takes (seq, data) and returns a
+            Deferred that fires when chunk `seq` has been uploaded
+        chunk_size (int):  size of the chunks [bytes]
+        max_retries (int):  number of times a failed chunk is re-sent
+        on_progress (callable):  function to be called with (chunks done,
+            throughput [bytes/second]) after each chunk is uploaded
+        on_done (callable):  function to be called (with no args) when all
+            chunks have been uploaded
+        on_failure (callable):  function to be called with the Failure (or
+            exception) if a chunk cannot be uploaded -- the upload is then
+            stopped
+        fsize (int):  size of the file [bytes]
+        numchunks (int):  number of chunks
+    """
+    def __init__(self, fpath, send, chunk_size=2**20, max_retries=3,
+                 on_progress=None, on_done=None, on_failure=None):
+        self.fpath = fpath
+        self.send = send
+        self.chunk_size = max(1, int(chunk_size or 2**20))
+        self.max_retries = max_retries
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_failure = on_failure
+        self.fsize = os.path.getsize(fpath)
+        self.numchunks = max(1, math.ceil(self.fsize / self.chunk_size))
+        self.next_seq = 0
+        self.done_chunks = 0
+        self.bytes_done = 0
+        self.retries = {}
+        self.f = None
+        self.t0 = None
+        self.stopped = False
+
+    def start(self):
+        """
+        Open the file and start uploading.
+        """
+        self.f = open(self.fpath, 'rb')
+        self.t0 = time.monotonic()
+        self._send(self.next_seq)
+
+    def stop(self):
+        """
+        Stop the upload:  no further chunks will be sent and the result of a
+        chunk upload still outstanding will be ignored.
+        """
+        self.stopped = True
+        if self.f:
+            self.f.close()
+            self.f = None
+
+    def throughput(self):
+        """
+        Return the throughput so far [bytes/second].
+        """
+        elapsed = time.monotonic() - self.t0 if self.t0 else 0
+        if not elapsed:
+            return 0.0
+        return self.bytes_done / elapsed
+
+    def read_chunk(self, seq):
+        self.f.seek(seq * self.chunk_size)
+        return self.f.read(self.chunk_size)
+
+    def _send(self, seq):
+        if self.stopped:
+            return
+        try:
+            data = self.read_chunk(seq)
+            d = self.send(seq, data)
+        except Exception as e:
+            self._fail(e)
+            return
+        d.addCallbacks(self._on_sent, self._on_error,
+                       callbackArgs=(seq, len(data)), errbackArgs=(seq,))
+
+    def _on_sent(self, result, seq, n_bytes):
+        if self.stopped:
+            return
+        self.done_chunks += 1
+        self.bytes_done += n_bytes
+        self.next_seq = seq + 1
+        if self.on_progress:
+            self.on_progress(self.done_chunks, self.throughput())
+        if self.done_chunks >= self.numchunks:
+            self.stop()
+            if self.on_done:
+                self.on_done()
+            return
+        self._send(self.next_seq)
+
+    def _on_error(self, f, seq):
+        if self.stopped:
+            return
+        if self.retries.get(seq, 0) < self.max_retries:
+            # re-send the same chunk before any later one
+            self.retries[seq] = self.retries.get(seq, 0) + 1
+            self._send(seq)
+            return
+        self._fail(f)
+
+    def _fail(self, f):
+        if self.stopped:
+            return
+        self.stop()
+        if self.on_failure:
+            self.on_failure(f)
+
+
+class ChunkDownloader(object):
+    """
+    Downloads a file from the repository in chunks, keeping up to `window`
+    chunk requests in flight and writing each chunk at its own offset (seq *
+    chunk_size) in a preallocated partial file ([fpath].part), so responses
+    may arrive in any order and are never accumulated in memory.  The
+    sequence numbers of the chunks written are recorded in a sidecar file
+    ([fpath].part.json), so an interrupted download resumes with the chunks
+    that are missing.  When all chunks have been written the partial file is
+    renamed to `fpath` and the sidecar is removed.  A chunk whose request
+    fails is requested again (up to `max_retries` times) before the download
+    fails.
+
+    Attributes:
+        fpath (str):  path of the file to be written
+        fsize (int):  size of the file [bytes]
+        fetch (callable):  function that takes a chunk sequence number and
+            returns a Deferred whose result is the chunk data (bytes)
+        chunk_size (int):  size of the chunks [bytes] (must be the size used
+            by the repository)
+        window (int):  maximum number of chunk requests in flight
+        max_retries (int):  number of times a failed chunk is re-requested
+        on_progress (callable):  function to be called with (chunks done,
+            throughput [bytes/second]) after each chunk is written
+        on_done (callable):  function to be called (with no args) when the
+            file is complete
+        on_failure (callable):  function to be called with the Failure (or
+            exception) if a chunk cannot be downloaded -- the download is
+            then stopped (and can be resumed later)
+        numchunks (int):  number of chunks
+        done (set):  sequence numbers of the chunks written
+    """
+    def __init__(self, fpath, fsize, fetch, chunk_size=2**19, window=4,
+                 max_retries=3, on_progress=None, on_done=None,
+                 on_failure=None):
+        self.fpath = fpath
+        self.part_path = fpath + '.part'
+        self.sidecar_path = fpath + '.part.json'
+        self.fsize = fsize
+        self.fetch = fetch
+        self.chunk_size = max(1, int(chunk_size or 2**19))
+        self.window = max(1, int(window or 1))
+        self.max_retries = max_retries
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_failure = on_failure
+        self.numchunks = max(1, math.ceil(fsize / self.chunk_size))
+        self.done = set()
+        self.to_fetch = deque()
+        self.in_flight = 0
+        self.retries = {}
+        self.bytes_done = 0
+        self.f = None
+        self.t0 = None
+        self.stopped = False
+
+    def load_sidecar(self):
+        """
+        Return the sequence numbers of the chunks recorded as written by an
+        earlier (interrupted) download of the same file, if any.
+        """
+        if not (os.path.exists(self.sidecar_path)
+                and os.path.exists(self.part_path)):
+            return set()
+        try:
+            with open(self.sidecar_path) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        if (record.get('fsize') != self.fsize
+            or record.get('chunk_size') != self.chunk_size):
+            return set()
+        return {seq for seq in record.get('done') or []
+                if 0 <= seq < self.numchunks}
+
+    def save_sidecar(self):
+        record = dict(fsize=self.fsize, chunk_size=self.chunk_size,
+                      done=sorted(self.done))
+        tmp_path = self.sidecar_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self.sidecar_path)
+
+    def start(self):
+        """
+        Open (or create and preallocate) the partial file and start
+        requesting the missing chunks.
+        """
+        self.done = self.load_sidecar()
+        if self.done:
+            self.f = open(self.part_path, 'r+b')
+        else:
+            self.f = open(self.part_path, 'wb+')
+        self.f.truncate(self.fsize)
+        self.to_fetch = deque(seq for seq in range(self.numchunks)
+                              if seq not in self.done)
+        self.t0 = time.monotonic()
+        if not self.to_fetch:
+            self._finish()
+            return
+        self._fill_window()
+
+    def stop(self):
+        """
+        Stop the download:  no further chunks will be requested and any
+        responses still outstanding will be ignored.  The partial file and
+        the sidecar are kept, so the download can be resumed.
+        """
+        self.stopped = True
+        if self.f:
+            self.f.close()
+            self.f = None
+
+    def throughput(self):
+        """
+        Return the throughput of this download so far [bytes/second].
+        """
+        elapsed = time.monotonic() - self.t0 if self.t0 else 0
+        if not elapsed:
+            return 0.0
+        return self.bytes_done / elapsed
+
+    def _fill_window(self):
+        while (not self.stopped and self.in_flight < self.window
+               and self.to_fetch):
+            seq = self.to_fetch.popleft()
+            self.in_flight += 1
+            try:
+                d = self.fetch(seq)
+            except Exception as e:
+                self.in_flight -= 1
+                self._fail(e)
+                return
+            d.addCallbacks(self._on_chunk, self._on_error,
+                           callbackArgs=(seq,), errbackArgs=(seq,))
+
+    def _on_chunk(self, data, seq):
+        self.in_flight -= 1
+        if self.stopped:
+            return
+        expected = min(self.chunk_size, self.fsize - seq * self.chunk_size)
+        if len(data) != expected:
+            self._fail(ValueError(f'chunk {seq}: {len(data)} bytes received, '
+                                  f'{expected} expected'))
+            return
+        self.f.seek(seq * self.chunk_size)
+        self.f.write(data)
+        self.f.flush()
+        self.done.add(seq)
+        self.bytes_done += len(data)
+        self.save_sidecar()
+        if self.on_progress:
+            self.on_progress(len(self.done), self.throughput())
+        if len(self.done) >= self.numchunks:
+            self._finish()
+            return
+        self._fill_window()
+
+    def _on_error(self, f, seq):
+        self.in_flight -= 1
+        if self.stopped:
+            return
+        if self.retries.get(seq, 0) < self.max_retries:
+            self.retries[seq] = self.retries.get(seq, 0) + 1
+            self.to_fetch.append(seq)
+            self._fill_window()
+            return
+        self._fail(f)
+
+    def _finish(self):
+        self.stop()
+        os.replace(self.part_path, self.fpath)
+        if os.path.exists(self.sidecar_path):
+            os.remove(self.sidecar_path)
+        if self.on_done:
+            self.on_done()
+
+    def _fail(self, f):
+        if self.stopped:
+            return
+        self.stop()
+        if self.on_failure:
+            self.on_failure(f)
+
+
+class Prefetcher(object):
+    """
+    Downloads files in the background, one chunk at a time, in order of
+    priority (lowest first), so they are in the vault before they are needed.
+    Each file is downloaded by a ChunkDownloader (window of 1), so an
+    interrupted prefetch leaves a partial file that a later download of the
+    same file resumes.  Chunks are requested only while `is_busy()` returns
+    False (e.g. while no interactive rpcs are in flight), at an average rate
+    of at most `rate` bytes/second, and files are skipped once starting them
+    would exceed a total of `budget` bytes.
+
+    Attributes:
+        fetch (callable):  function that takes (key, seq) and returns a
+            Deferred whose result is chunk `seq` of the file `key`
+        clock (IReactorTime):  provides callLater() and seconds() (the
+            reactor, or a twisted.internet.task.Clock in tests)
+        is_busy (callable):  function that returns True while chunks should
+            not be requested
+        rate (float):  maximum average download rate [bytes/second] (0 for
+            no limit)
+        budget (int):  maximum number of bytes to be prefetched (0 for no
+            limit)
+        chunk_size (int):  size of the chunks [bytes]
+        pause_interval (float):  seconds to wait before checking is_busy()
+            again
+        on_file_done (callable):  function to be called with (key, fpath)
+            when a file has been prefetched
+        on_failure (callable):  function to be called with (key, Failure or
+            exception) if a file cannot be prefetched -- prefetching is then
+            stopped
+        on_done (callable):  function to be called (with no args) when the
+            queue is empty
+        n_files (int):  number of files prefetched
+        n_bytes (int):  number of bytes of the files started
+    """
+    def __init__(self, fetch, clock, is_busy=None, rate=0, budget=0,
+                 chunk_size=2**19, pause_interval=1.0, on_file_done=None,
+                 on_failure=None, on_done=None):
+        self.fetch = fetch
+        self.clock = clock
+        self.is_busy = is_busy
+        self.rate = rate
+        self.budget = budget
+        self.chunk_size = chunk_size
+        self.pause_interval = pause_interval
+        self.on_file_done = on_file_done
+        self.on_failure = on_failure
+        self.on_done = on_done
+        self.queue = []
+        self.n_queued = 0
+        self.current = None
+        self.downloader = None
+        self.delayed_call = None
+        self.next_time = 0.0
+        self.n_files = 0
+        self.n_bytes = 0
+        self.stopped = True
+
+    def add(self, key, fpath, fsize, priority=0):
+        """
+        Queue a file to be prefetched.
+
+        Args:
+            key (str):  identifies the file to fetch() (e.g. the oid of its
+                DigitalFile)
+            fpath (str):  path of the file to be written
+            fsize (int):  size of the file [bytes]
+
+        Keyword Args:
+            priority (int):  files of lower priority values are fetched first
+        """
+        # n_queued keeps the order of files of equal priority
+        heapq.heappush(self.queue, (priority, self.n_queued, key, fpath,
+                                    fsize))
+        self.n_queued += 1
+
+    def discard(self, key):
+        """
+        Remove a file from the queue -- or, if it is being prefetched, stop
+        prefetching it (e.g. because the user is downloading it) and go on to
+        the next file.
+        """
+        self.queue = [item for item in self.queue if item[2] != key]
+        heapq.heapify(self.queue)
+        if self.current == key and self.downloader:
+            self.downloader.stop()
+            self._cancel_delayed_call()
+            self._next_file()
+
+    def start(self):
+        """
+        Start prefetching the queued files.
+        """
+        self.stopped = False
+        if not self.current:
+            self._next_file()
+
+    def stop(self):
+        """
+        Stop prefetching (the partial file of the current file is kept).
+        """
+        self.stopped = True
+        self._cancel_delayed_call()
+        if self.downloader:
+            self.downloader.stop()
+        self.downloader = None
+        self.current = None
+
+    def _cancel_delayed_call(self):
+        if self.delayed_call is not None and self.delayed_call.active():
+            self.delayed_call.cancel()
+        self.delayed_call = None
+
+    def _next_file(self):
+        self.current = None
+        self.downloader = None
+        while self.queue and not self.stopped:
+            priority, n, key, fpath, fsize = heapq.heappop(self.queue)
+            if self.budget and self.n_bytes + fsize > self.budget:
+                continue
+            self.current = key
+            self.n_bytes += fsize
+            self.downloader = ChunkDownloader(
+                                fpath, fsize,
+                                lambda seq, key=key: self._fetch(key, seq),
+                                chunk_size=self.chunk_size, window=1,
+                                on_done=self._on_file_done,
+                                on_failure=self._on_failure)
+            try:
+                self.downloader.start()
+            except OSError as e:
+                self._on_failure(e)
+            return
+        if not self.stopped:
+            self.stopped = True
+            if self.on_done:
+                self.on_done()
+
+    def _fetch(self, key, seq):
+        d = Deferred()
+        self._request(key, seq, d)
+        return d
+
+    def _request(self, key, seq, d):
+        # request a chunk when not busy and the rate allows it
+        self.delayed_call = None
+        if self.stopped or key != self.current:
+            return
+        now = self.clock.seconds()
+        if self.is_busy and self.is_busy():
+            delay = self.pause_interval
+        else:
+            delay = self.next_time - now
+        if delay > 0:
+            self.delayed_call = self.clock.callLater(delay, self._request,
+                                                     key, seq, d)
+            return
+        if self.rate:
+            self.next_time = max(now, self.next_time) + (self.chunk_size /
+                                                         self.rate)
+        try:
+            self.fetch(key, seq).chainDeferred(d)
+        except Exception as e:
+            d.errback(e)
+
+    def _on_file_done(self):
+        key, fpath = self.current, self.downloader.fpath
+        self.n_files += 1
+        if self.on_file_done:
+            self.on_file_done(key, fpath)
+        self._next_file()
+
+    def _on_failure(self, f):
+        key = self.current
+        self.stop()
+        if self.on_failure:
+            self.on_failure(key, f)
@@ -7,8 +7,8 @@ from copy import deepcopy
 
 from PyQt5.QtWidgets import (QApplication, QStyle, QStyleOptionViewItem,
                              QStyledItemDelegate, QTableWidgetItem)
-from PyQt5.QtCore    import (Qt, QByteArray, QDataStream, QIODevice, QMimeData,
-                             QSize, QVariant)
+from PyQt5.QtCore    import (Qt, QByteArray, QDataStream, QFileInfo,
+                             QIODevice, QMimeData, QSize, QTimer, QVariant)
 from PyQt5.QtGui     import (QAbstractTextDocumentLayout, QBrush, QColor,
                              QFont, QIcon, QPalette, QPixmap, QTextDocument)
 
@@ -122,6 +122,65 @@ class InfoTableHeaderItem(QTableWidgetItem):
         self.isResolving = False
 
 
+class Coalescer(object):
+    """
+    Coalesces bursts of requests for an action into at most one call of the
+    action per time window.  The first request in a window starts a
+    single-shot timer; further requests within the window only add to the
+    collected oids and flags, which are passed to the action when the timer
+    fires.
+
+    Attributes:
+        action (callable):  function to be called with the args (oids, flags)
+            -- the sets of oids and flags collected in the window
+        interval (int):  the window [milliseconds]
+    """
+    def __init__(self, action, interval=250):
+        self.action = action
+        self.oids = set()
+        self.flags = set()
+        self.n_requests = 0
+        self.coalesced = 0
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.fire)
+
+    def request(self, oids=None, flags=None):
+        """
+        Request the action, adding any specified oids and flags to those
+        collected in the current window.
+
+        Keyword Args:
+            oids (iterable of str):  oids of changed objects
+            flags (iterable of str):  names of things that need updating
+        """
+        self.oids.update(oids or [])
+        self.flags.update(flags or [])
+        self.n_requests += 1
+        # NOTE: the timer is not restarted, so the delay of the first request
+        # in a window is never more than the interval
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def fire(self):
+        """
+        Call the action now with everything collected so far.
+        """
+        self.timer.stop()
+        oids, flags = self.oids, self.flags
+        self.oids, self.flags = set(), set()
+        # number of requests coalesced into this call (for logging)
+        self.coalesced = self.n_requests
+        self.n_requests = 0
+        self.action(oids, flags)
+
+    def cancel(self):
+        self.timer.stop()
+        self.oids, self.flags = set(), set()
+        self.n_requests = 0
+
+
 def pct_to_decimal(percent):
     """
     Convert a string percentage representation into a decimal number.
@@ -373,6 +432,21 @@ def get_object_title(obj, new=False):
             title += f' <font color="purple">[{obj_type_display}]</font>'
     return title + '</h3>'
 
+def icon_exists(path):
+    """
+    Check whether an icon file exists -- unlike os.path.exists(), this also
+    works for icons in a registered Qt resource bundle (paths starting with
+    ":", e.g. when state['icon_dir'] is ":/icons").
+
+    Args:
+        path (str):  path of the icon file
+    """
+    if not path:
+        return False
+    if path.startswith(':'):
+        return QFileInfo(path).exists()
+    return os.path.exists(path)
+
 def get_icon_path(obj):
     """
     Get the path to the image file for an object's icon (which may or may
@@ -389,19 +463,19 @@ def get_icon_path(obj):
     icon_type = state.get('icon_type', '.png')
     if getattr(obj, 'id', None):
         special_icon_path = os.path.join(icon_dir, obj.id + icon_type)
-        if os.path.exists(special_icon_path):
+        if icon_exists(special_icon_path):
             return special_icon_path
     if isinstance(obj, orb.classes['PortType']):
         # special icons for PortTypes
         prefix = 'PortType_' + obj.id
         icon_path = os.path.join(icon_dir, prefix + icon_type)
-        if os.path.exists(icon_path):
+        if icon_exists(icon_path):
             return icon_path
     if isinstance(obj, orb.classes['PortTemplate']):
         # special icons for PortTemplates
         prefix = 'PortTemplate_' + obj.type_of_port.id
         icon_path = os.path.join(icon_dir, prefix + icon_type)
-        if os.path.exists(icon_path):
+        if icon_exists(icon_path):
             return icon_path
     # ManagedObject has the "public" attribute, but Product is the only class
     # that actually applies it ...
@@ -441,7 +515,7 @@ def get_icon_path(obj):
         return os.path.join(icon_dir, 'green_box' + icon_type)
     # check for a special icon for this class
     class_icon_path = os.path.join(icon_dir, cname + icon_type)
-    if os.path.exists(class_icon_path):
+    if icon_exists(class_icon_path):
         return class_icon_path
     # check for a special icon in the icon vault (runtime-generated icons)
     icon_vault_path = os.path.join(orb.icon_vault, cname)
@@ -462,7 +536,7 @@ def get_pixmap(obj):
     if obj:
         icon_path = get_icon_path(obj)
         icon_type = state.get('icon_type', '.png')
-        if not os.path.exists(icon_path):
+        if not icon_exists(icon_path):
             # if no generated icon is found, fall back to default icons
             icon_dir = state.get('icon_dir', os.path.join(orb.home, 'icons'))
             if obj.__class__.__name__ == 'Project':
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed storage for the local vault.
+
+Each distinct file content is stored once, as a "blob" named by its sha256
+digest ([vault]/blobs/[first 2 hex digits]/[digest]).  The vault file names
+used by the rest of the app ([RepresentationFile oid]_[user file name], see
+orb.get_vault_fpath()) are hard links to the blobs -- or copies, on file
+systems that do not support hard links -- so they resolve as before, and the
+same CAD file attached to several Models or Documents takes the space of one
+file.  Blobs are made read-only, since all the vault file names linked to a
+blob share its content:  an app that opens a vault file cannot save changes
+in place (which would change the file of every other name), only as a new
+file.  An index ([vault]/blobs/index.json) maps the vault file names to their
+digests, so that the digest of a file is known without reading it again
+(e.g. to ask the repository whether it already has the content before
+uploading it) and so that blobs no longer referenced can be removed (see
+ContentVault.collect_garbage()).
+
+Only the vault files stored or adopted through ContentVault are managed; any
+other files in the vault are left alone.
+
+The vault is also a size-bounded cache of downloaded files:  the last access
+of each managed file is recorded (see record_access(), which also counts cache
+hits and misses), and evict() removes the least recently used downloaded files
+until the stored contents fit a quota.  Files stored locally (i.e. uploaded
+from this node) are never evicted, nor are any files the caller asks to keep
+(e.g. files the user has pinned).
+"""
+import hashlib, json, os, shutil, stat, time
+
+BLOB_DIR = 'blobs'
+INDEX_FNAME = 'index.json'
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+def sha256_file(path):
+    """
+    Return the sha256 hex digest of a file's contents.
+    """
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(2**20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ContentVault(object):
+    """
+    Content-addressed layer over the local vault directory.
+
+    Attributes:
+        vault_dir (str):  path of the vault directory
+        blob_dir (str):  path of the blob directory
+        index (dict):  maps vault file names to the digests of their contents
+        access (dict):  maps vault file names to their last access times
+            [seconds since the epoch]
+        downloaded (set):  names of the vault files that were downloaded
+            (only these can be evicted)
+        hits (int):  number of accesses that found the file in the vault
+        misses (int):  number of accesses that did not
+        evicted (int):  number of vault files evicted
+    """
+    def __init__(self, vault_dir):
+        self.vault_dir = vault_dir
+        self.blob_dir = os.path.join(vault_dir, BLOB_DIR)
+        if not os.path.exists(self.blob_dir):
+            os.makedirs(self.blob_dir, mode=0o755)
+        self.index_path = os.path.join(self.blob_dir, INDEX_FNAME)
+        self.index = {}
+        self.access = {}
+        self.downloaded = set()
+        self.hits = self.misses = self.evicted = 0
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                record = {}
+            self.index = record.get('files') or {}
+            self.access = record.get('access') or {}
+            self.downloaded = set(record.get('downloaded') or [])
+            self.hits = record.get('hits') or 0
+            self.misses = record.get('misses') or 0
+            self.evicted = record.get('evicted') or 0
+
+    def save_index(self):
+        record = dict(files=self.index, access=self.access,
+                      downloaded=sorted(self.downloaded), hits=self.hits,
+                      misses=self.misses, evicted=self.evicted)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self.index_path)
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def vault_fpath(self, vault_fname):
+        return os.path.join(self.vault_dir, vault_fname)
+
+    def digest(self, vault_fname):
+        """
+        Return the digest of a managed vault file, or None.
+        """
+        return self.index.get(vault_fname)
+
+    def _protect(self, blob):
+        # make a blob (and so all the vault files linked to it) read-only
+        if stat.S_IMODE(os.stat(blob).st_mode) != READ_ONLY:
+            os.chmod(blob, READ_ONLY)
+
+    def _unlink(self, path):
+        # remove a file, which may be a read-only blob or vault file (on
+        # Windows, read-only files cannot be removed)
+        try:
+            os.remove(path)
+        except PermissionError:
+            os.chmod(path, READ_ONLY | stat.S_IWUSR)
+            os.remove(path)
+
+    def _link(self, blob, path):
+        # point the vault file name at the blob (hard link, else copy)
+        if os.path.exists(path):
+            if os.path.samefile(blob, path):
+                return
+            self._unlink(path)
+            # (the blob may be the one whose link was removed)
+            self._protect(blob)
+        try:
+            os.link(blob, path)
+        except OSError:
+            shutil.copy2(blob, path)
+
+    def _add_blob(self, src_path, digest, move=False):
+        blob = self.blob_path(digest)
+        if os.path.exists(blob):
+            self._protect(blob)
+            return blob
+        blob_subdir = os.path.dirname(blob)
+        if not os.path.exists(blob_subdir):
+            os.makedirs(blob_subdir, mode=0o755)
+        if move:
+            try:
+                os.link(src_path, blob)
+                self._protect(blob)
+                return blob
+            except OSError:
+                pass
+        tmp_path = blob + '.tmp'
+        shutil.copy2(src_path, tmp_path)
+        os.replace(tmp_path, blob)
+        self._protect(blob)
+        return blob
+
+    def store(self, src_path, vault_fname, digest=None):
+        """
+        Store a file (e.g. one being uploaded) in the vault under a vault file
+        name, keeping one blob per distinct content.
+
+        Args:
+            src_path (str):  path of the file
+            vault_fname (str):  the vault file name
+
+        Keyword Args:
+            digest (str):  the sha256 digest of the file, if already known
+
+        Returns:
+            str:  the digest
+        """
+        digest = digest or sha256_file(src_path)
+        blob = self._add_blob(src_path, digest)
+        self._link(blob, self.vault_fpath(vault_fname))
+        self.index[vault_fname] = digest
+        self.access[vault_fname] = time.time()
+        self.downloaded.discard(vault_fname)
+        self.save_index()
+        return digest
+
+    def adopt(self, vault_fname):
+        """
+        Bring a file already in the vault (e.g. one just downloaded) under
+        content addressing:  if its content is already stored, the file is
+        replaced by a link to the existing blob.  Adopted files are counted
+        as downloaded, so they can be evicted.
+
+        Args:
+            vault_fname (str):  the vault file name
+
+        Returns:
+            str:  the digest
+        """
+        path = self.vault_fpath(vault_fname)
+        digest = sha256_file(path)
+        blob = self._add_blob(path, digest, move=True)
+        self._link(blob, path)
+        self.index[vault_fname] = digest
+        self.access[vault_fname] = time.time()
+        self.downloaded.add(vault_fname)
+        self.save_index()
+        return digest
+
+    def record_access(self, vault_fname):
+        """
+        Record an access (e.g. opening the file) of a vault file, counting it
+        as a cache hit if the file is in the vault and a miss otherwise.
+
+        Args:
+            vault_fname (str):  the vault file name
+
+        Returns:
+            bool:  True if the file is in the vault
+        """
+        hit = os.path.exists(self.vault_fpath(vault_fname))
+        if hit:
+            self.hits += 1
+            if vault_fname in self.index:
+                self.access[vault_fname] = time.time()
+        else:
+            self.misses += 1
+        self.save_index()
+        return hit
+
+    def _remove(self, vault_fname):
+        # forget a managed vault file (and remove it if it exists)
+        path = self.vault_fpath(vault_fname)
+        if os.path.exists(path):
+            self._unlink(path)
+            blob = self.blob_path(self.index[vault_fname])
+            if os.path.exists(blob):
+                self._protect(blob)
+        del self.index[vault_fname]
+        self.access.pop(vault_fname, None)
+        self.downloaded.discard(vault_fname)
+
+    def stored_bytes(self):
+        """
+        Return the number of bytes stored in the blobs of managed files.
+        """
+        return sum(os.path.getsize(self.blob_path(digest))
+                   for digest in set(self.index.values())
+                   if os.path.exists(self.blob_path(digest)))
+
+    def evict(self, quota, keep=None):
+        """
+        Remove the least recently used downloaded vault files until the
+        contents stored fit the quota (a blob is freed only when no vault
+        file references it any more).  Files stored locally and files in
+        `keep` are never evicted, so the quota may still be exceeded.
+
+        Args:
+            quota (int):  maximum number of bytes to be stored
+
+        Keyword Args:
+            keep (set of str):  names of vault files not to be evicted
+
+        Returns:
+            tuple:  (number of vault files evicted, bytes freed)
+        """
+        keep = keep or set()
+        total = self.stored_bytes()
+        n_files = n_bytes = 0
+        candidates = sorted((fname for fname in self.downloaded
+                             if fname in self.index and fname not in keep),
+                            key=lambda fname: self.access.get(fname, 0))
+        for vault_fname in candidates:
+            if total <= quota:
+                break
+            digest = self.index[vault_fname]
+            self._remove(vault_fname)
+            n_files += 1
+            if digest not in self.index.values():
+                blob = self.blob_path(digest)
+                if os.path.exists(blob):
+                    size = os.path.getsize(blob)
+                    self._unlink(blob)
+                    total -= size
+                    n_bytes += size
+        self.evicted += n_files
+        if n_files:
+            self.save_index()
+        return n_files, n_bytes
+
+    def collect_garbage(self, live_fnames=None):
+        """
+        Remove the blobs that are no longer referenced by a vault file name.
+        Index entries whose vault files are gone are dropped; if
+        `live_fnames` is specified, managed vault files whose names are not
+        in it (i.e. whose RepresentationFiles no longer exist) are removed
+        too.
+
+        Keyword Args:
+            live_fnames (set of str):  the vault file names still in use
+
+        Returns:
+            tuple:  (number of blobs removed, bytes freed)
+        """
+        for vault_fname in list(self.index):
+            if ((live_fnames is not None and vault_fname not in live_fnames)
+                or not os.path.exists(self.vault_fpath(vault_fname))):
+                self._remove(vault_fname)
+        referenced = set(self.index.values())
+        n_removed = n_bytes = 0
+        for dirpath, dirnames, fnames in os.walk(self.blob_dir):
+            for fname in fnames:
+                if dirpath == self.blob_dir or fname in referenced:
+                    continue
+                blob = os.path.join(dirpath, fname)
+                n_bytes += os.path.getsize(blob)
+                self._unlink(blob)
+                n_removed += 1
+        self.save_index()
+        return n_removed, n_bytes
+
+    def stats(self):
+        """
+        Return a dict with the number of managed vault files ("files"), the
+        number of blobs ("blobs"), the bytes stored in blobs ("bytes"), the
+        bytes that deduplication saves ("saved"), the cache hits, misses,
+        and hit rate ("hits", "misses", "hit_rate"), and the number of vault
+        files evicted ("evicted").
+        """
+        sizes = {}
+        for digest in set(self.index.values()):
+            blob = self.blob_path(digest)
+            if os.path.exists(blob):
+                sizes[digest] = os.path.getsize(blob)
+        total = sum(sizes.get(d, 0) for d in self.index.values())
+        stored = sum(sizes.values())
+        accesses = self.hits + self.misses
+        hit_rate = self.hits / accesses if accesses else 0.0
+        return dict(files=len(self.index), blobs=len(sizes), bytes=stored,
+                    saved=total - stored, hits=self.hits, misses=self.misses,
+                    hit_rate=hit_rate, evicted=self.evicted)